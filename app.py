@@ -1,25 +1,26 @@
-import json
-import joblib
+import os
+import time
 import numpy as np
 import pandas as pd
 import streamlit as st
 from pathlib import Path
-from sklearn.base import BaseEstimator, TransformerMixin
-
-# ============== Helpers for unpickling ==============
-class Winsorizer(BaseEstimator, TransformerMixin):
-    def __init__(self, cols=None): self.cols, self.bounds_ = cols, {}
-    def fit(self, X, y=None):
-        df = pd.DataFrame(X, columns=self.cols if self.cols else None)
-        for c in df.columns:
-            q1, q3 = df[c].quantile([0.25, 0.75]); iqr = q3 - q1
-            self.bounds_[c] = (q1 - 1.5*iqr, q3 + 1.5*iqr)
-        return self
-    def transform(self, X):
-        df = pd.DataFrame(X, columns=self.cols if self.cols else None)
-        for c in df.columns:
-            lo, hi = self.bounds_[c]; df[c] = df[c].clip(lo, hi)
-        return df.values
+
+from outcomes.audit import AUDIT
+from outcomes.batch import ScratchFiles, score_cohort
+from outcomes.cache import CACHES, DROPOUT_CACHE, EXPLAIN_CACHE, G3_CACHE, SWEEP_CACHE, TEACHER_CACHE, row_key
+from outcomes.cohort import GROUP_COLS, CohortScores
+from outcomes.compare import Workspace
+from outcomes.curves import cohort_curve
+from outcomes.drift import build_baseline, existing_monitor, monitor_for
+from outcomes.explain import explainer_for
+from outcomes.fields import CONTINUOUS_NUMS, G3_CATEGORY, G3_RANGES, RANGES
+from outcomes.forest import compile_pipeline
+from outcomes.incremental import incremental_for
+from outcomes.registry import REGISTRY
+from outcomes.surrogate import MAX_AUC_GAP, MIN_AGREEMENT, serves, summary as surrogate_summary
+from outcomes.sweep import grid_values, sweep
+from outcomes.timing import TIMER, TimingLease
+from outcomes.validate import dropout_rules, g3_rules, validate
 
 # ============== App Config & Styling ==============
 st.set_page_config(page_title="Student Performance & Drop-Out Risk", page_icon="🎓", layout="wide")
@@ -83,15 +84,18 @@ h1,h2,h3 { letter-spacing:.2px; }
 BASE = Path(__file__).parent
 MODEL_DIR = BASE / "models"
 ARTIFACTS_DIR = BASE / "artifacts"
+DATA_DIR = BASE / "datasets"
+COHORT_PATH = DATA_DIR / "data.csv"  # labeled cohort used for live threshold metrics
 
-schema = json.load(open(ARTIFACTS_DIR / "schema.json", "r"))
-defaults_blob = json.load(open(ARTIFACTS_DIR / "defaults.json", "r"))
+# Loaded once per server process (shared across sessions); re-read only when a file changes.
+schema = REGISTRY.json(ARTIFACTS_DIR / "schema.json")
+defaults_blob = REGISTRY.json(ARTIFACTS_DIR / "defaults.json")
 defaults = defaults_blob["defaults"]
 quick_fields = defaults_blob["quick_fields"]
 
 labels_path = ARTIFACTS_DIR / "labels.json"
 try:
-    LABELS = json.load(open(labels_path, "r"))
+    LABELS = REGISTRY.json(labels_path)
 except Exception:
     LABELS = {}
 
@@ -103,18 +107,103 @@ thr_map = schema.get("thresholds", {"balanced": 0.50, "high_recall": 0.26})
 thr_balanced = float(thr_map.get("balanced", 0.50))
 thr_highrec  = float(thr_map.get("high_recall", 0.26))
 
-# Models
-dropout_pipe = joblib.load(MODEL_DIR / "dropout_model.pkl")
-g3_pipe      = joblib.load(MODEL_DIR / "g3_model.pkl")
+# Models (a memory-mapped export in models/<name>.mm/ is preferred over the pickle)
+def model_path(name: str) -> Path:
+    mm = MODEL_DIR / f"{name}.mm"
+    return mm if (mm / "manifest.json").exists() else MODEL_DIR / f"{name}.pkl"
+
+DROPOUT_MODEL_PATH = model_path("dropout_model")
+G3_MODEL_PATH      = model_path("g3_model")
+if not DROPOUT_MODEL_PATH.exists():
+    st.error("`models/dropout_model.pkl` not found. Rebuild the models and artifacts with `python -m outcomes.train`.")
+    st.stop()
 
 # G3 defaults & typing
-g3_defaults = json.load(open(ARTIFACTS_DIR / "g3_defaults.json", "r"))
+g3_defaults = REGISTRY.json(ARTIFACTS_DIR / "g3_defaults.json")
 g3_all_cols = list(g3_defaults.keys())
 def _is_num(v):
     try: float(v); return True
     except Exception: return False
-g3_num_cols = [c for c in g3_all_cols if _is_num(g3_defaults[c])]
-g3_cat_cols = [c for c in g3_all_cols if c not in g3_num_cols]
+
+# Column-wise validation rules (ranges, codes, dtypes) for batch and form rows
+DROPOUT_RULES = dropout_rules(schema, defaults)
+G3_RULES = g3_rules(g3_defaults)
+VALIDATION_POLICIES = {"default": "Fill from defaults", "clip": "Clip to range", "reject": "Reject row"}
+
+# Models load on first use (a prediction, cohort scoring or an evaluation), not at startup, so the
+# forms and the About tab render without importing sklearn. OUTCOMES_PRELOAD=1 restores eager loading.
+def timed(model, name: str):
+    """This session's hold on per-stage timing of the shared model, following its sidebar toggle.
+
+    The wrappers are reference-counted across sessions: they stay on while any session shows timings.
+    """
+    lease = st.session_state.setdefault("_timing_lease", TimingLease())
+    return lease.hold(model, name, show_timings)
+
+def cached(cache, key: str, name: str, compute):
+    """``cache.get_or_compute``; while timings are shown, a hit is recorded as the ``cache`` stage of ``name``."""
+    missed, t0 = [], time.perf_counter()
+    value = cache.get_or_compute(key, lambda: missed.append(True) or compute())
+    if show_timings and not missed:
+        TIMER.record(name, "cache", "hit", time.perf_counter() - t0, 1)
+    return value
+
+def dropout_model():
+    """Serving model (compiled engine unless disabled in the sidebar) and its version."""
+    pipe = timed(REGISTRY.model(DROPOUT_MODEL_PATH), "dropout")
+    engine = compile_pipeline(pipe)  # flat-array forest; None if the pipeline can't be compiled
+    if engine is not None and engine is not pipe: timed(engine, "dropout-engine")
+    return (engine if (use_engine and engine is not None) else pipe), REGISTRY.version(DROPOUT_MODEL_PATH)
+
+def g3_model():
+    return timed(REGISTRY.model(G3_MODEL_PATH), "g3"), REGISTRY.version(G3_MODEL_PATH)
+
+# Single rows are scored relative to the dataset-default student, redoing only what the changed fields affect
+# (identical forest output; see outcomes.incremental). Off while timing stages, which need the full pipeline.
+DROPOUT_REFERENCE = {c: (int(defaults[c]) if c in cat_cols else float(defaults[c])) for c in all_cols}
+G3_REFERENCE = validate(pd.DataFrame([g3_defaults]), G3_RULES).frame.to_dict("records")[0]
+def dropout_incremental():
+    if not use_engine or show_timings: return None
+    return incremental_for(REGISTRY.model(DROPOUT_MODEL_PATH), DROPOUT_REFERENCE)
+def g3_incremental():
+    return None if show_timings else incremental_for(REGISTRY.model(G3_MODEL_PATH), G3_REFERENCE)
+
+# Distilled Quick-mode surrogate (python -m outcomes.surrogate), served only within these fidelity bounds
+QUICK_MODEL_PATH = model_path("dropout_quick")
+QUICK_REPORT_PATH = ARTIFACTS_DIR / "dropout_quick.json"
+QUICK_MIN_AGREEMENT = float(os.environ.get("OUTCOMES_SURROGATE_MIN_AGREEMENT", MIN_AGREEMENT))
+QUICK_MAX_AUC_GAP = float(os.environ.get("OUTCOMES_SURROGATE_MAX_AUC_GAP", MAX_AUC_GAP))
+def quick_surrogate(model, dropout_version):
+    """``(surrogate, report, version)`` if one exists, meets the bounds and was distilled from ``model``; else None."""
+    if not use_surrogate or not QUICK_MODEL_PATH.exists() or not QUICK_REPORT_PATH.exists(): return None
+    report, surrogate = REGISTRY.json(QUICK_REPORT_PATH), timed(REGISTRY.model(QUICK_MODEL_PATH), "dropout-quick")
+    quick_version = f"{REGISTRY.version(QUICK_MODEL_PATH)}:{REGISTRY.version(QUICK_REPORT_PATH)}"
+    ok = TEACHER_CACHE.get_or_compute(row_key({"teacher_check": quick_version}, dropout_version),
+                                      lambda: serves(report, model, DROPOUT_REFERENCE, all_cols,
+                                                     QUICK_MIN_AGREEMENT, QUICK_MAX_AUC_GAP))
+    return (surrogate, report, quick_version) if ok else None
+
+# Attribution (memoized per loaded pipeline; None if a pipeline can't be explained)
+def dropout_explainer(): return explainer_for(REGISTRY.model(DROPOUT_MODEL_PATH), "forest", cols=all_cols)
+def g3_explainer():      return explainer_for(REGISTRY.model(G3_MODEL_PATH), "linear", reference=g3_defaults, cols=g3_all_cols)
+
+# Every prediction is appended to audit/ by a background writer (python -m outcomes.audit reads it back).
+AUDIT_ENABLED = os.environ.get("OUTCOMES_AUDIT", "1") != "0"
+
+# Inputs and predictions are also binned against the training data (outcomes.drift); the baseline is rebuilt per model version.
+DRIFT_ENABLED = os.environ.get("OUTCOMES_DRIFT", "1") != "0"
+DRIFT_BASELINE_PATH = ARTIFACTS_DIR / "drift_baseline.json"
+def drift_versions():
+    return {"dropout": REGISTRY.version(DROPOUT_MODEL_PATH), "g3": REGISTRY.version(G3_MODEL_PATH)}
+def drift_monitor():
+    """Prediction and cohort paths only: loads both models and may build the baseline."""
+    pipe, g3_pipe = REGISTRY.model(DROPOUT_MODEL_PATH), REGISTRY.model(G3_MODEL_PATH)
+    forest = compile_pipeline(pipe) or pipe
+    return monitor_for(DRIFT_BASELINE_PATH, drift_versions(), lambda: build_baseline(
+        DATA_DIR, schema, g3_defaults, lambda X: forest.predict_proba(X)[:, 1], g3_pipe.predict))
+
+if os.environ.get("OUTCOMES_PRELOAD") == "1":
+    for _p in (DROPOUT_MODEL_PATH, G3_MODEL_PATH): REGISTRY.model(_p)
 
 # Friendly labels (classification)
 MARITAL_MAP = {1:"Single",2:"Married",3:"Widowed",4:"Divorced",5:"Civil union",6:"Legally separated"}
@@ -130,32 +219,6 @@ BINARY_LABELS = {
 }
 _ORDER_WORDS = {0:"First choice (highest)",1:"Second choice",2:"Third choice",3:"Fourth choice",4:"Fifth choice",
                 5:"Sixth choice",6:"Seventh choice",7:"Eighth choice",8:"Ninth choice",9:"Last choice"}
-CONTINUOUS_NUMS = {
-    "Previous_qualification_grade","Admission_grade",
-    "Curricular_units_1st_sem_grade","Curricular_units_2nd_sem_grade",
-    "Unemployment_rate","Inflation_rate","GDP"
-}
-RANGES = {
-    "Application_order": (0, 9, 1),
-    "Curricular_units_1st_sem_credited": (0, 30, 1),
-    "Curricular_units_1st_sem_enrolled": (0, 30, 1),
-    "Curricular_units_1st_sem_evaluations": (0, 45, 1),
-    "Curricular_units_1st_sem_approved": (0, 30, 1),
-    "Curricular_units_1st_sem_without_evaluations": (0, 12, 1),
-    "Curricular_units_2nd_sem_credited": (0, 30, 1),
-    "Curricular_units_2nd_sem_enrolled": (0, 30, 1),
-    "Curricular_units_2nd_sem_evaluations": (0, 40, 1),
-    "Curricular_units_2nd_sem_approved": (0, 30, 1),
-    "Curricular_units_2nd_sem_without_evaluations": (0, 12, 1),
-    "Age_at_enrollment": (15, 70, 1),
-    "Previous_qualification_grade": (0.0, 200.0, 0.1),
-    "Admission_grade": (0.0, 200.0, 0.1),
-    "Curricular_units_1st_sem_grade": (0.0, 20.0, 0.1),
-    "Curricular_units_2nd_sem_grade": (0.0, 20.0, 0.1),
-    "Unemployment_rate": (0.0, 40.0, 0.1),
-    "Inflation_rate": (-5.0, 20.0, 0.1),
-    "GDP": (-10.0, 10.0, 0.1),
-}
 CLS_LABELS = {
     "Gender": ("Gender", "Male or Female"),
     "Age_at_enrollment": ("Age at Enrollment (years)", "Student age when enrolled"),
@@ -194,23 +257,6 @@ def label_for(col: str, code_int: int) -> str:
     return f"Code {code_int}"
 
 # ============== G3 helpers ==============
-G3_RANGES = {
-    "age": (15, 22, 1),
-    "traveltime": (1, 4, 1), "studytime": (1, 4, 1),
-    "failures": (0, 3, 1),
-    "famrel": (1, 5, 1), "freetime": (1, 5, 1), "goout": (1, 5, 1),
-    "Dalc": (1, 5, 1), "Walc": (1, 5, 1),
-    "health": (1, 5, 1), "absences": (0, 93, 1),
-    "Medu": (0, 4, 1), "Fedu": (0, 4, 1),
-    "G1": (0, 20, 1), "G2": (0, 20, 1), "G3": (0, 20, 1)
-}
-G3_CATEGORY = {
-    "school":["GP","MS"], "sex":["F","M"], "address":["U","R"], "famsize":["LE3","GT3"], "Pstatus":["T","A"],
-    "Mjob":["teacher","health","services","at_home","other"], "Fjob":["teacher","health","services","at_home","other"],
-    "reason":["home","reputation","course","other"], "guardian":["mother","father","other"],
-    "schoolsup":["yes","no"], "famsup":["yes","no"], "paid":["yes","no"], "activities":["yes","no"],
-    "nursery":["yes","no"], "higher":["yes","no"], "internet":["yes","no"], "romantic":["yes","no"]
-}
 G3_CODED_SELECTS = {
     "traveltime": {1:"< 15 min", 2:"15–30 min", 3:"30–60 min", 4:"> 60 min"},
     "studytime":  {1:"< 2 hrs/week", 2:"2–5 hrs/week", 3:"5–10 hrs/week", 4:"> 10 hrs/week"}
@@ -254,6 +300,7 @@ def g3_label(col: str) -> str:
         lo, hi, _ = G3_RANGES[col]; return f"[G3] {base} ({lo}-{hi})"
     return f"[G3] {base}"
 def g3_help(col: str) -> str: return G3_LABELS.get(col, ("",""))[1]
+def g3_band(pred: float) -> str: return "Poor" if pred < 8 else ("Average" if pred < 10 else ("Good" if pred < 14 else "Excellent"))
 
 def render_g3_field(col: str):
     dv = g3_defaults[col]
@@ -283,12 +330,14 @@ def render_g3_field(col: str):
 
 # ============== Reset Helpers (Session State) ==============
 def reset_dropout_inputs_to_defaults():
+    st.session_state.pop("_dropout_shown", None)
     for c in all_cols:
         key = f"class_cat_{c}" if c in cat_cols else f"class_num_{c}"
         val = int(defaults[c]) if c in cat_cols else float(defaults[c])
         st.session_state[key] = val
 
 def reset_g3_inputs_to_defaults():
+    st.session_state.pop("_g3_shown", None)
     for c in g3_all_cols:
         dv = g3_defaults[c]
         if c in G3_CATEGORY:
@@ -332,7 +381,18 @@ with st.sidebar:
     st.caption("Tip: Quick mode uses 10–12 key inputs; Accurate uses all features.")
     st.markdown("---")
     show_json = st.toggle("Show inputs JSON", value=False)
+    show_timings = st.toggle("Show pipeline timings", value=False,
+                             help="Time every pipeline stage (preprocessing branches, Winsorizer, encoder/scaler, model) "
+                                  "and show rolling p50/p95. Also logged as JSON on the `outcomes.timing` logger.")
+    timings_slot = st.empty()  # filled at the end of the script, after this run's predictions
+    drift_slot = st.empty()    # likewise
     allow_download = st.toggle("Enable inputs download", value=False)
+    use_engine = st.toggle("Compiled forest engine", value=True,
+                           disabled=DROPOUT_MODEL_PATH.suffix == ".mm",  # a .mm export is always compiled
+                           help="Serve drop-out predictions from flat NumPy tree arrays (identical output, no sklearn dispatch).")
+    use_surrogate = st.toggle("Quick-mode surrogate", value=True,
+                              help="Score Quick-mode drop-out risk with the compact model distilled from the forest "
+                                   "(`python -m outcomes.surrogate`), when its fidelity report meets the configured bounds.")
     if st.button("Reset All Inputs"):
         st.session_state["_do_reset_all"] = True
         st.rerun()
@@ -367,6 +427,42 @@ def render_num(col: str):
                                    step=int(step), help=cls_help(col), key=f"class_num_{col}")
         return st.number_input(cls_label(col), value=int(dv), step=1, help=cls_help(col), key=f"class_num_{col}")
 
+# ============== Render helpers — attribution ==============
+def render_contributions(top: pd.DataFrame, row: dict, label_fn, unit: str, caption: str):
+    df = pd.DataFrame({"Feature": [label_fn(c) for c in top["feature"]],
+                       "Value": [str(row[c]) for c in top["feature"]],
+                       f"Contribution ({unit})": top["contribution"].round(4)})
+    with st.expander("🔎 Why this prediction?", expanded=True):
+        st.bar_chart(df, x="Feature", y=f"Contribution ({unit})", horizontal=True, sort=False, height=260)
+        st.dataframe(df, hide_index=True, use_container_width=True)
+        st.caption(caption)
+
+# ============== Render helpers — what-if sweeps ==============
+def render_sweep(prefix: str, row: dict, columns, ranges: dict, predict, version: str, label_fn, y_title: str, default=None):
+    feats = [c for c in columns if c in ranges]
+    with st.expander("📈 What-if sweep", expanded=False):
+        s1, s2 = st.columns(2)
+        f1 = s1.selectbox("Vary", feats, index=feats.index(default) if default in feats else 0,
+                          format_func=label_fn, key=f"{prefix}_sweep_x")
+        f2 = s2.selectbox("…and (optional)", [None] + [c for c in feats if c != f1],
+                          format_func=lambda c: "—" if c is None else label_fn(c), key=f"{prefix}_sweep_y")
+        axes = {f: grid_values(*ranges[f], max_points=61 if f2 is None else 25) for f in (f1, f2) if f is not None}
+        res = SWEEP_CACHE.get_or_compute(row_key({**row, "_sweep": list(axes)}, version + ":sweep"),
+                                         lambda: sweep(predict, row, axes, columns))
+        if f2 is None:
+            st.line_chart(res.rename(columns={"prediction": y_title}).set_index(f1), x_label=label_fn(f1), y_label=y_title)
+        else:
+            st.vega_lite_chart(res, {
+                "mark": "rect",
+                "encoding": {
+                    "x": {"field": f1, "type": "ordinal", "title": label_fn(f1), "axis": {"format": ".4~g"}},
+                    "y": {"field": f2, "type": "ordinal", "title": label_fn(f2), "axis": {"format": ".4~g"}, "sort": "descending"},
+                    "color": {"field": "prediction", "type": "quantitative", "title": y_title},
+                    "tooltip": [{"field": f1}, {"field": f2}, {"field": "prediction", "format": ".3f"}],
+                },
+            }, use_container_width=True)
+        st.caption(f"{len(res)} scenarios scored in one batch; all other inputs held at the current values.")
+
 # ============== Header ==============
 st.markdown("""
 <div class='header-bar'>
@@ -382,7 +478,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ============== Tabs (Main Tasks) ==============
-tab_dropout, tab_g3, tab_about = st.tabs(["Drop-Out Risk", "Final Grade (G3)", "About"])
+tab_dropout, tab_g3, tab_compare, tab_about = st.tabs(["Drop-Out Risk", "Final Grade (G3)", "Compare", "About"])
 
 # -----------------------------------------------------------------------------------
 # TAB: DROPOUT
@@ -403,6 +499,7 @@ with tab_dropout:
             thr_custom = st.slider("Custom", 0.00, 1.00, float(thr_balanced), 0.01, disabled=(thr_mode != "Custom"))
             thr_val = thr_custom if thr_mode == "Custom" else thr_presets[thr_mode]
             st.caption(f"Current: **{thr_val:.2f}**  ·  Lower → more flagged (↑ recall) · Higher → fewer flagged (↑ precision)")
+            metrics_slot = st.empty()  # held-out metrics, filled at the end of the tab once the model is loaded
 
     st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
     st.markdown("<div class='section-title'>Student Inputs</div>", unsafe_allow_html=True)
@@ -474,9 +571,25 @@ with tab_dropout:
 
     # -------- RESULTS (Dropout) OUTSIDE FORM --------
     if predict_clicked:
+        st.session_state["_dropout_shown"] = True
+    # Results persist across reruns (threshold/preset changes); the prediction cache makes those free.
+    if st.session_state.get("_dropout_shown"):
         row = {c: (int(values[c]) if c in cat_cols else float(values[c])) for c in all_cols}
         X_df = pd.DataFrame([row], columns=all_cols)
-        prob = float(dropout_pipe.predict_proba(X_df)[0, 1])
+        model, dropout_version = dropout_model()
+        single, prob_version = dropout_incremental() or model, dropout_version
+        quick = quick_surrogate(model, dropout_version) if mode == "Quick" else None
+        if quick is not None:  # Quick rows hold defaults outside quick_fields, the surrogate's whole domain
+            single, prob_version = quick[0], f"{dropout_version}:quick:{quick[2]}"
+        t0 = time.perf_counter()
+        prob = cached(DROPOUT_CACHE, row_key(row, prob_version), "dropout" if quick is None else "dropout-quick",
+                      lambda: float(single.predict_proba(X_df)[0, 1]))
+        if predict_clicked and AUDIT_ENABLED:  # one record per Predict; threshold/preset reruns reuse the result
+            AUDIT.record("dropout", row, prob, threshold=thr_val, latency_ms=(time.perf_counter() - t0) * 1e3,
+                         version=prob_version, source="quick" if mode == "Quick" else "accurate")
+        if predict_clicked and DRIFT_ENABLED:  # Quick rows are mostly defaults: only the entered fields count
+            if mode == "Quick": drift_monitor().observe("dropout", X_df, fields=quick_fields)
+            else: drift_monitor().observe("dropout", X_df, [prob])
         pred = int(prob >= thr_val)
 
         k1, k2, k3 = st.columns([1, 1, 2])
@@ -490,8 +603,26 @@ with tab_dropout:
             st.markdown(f"<div class='card'><span class='badge {badge_class}'>{label}</span> <span class='helper'>Use threshold presets to trade precision/recall.</span></div>", unsafe_allow_html=True)
 
         st.progress(min(max(prob, 0.0), 1.0))
+        if quick is not None:
+            st.caption(f"Quick mode · distilled surrogate ({surrogate_summary(quick[1])} on held-out students).")
         st.caption(f"What-if · Balanced (0.50): **{'Dropout' if prob >= 0.50 else 'Non-Dropout'}**  •  High Recall (0.26): **{'Dropout' if prob >= 0.26 else 'Non-Dropout'}**")
 
+        # Explanation and sweep come from the model behind the KPI; the surrogate only moves with the quick fields
+        if quick is None:
+            explainer, engine, sweep_ranges = dropout_explainer(), model, RANGES
+            origin = "the forest, from the forest's base rate on its SMOTE-balanced training data"
+        else:
+            explainer, engine = explainer_for(quick[0], "surrogate", cols=all_cols), quick[0]
+            sweep_ranges = {c: r for c, r in RANGES.items() if c in quick_fields}
+            origin = "the surrogate's boosting stages, from its initial estimate"
+        if explainer is not None:
+            exp = EXPLAIN_CACHE.get_or_compute(row_key(row, prob_version + ":explain"), lambda: explainer.explain(X_df))
+            render_contributions(exp.top(0), row, cls_label, "risk",
+                                 f"Per-tree path contributions summed over {origin} ({exp.base:.3f}) to this student ({exp.prediction[0]:.3f}). Positive values raise drop-out risk.")
+
+        render_sweep("dropout", row, all_cols, sweep_ranges, lambda X: engine.predict_proba(X)[:, 1],
+                     prob_version, cls_label, "Risk probability", default="Curricular_units_2nd_sem_approved")
+
         if show_json:
             st.markdown("**Current Inputs (JSON)**")
             st.json(row, expanded=False)
@@ -499,6 +630,98 @@ with tab_dropout:
             csv = pd.DataFrame([row]).to_csv(index=False).encode("utf-8")
             st.download_button("Download Inputs (CSV)", csv, file_name="dropout_inputs.csv")
 
+    # -------- COHORT SCORING (Dropout) --------
+    st.markdown("<div class='divider'></div>", unsafe_allow_html=True)
+    st.markdown("<div class='section-title'>Cohort Scoring (CSV)</div>", unsafe_allow_html=True)
+    with st.container(border=True):
+        cohort_file = st.file_uploader("Upload a cohort in the data.csv layout (';'-separated)", type=["csv"], key="cohort_csv",
+                                       help="Headers are normalized like the training notebook; missing features use dataset defaults.")
+        b1, b2, b3, b4 = st.columns([1, 1, 1, 1])
+        chunk_rows = b1.number_input("Rows per chunk", min_value=500, max_value=100000, value=5000, step=500,
+                                     help="Memory use is bounded by the chunk size, not the cohort size.")
+        policy = b2.selectbox("Invalid values", list(VALIDATION_POLICIES), format_func=VALIDATION_POLICIES.get,
+                              help="Cells outside the form's ranges or codes, non-numeric or empty: replace with the dataset "
+                                   "default, clip numbers to the range (other problems use the default), or skip the row.")
+        top_k = b3.number_input("Top students", min_value=10, max_value=1000, value=50, step=10,
+                                help="How many of the highest-risk students to keep for the call list.")
+        score_cohort_clicked = b4.button("Score Cohort", type="primary", disabled=cohort_file is None, use_container_width=True)
+
+        if score_cohort_clicked:
+            st.session_state.pop("_cohort_result", None)
+            prev = st.session_state.pop("_cohort_files", None)
+            if prev is not None: prev.close()
+            # Deleted with the next scoring run or when the session is dropped, so abandoned sessions leave nothing in /tmp
+            files = st.session_state["_cohort_files"] = ScratchFiles(prefix="outcomes-cohort-")
+            with files.open() as out, files.open() as errors_out:
+                cohort_model, cohort_version = dropout_model()
+                monitor = drift_monitor() if DRIFT_ENABLED else None
+                scores = CohortScores(k=int(top_k))
+                scores.version = cohort_version
+                def audit(frame, prob, seconds):
+                    scores.add(frame, prob)
+                    if AUDIT_ENABLED:
+                        AUDIT.record_batch("dropout", frame, prob, threshold=thr_val, latency_ms=seconds * 1e3 / len(frame),
+                                           version=cohort_version, source="cohort")
+                    if monitor is not None: monitor.observe("dropout", frame, prob)
+                with st.spinner("Scoring cohort..."):
+                    summary = score_cohort(cohort_file, cohort_model, DROPOUT_RULES, thr_val, out, policy=policy,
+                                           errors_out=errors_out, chunksize=int(chunk_rows), audit=audit)
+            st.session_state["_cohort_result"] = {"path": out.name, "errors_path": errors_out.name, "thr": thr_val, **summary}
+            st.session_state["_cohort_scores"] = scores  # probabilities + group codes only, ~20 bytes per student
+
+        res = st.session_state.get("_cohort_result")
+        if res:
+            st.caption(f"Scored **{res['scored']:,}** of {res['rows']:,} students in {res['chunks']} chunk(s) at threshold "
+                       f"**{res['thr']:.2f}** → **{res['flagged']:,}** flagged.")
+            if res["missing_columns"]:
+                st.caption(f"Filled from defaults (column missing): {', '.join(res['missing_columns'])}")
+            fixes = [f"{res[k]:,} {label}" for k, label in (("filled_cells", "cells filled from defaults"),
+                     ("clipped_cells", "cells clipped to range"), ("rejected", "rows rejected")) if res[k]]
+            if fixes:
+                st.caption("Validation: " + " · ".join(fixes) + ".")
+                st.dataframe(pd.DataFrame(list(res["problems"].items()), columns=["column: problem", "cells"])
+                             .sort_values("cells", ascending=False, kind="mergesort"), hide_index=True, use_container_width=True, height=160)
+            d1, d2 = st.columns([1, 1])
+            with open(res["path"], "rb") as f:
+                d1.download_button("Download Scored Cohort (CSV)", f, file_name="cohort_scores.csv", mime="text/csv")
+            if fixes:
+                with open(res["errors_path"], "rb") as f:
+                    d2.download_button("Download Validation Report (CSV)", f, file_name="cohort_validation.csv", mime="text/csv")
+
+        scores = st.session_state.get("_cohort_scores")
+        if res and scores is not None and scores.n:
+            st.markdown("**Risk Analytics**")
+            cohort_model, cohort_version = dropout_model()
+            if scores.version != cohort_version:
+                st.caption("⚠️ The drop-out model changed since this cohort was scored; score it again to refresh.")
+            g1, g2 = st.columns([1, 2])
+            group_col = g1.selectbox("Group by", [c for c in GROUP_COLS if c in all_cols], format_func=cls_label)
+            groups = scores.groups(group_col, thr_val)
+            groups.insert(0, "label", [label_for(group_col, int(code)) for code in groups["group"]])
+            g1.caption(f"At threshold **{thr_val:.2f}**: {scores.flagged(thr_val):,} of {scores.n:,} students flagged.")
+            g2.bar_chart(groups.head(15).set_index("label")["mean_risk"], horizontal=True, height=260)
+            st.dataframe(groups.round(3), hide_index=True, use_container_width=True, height=220)
+
+            st.markdown(f"**Top {scores.k} students to contact** (edit inputs to re-score just those rows)")
+            top = scores.top(thr_val)
+            rev = st.session_state.get("_cohort_top_rev", 0)
+            edited = st.data_editor(top, key=f"cohort_top_{rev}", use_container_width=True, height=320,
+                                    disabled=["_index", "dropout_probability", "flag"],
+                                    column_config={"dropout_probability": st.column_config.NumberColumn("risk", format="%.3f")})
+            changed = scores.rescore(edited.drop(columns=["dropout_probability", "flag"]), cohort_model, DROPOUT_RULES)
+            if changed:
+                st.session_state["_cohort_top_rev"] = rev + 1  # a fresh editor over the re-ranked rows
+                st.rerun()
+            st.caption(("Exact" if scores.exact else "Approximate: more edited rows than spare candidates; score again for an "
+                        "exact") + f" top {scores.k} from a bounded heap of {scores.capacity} candidates, without sorting the cohort. "
+                       "Edits change these scores and the aggregates, not the downloaded CSV.")
+
+    if COHORT_PATH.exists() and REGISTRY.loaded(DROPOUT_MODEL_PATH):
+        curve = cohort_curve(*dropout_model(), COHORT_PATH, all_cols)
+        m = curve.at(thr_val)
+        metrics_slot.caption(f"Held-out cohort (n={curve.n}): precision **{m['precision']:.2f}** · recall **{m['recall']:.2f}** · "
+                             f"F2 **{m['f2']:.2f}** · flagged {m['flagged']} (TP {m['tp']}, FP {m['fp']}, FN {m['fn']})")
+
 # -----------------------------------------------------------------------------------
 # TAB: G3
 # -----------------------------------------------------------------------------------
@@ -536,21 +759,22 @@ with tab_g3:
 
     # -------- RESULTS (G3) OUTSIDE FORM --------
     if predict_g3:
-        row = {}
-        for c in g3_all_cols:
-            v = values_g3.get(c, g3_defaults[c])
-            if c in g3_num_cols:
-                try:
-                    row[c] = float(v)
-                except Exception:
-                    row[c] = float(g3_defaults[c])
-            else:
-                row[c] = str(v)
-
-        Xg_df = pd.DataFrame([row], columns=g3_all_cols)
-        g3_pred = float(g3_pipe.predict(Xg_df)[0])
-
-        band = "Poor" if g3_pred < 8 else ("Average" if g3_pred < 10 else ("Good" if g3_pred < 14 else "Excellent"))
+        st.session_state["_g3_shown"] = True
+    if st.session_state.get("_g3_shown"):
+        Xg_df = validate(pd.DataFrame([values_g3]), G3_RULES).frame  # unparseable/out-of-range cells -> defaults
+        row = Xg_df.to_dict("records")[0]
+        g3_pipe, g3_version = g3_model()
+        g3_predict = (g3_incremental() or g3_pipe).predict  # a sweep moves one or two fields: incremental pays off too
+        t0 = time.perf_counter()
+        g3_pred = cached(G3_CACHE, row_key(row, g3_version), "g3", lambda: float(g3_predict(Xg_df)[0]))
+        if predict_g3 and AUDIT_ENABLED:
+            AUDIT.record("g3", row, g3_pred, latency_ms=(time.perf_counter() - t0) * 1e3, version=g3_version,
+                         source="quick" if g3_mode == "Quick" else "accurate")
+        if predict_g3 and DRIFT_ENABLED:
+            if g3_mode == "Quick": drift_monitor().observe("g3", Xg_df, fields=g3_show_cols)
+            else: drift_monitor().observe("g3", Xg_df, [g3_pred])
+
+        band = g3_band(g3_pred)
         bclass = "badge-bad" if band == "Poor" else ("badge-warn" if band in ("Average", "Good") else "badge-good")
 
         k1, k2, k3 = st.columns([1, 1, 2])
@@ -563,6 +787,16 @@ with tab_g3:
 
         st.progress(min(max(g3_pred / 20.0, 0.0), 1.0))
 
+        explainer = g3_explainer()
+        if explainer is not None:
+            exp = EXPLAIN_CACHE.get_or_compute(row_key(row, g3_version + ":explain"), lambda: explainer.explain(Xg_df))
+            render_contributions(exp.top(0), row, lambda c: G3_LABELS.get(c, (c, ""))[0], "G3 points",
+                                 f"Exact linear contributions relative to the dataset-default student ({exp.base:.2f}); "
+                                 f"they sum to this prediction ({g3_pred:.2f}).")
+
+        render_sweep("g3", row, g3_all_cols, G3_RANGES, g3_predict, g3_version,
+                     lambda c: G3_LABELS.get(c, (c, ""))[0], "Predicted G3", default="absences")
+
         if show_json:
             st.markdown("**Current Inputs (JSON)**")
             st.json(row, expanded=False)
@@ -570,11 +804,83 @@ with tab_g3:
             csv = pd.DataFrame([row]).to_csv(index=False).encode("utf-8")
             st.download_button("Download [G3] Inputs (CSV)", csv, file_name="g3_inputs.csv")
 
+# -----------------------------------------------------------------------------------
+# TAB: COMPARE
+# -----------------------------------------------------------------------------------
+with tab_compare:
+    st.markdown("<div class='section-title'>Compare Students & Scenarios</div>", unsafe_allow_html=True)
+    st.caption("Each candidate is a snapshot of both forms. Candidates are kept column-wise in this session and scored "
+               "together (one call per model) whenever one is added, edited or removed.")
+    if "_compare" not in st.session_state:
+        st.session_state["_compare"] = Workspace({"dropout": DROPOUT_RULES, "g3": G3_RULES})
+    ws = st.session_state["_compare"]
+
+    a1, a2, a3 = st.columns([2, 1, 1])
+    new_label = a1.text_input("Label", value=f"Candidate {ws.n + 1}", key=f"compare_label_{ws.n}")
+    if a2.button("➕ Add current inputs", type="primary", disabled=ws.full, use_container_width=True,
+                 help="Snapshot the Drop-Out and G3 forms as they are now."):
+        ws.add(new_label, {"dropout": {c: values[c] for c in all_cols}, "g3": values_g3})
+        st.rerun()
+    if a3.button("Clear", disabled=not ws.n, use_container_width=True):
+        ws.clear()
+        st.rerun()
+
+    if not ws.n:
+        st.caption(f"No candidates yet: fill in the forms, then add them here (up to {ws.capacity}).")
+    else:
+        (cmp_model, dropout_version), (cmp_g3, g3_version) = dropout_model(), g3_model()
+        scored = ws.score(cmp_model, cmp_g3, key=(dropout_version, g3_version))
+        varying = {kind: ws.varying(kind) for kind in ("dropout", "g3")}
+        extra = st.multiselect("Also show", [c for c in all_cols + g3_all_cols if c not in varying["dropout"] + varying["g3"]],
+                               format_func=lambda c: cls_label(c) if c in all_cols else g3_label(c),
+                               help="Inputs that differ between candidates are always shown.")
+        shown = {"dropout": [c for c in all_cols if c in varying["dropout"] or c in extra],
+                 "g3": [c for c in g3_all_cols if c in varying["g3"] or c in extra]}
+        table = pd.concat([ws.frame("dropout")[shown["dropout"]], ws.frame("g3")[shown["g3"]]], axis=1)
+        table.insert(0, "label", ws.labels[:ws.n])
+        table.insert(1, "risk", scored["dropout_probability"].to_numpy())
+        table.insert(2, "flag", np.where(table["risk"] >= thr_val, "Dropout", "Non-Dropout"))
+        table.insert(3, "g3", scored["g3"].to_numpy())
+        table.insert(4, "band", [g3_band(v) for v in table["g3"]])
+        table.insert(5, "remove", False)
+        config = {"risk": st.column_config.NumberColumn("Risk", format="%.3f"),
+                  "g3": st.column_config.NumberColumn("Predicted G3", format="%.2f"),
+                  "remove": st.column_config.CheckboxColumn("Remove")}
+        for c in shown["dropout"]:
+            config[c] = (st.column_config.SelectboxColumn(cls_label(c), options=[int(x) for x in schema["categorical"][c]])
+                         if c in cat_cols else st.column_config.NumberColumn(cls_label(c)))
+        for c in shown["g3"]:
+            config[c] = (st.column_config.SelectboxColumn(g3_label(c), options=G3_CATEGORY[c]) if c in G3_CATEGORY
+                         else st.column_config.NumberColumn(g3_label(c)))
+        rev = st.session_state.get("_compare_rev", 0)
+        edited = st.data_editor(table, key=f"compare_table_{rev}", hide_index=True, use_container_width=True,
+                                disabled=["risk", "flag", "g3", "band"], column_config=config)
+        ws.relabel(edited["label"].fillna("").astype(str).to_numpy())
+        changed = ws.update("dropout", edited[shown["dropout"]]) if shown["dropout"] else False
+        changed = (ws.update("g3", edited[shown["g3"]]) if shown["g3"] else False) or changed
+        if edited["remove"].any():
+            ws.remove(np.flatnonzero(edited["remove"].to_numpy()))
+            changed = True
+        if changed:
+            st.session_state["_compare_rev"] = rev + 1  # a fresh editor over the re-scored rows
+            st.rerun()
+        st.caption(f"{ws.n} of {ws.capacity} candidates · risk flagged at threshold **{thr_val:.2f}** · "
+                   f"{ws.nbytes / 1024:.0f} kB of session state. Edited values are validated (numbers clipped to the form's ranges).")
+
 # -----------------------------------------------------------------------------------
 # TAB: ABOUT
 # -----------------------------------------------------------------------------------
 with tab_about:
     st.markdown("### About this App")
+    evaluated = COHORT_PATH.exists() and REGISTRY.loaded(DROPOUT_MODEL_PATH)
+    if evaluated:
+        _c = cohort_curve(*dropout_model(), COHORT_PATH, all_cols)
+        _mb, _mh = _c.at(thr_balanced), _c.at(thr_highrec)
+        perf_items = (f"<li>Drop-Out @ {thr_balanced:.2f} → precision≈{_mb['precision']:.2f}, recall≈{_mb['recall']:.2f}</li>"
+                      f"<li>Drop-Out @ {thr_highrec:.2f} → precision≈{_mh['precision']:.2f}, recall≈{_mh['recall']:.2f}</li>")
+    else:
+        perf_items = ("<li>Drop-Out @ 0.50 → precision≈0.85, recall≈0.76</li>"
+                      "<li>Drop-Out @ 0.26 → precision≈0.65, recall≈0.90</li>")
     st.markdown(
         "<div class='card'>"
         "<b>Created By.</b> Naveen<br><br>"
@@ -582,8 +888,7 @@ with tab_about:
         "<b>Models.</b> Tree-based ensemble classifier for Drop-Out risk; ElasticNet regressor for G3.<br><br>"
         "<b>Performance (notebook test set):</b>"
         "<ul>"
-        "<li>Drop-Out @ 0.50 → precision≈0.85, recall≈0.76</li>"
-        "<li>Drop-Out @ 0.26 → precision≈0.65, recall≈0.90</li>"
+        + perf_items +
         "<li>G3 (ElasticNet): RMSE≈1.16, MAE≈0.72, R²≈0.86</li>"
         "</ul>"
         "<b>Use thresholds wisely:</b> lower for recall; higher for precision.<br><br>"
@@ -592,15 +897,87 @@ with tab_about:
         unsafe_allow_html=True
     )
     
+    if COHORT_PATH.exists():
+        st.markdown("#### Threshold Sweep")
+        if not evaluated:
+            st.caption("Computed from the labeled cohort once the drop-out model is loaded (by a prediction or here).")
+            evaluated = st.button("Load model & evaluate")
+    if evaluated:
+        split = st.radio("Evaluation cohort", ["holdout", "all"], horizontal=True,
+                         format_func=lambda s: "Held-out 20% (notebook test split)" if s == "holdout" else "All rows (in-sample)")
+        curve_df = cohort_curve(*dropout_model(), COHORT_PATH, all_cols, split=split).frame()
+        st.line_chart(curve_df.set_index("threshold")[["precision", "recall", "f2"]])
+        st.dataframe(curve_df.round(3), hide_index=True, use_container_width=True, height=240)
+
     st.markdown("#### Files & Configuration")
     st.code(
         "models/\n"
         "  dropout_model.pkl    # binary classifier pipeline (joblib)\n"
-        "  g3_model.pkl         # regression pipeline (joblib)\n\n"
+        "  g3_model.pkl         # regression pipeline (joblib)\n"
+        "  *.mm/                # optional memory-mapped exports (python -m outcomes.mmap_store), preferred when present\n"
+        "  dropout_quick.pkl    # optional distilled Quick-mode surrogate (python -m outcomes.surrogate)\n\n"
         "artifacts/\n"
         "  schema.json          # feature lists & categorical codes\n"
         "  defaults.json        # defaults + quick_fields\n"
         "  g3_defaults.json     # defaults for student-por features\n"
-        "  labels.json          # optional friendly labels (overwrite codes)\n",
+        "  labels.json          # optional friendly labels (overwrite codes)\n"
+        "  dropout_quick.json   # surrogate fidelity report\n"
+        "  drift_baseline.json  # training-data bins for the drift monitor (rebuilt per model version; OUTCOMES_DRIFT=0 disables)\n\n"
+        "audit/<model>/         # prediction audit log segments (python -m outcomes.audit; OUTCOMES_AUDIT=0 disables)\n",
         language="text"
     )
+
+    st.markdown("#### Loaded Artifacts")
+    st.caption("Each file is loaded once per server process and shared by all sessions; it is reloaded only when its contents change.")
+    st.dataframe(pd.DataFrame(REGISTRY.stats()), hide_index=True, use_container_width=True)
+
+    st.markdown("#### Caches")
+    st.caption("Unchanged inputs are served from process-wide LRU caches keyed on the typed input row and model version; "
+               "predictions, explanations, what-if sweeps, the surrogate check and cohort curves are cached separately.")
+    st.dataframe(pd.DataFrame([{"cache": name, **cache.stats()} for name, cache in CACHES.items()]),
+                 hide_index=True, use_container_width=True)
+
+    st.markdown("#### Audit Log")
+    st.caption("Every prediction (typed inputs, model version, threshold, result, latency) is queued for a background writer; "
+               "records are dropped, and counted, rather than delaying the app if the queue is ever full.")
+    audit_stats = AUDIT.stats()
+    if audit_stats:
+        st.dataframe(pd.DataFrame(audit_stats), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No records yet." if AUDIT_ENABLED else "Disabled (`OUTCOMES_AUDIT=0`).")
+
+# ============== Pipeline timings (sidebar, filled last) ==============
+if show_timings:
+    with timings_slot.container():
+        timings = pd.DataFrame(TIMER.summary())
+        if timings.empty:
+            st.caption("No timed calls yet: run a prediction.")
+        else:
+            st.dataframe(timings.sort_values(["model", "stage"], kind="mergesort")
+                         [["model", "stage", "calls", "p50_ms", "p95_ms", "last_ms"]].round(3),
+                         hide_index=True, use_container_width=True)
+            st.caption(f"Rolling window of the last {TIMER.window} calls per stage; nested stages are included in their parents. "
+                       "Predictions served from the cache appear as the `cache` stage.")
+
+# ============== Drift status (sidebar, filled last) ==============
+# Never loads a model or builds the baseline here (that would undo lazy loading on first paint):
+# only a monitor that a prediction already created for the loaded models is shown.
+if DRIFT_ENABLED:
+    models_loaded = REGISTRY.loaded(DROPOUT_MODEL_PATH) and REGISTRY.loaded(G3_MODEL_PATH)
+    monitor = existing_monitor(drift_versions()) if models_loaded else None
+    with drift_slot.container():
+        if monitor is None:
+            st.caption("Input drift · shown after the first prediction.")
+        else:
+            icons = {"stable": "🟢", "moderate": "🟠", "major": "🔴"}
+            st.markdown("**Input drift** · " + " · ".join(
+                f"{name}: {icons.get(s, '⚪')} {s}" for name, s in (("Drop-Out", monitor.overall("dropout")),
+                                                                  ("G3", monitor.overall("g3")))))
+            drift = monitor.status()
+            judged = drift[drift["level"].isin(icons)]
+            if not judged.empty:
+                with st.expander("Most drifted features"):
+                    st.dataframe(judged.head(8)[["model", "feature", "psi", "ks", "rows"]].round(3),
+                                 hide_index=True, use_container_width=True)
+                    st.caption(f"PSI and KS against the training data, over the last ~{monitor.half_life:,.0f} rows "
+                               f"per feature (exponentially decayed); judged from {monitor.min_rows:.0f} rows.")
@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the serving path. Run from the repo root, e.g. ``python -m benchmarks.winsorizer``."""
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
@@ -0,0 +1,77 @@
+"""Audit log: caller-side cost, writer throughput, bytes per record and scan speed.
+
+    python -m benchmarks.audit [--records 2000000] [--rate 2000]
+
+Writes into a temporary directory. Single drop-out rows are recorded at
+``--rate`` per second for two seconds (caller latency while the writer is
+busy, records dropped), then ``--records`` rows are recorded as cohort-sized
+batches and flushed (writer throughput, on-disk size). Finally every record is
+scanned (one column over all segments) and decoded (``read``).
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from outcomes.audit import AuditLog, read, scan, segments
+from outcomes.registry import REGISTRY
+
+from . import ROOT
+from .suite import dropout_rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--records", type=int, default=2_000_000)
+    ap.add_argument("--rate", type=float, default=2000.0, help="single-row records per second in the paced phase")
+    ap.add_argument("--batch", type=int, default=5000, help="rows per record_batch call")
+    args = ap.parse_args(argv)
+
+    schema = REGISTRY.json(ROOT / "artifacts" / "schema.json")
+    rows = dropout_rows(args.batch, schema, seed=1)
+    singles = rows.to_dict("records")
+    root = Path(tempfile.mkdtemp(prefix="audit-bench-"))
+    try:
+        log = AuditLog(root)
+        lat, t_end, i = [], time.perf_counter() + 2.0, 0
+        while time.perf_counter() < t_end:
+            t0 = time.perf_counter()
+            log.record("dropout", singles[i % len(singles)], 0.3, threshold=0.5, latency_ms=0.8, version="bench", source="quick")
+            lat.append(time.perf_counter() - t0); i += 1
+            time.sleep(max(0.0, 1.0 / args.rate - (time.perf_counter() - t0)))
+        log.flush()
+        lat = np.asarray(lat) * 1e6
+        print(f"paced   {len(lat):,} records at {args.rate:.0f}/s · record() p50 {np.percentile(lat, 50):.1f} µs · "
+              f"p99 {np.percentile(lat, 99):.1f} µs · max {lat.max():.0f} µs · dropped {log.dropped}")
+
+        probs = np.random.default_rng(0).random(len(rows))
+        t0 = time.perf_counter()
+        for _ in range(args.records // args.batch):
+            log.record_batch("dropout", rows, probs, threshold=0.5, latency_ms=0.01, version="bench", source="cohort")
+            while log._q.qsize() > 8: time.sleep(0.001)  # a cohort upload's pace: don't outrun the writer
+        log.flush()
+        dt = time.perf_counter() - t0
+        size = sum(p.stat().st_size for p in segments(root, "dropout"))
+        n = sum(len(r) for _, r in scan(root, "dropout"))
+        print(f"batched {args.records:,} rows written in {dt:.2f} s ({args.records / dt / 1e6:.2f} M rows/s) · "
+              f"{n:,} records in {len(segments(root, 'dropout'))} segment(s) · {size / 1e6:.1f} MB ({size / n:.0f} B/record, "
+              f"{rows.memory_usage(index=False).sum() / len(rows):.0f} B as float64/int64 columns)")
+        log.close()
+
+        t0 = time.perf_counter()
+        flagged = sum(int((r["value"] >= r["threshold"]).sum()) for _, r in scan(root, "dropout"))
+        dt = time.perf_counter() - t0
+        print(f"scan    {n:,} records in {dt * 1e3:.0f} ms ({n / dt / 1e6:.1f} M records/s) · {flagged:,} flagged")
+        t0 = time.perf_counter()
+        df = read(root, "dropout", columns=["ts", "value", "version", "Admission_grade", "Debtor"])
+        dt = time.perf_counter() - t0
+        print(f"read    {len(df):,} records × {df.shape[1]} columns decoded in {dt * 1e3:.0f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
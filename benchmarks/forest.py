@@ -0,0 +1,61 @@
+"""Compiled flat-array forest vs ``dropout_pipe.predict_proba``.
+
+    python -m benchmarks.forest
+
+Asserts exact parity of the flat traversal on ``datasets/data.csv``, then reports
+single-row latency (p50/p99) and batch throughput.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from outcomes.forest import compile_pipeline
+from outcomes.ingest import read_dataset
+from outcomes.registry import REGISTRY
+
+from . import ROOT
+
+
+def cohort(schema) -> pd.DataFrame:
+    cols = list(schema["categorical"]) + list(schema["numeric"])
+    return read_dataset(ROOT / "datasets" / "data.csv")[cols]
+
+
+def latency_ms(fn, X, reps: int):
+    fn(X)
+    ts = []
+    for _ in range(reps):
+        t0 = time.perf_counter(); fn(X); ts.append(time.perf_counter() - t0)
+    return np.percentile(ts, 50) * 1e3, np.percentile(ts, 99) * 1e3
+
+
+def main():
+    pipe = REGISTRY.model(ROOT / "models" / "dropout_model.pkl")
+    X = cohort(REGISTRY.json(ROOT / "artifacts" / "schema.json"))
+    t0 = time.perf_counter(); engine = compile_pipeline(pipe); t_compile = time.perf_counter() - t0
+    assert engine is not None, "pipeline has steps the compiled engine does not support"
+
+    same = np.array_equal(pipe.predict_proba(X), engine.forest.predict_proba(engine.pre.transform(X)))
+    print(f"compile: {t_compile * 1e3:.1f} ms · parity on {len(X)} rows: {same}")
+    assert same
+
+    row = X.iloc[[0]]
+    for name, fn in (("sklearn", pipe.predict_proba), ("compiled", engine.predict_proba)):
+        p50, p99 = latency_ms(fn, row, reps=200)
+        print(f"{name:>9} single row: p50={p50:.3f} ms  p99={p99:.3f} ms")
+
+    # "flat" forces the array traversal at every size; "engine" is what the app
+    # serves (flat up to engine.max_rows rows, sklearn above).
+    def flat(Xn): return engine.forest.predict_proba(engine.pre.transform(Xn))
+    print(f"{'rows':>8} {'sklearn rows/s':>15} {'flat rows/s':>12} {'engine rows/s':>14}")
+    for n in (10, 100, 10_000, 100_000):
+        Xn = X.sample(n, replace=True, random_state=n)
+        rates = []
+        for fn in (pipe.predict_proba, flat, engine.predict_proba):
+            t0 = time.perf_counter(); fn(Xn); rates.append(n / (time.perf_counter() - t0))
+        print(f"{n:>8} {rates[0]:>15,.0f} {rates[1]:>12,.0f} {rates[2]:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
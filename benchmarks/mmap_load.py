@@ -0,0 +1,89 @@
+"""Cold start and resident memory: pickled pipelines vs memory-mapped exports.
+
+    python -m outcomes.mmap_store          # create models/*.mm/ first
+    python -m benchmarks.mmap_load [--workers 4]
+
+Each layout is measured in fresh interpreters (the first time per layout warms
+the page cache, so these are warm-cache cold starts): import, load of both
+models, first drop-out prediction, and RSS split into private (RssAnon) and
+file-backed (RssFile) pages. ``--workers`` processes then hold the drop-out
+model concurrently; their summed PSS shows how much is shared between them.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from . import ROOT
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import pandas as pd
+from outcomes.batch import clean_cols
+from outcomes.registry import REGISTRY
+t1 = time.perf_counter()
+drop = REGISTRY.model(sys.argv[1]); REGISTRY.model(sys.argv[2])
+t2 = time.perf_counter()
+schema = REGISTRY.json(sys.argv[3])
+cols = list(schema["categorical"]) + list(schema["numeric"])
+row = clean_cols(pd.read_csv(sys.argv[4], sep=";", nrows=1))[cols]
+drop.predict_proba(row)
+t3 = time.perf_counter()
+status = dict(l.split(":", 1) for l in open("/proc/self/status"))
+kb = lambda k: int(status[k].split()[0]) / 1024
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "load_ms": (t2 - t1) * 1e3, "first_predict_ms": (t3 - t2) * 1e3,
+                  "rss_anon_mb": kb("RssAnon"), "rss_file_mb": kb("RssFile")}), flush=True)
+if len(sys.argv) > 5:  # hold the model so the parent can read smaps_rollup
+    drop.predict_proba(pd.concat([row] * 256)); sys.stdin.read()
+"""
+
+
+def paths(layout: str):
+    m = ROOT / "models"
+    ext = ".pkl" if layout == "pickle" else ".mm"
+    return [str(m / f"dropout_model{ext}"), str(m / f"g3_model{ext}"),
+            str(ROOT / "artifacts" / "schema.json"), str(ROOT / "datasets" / "data.csv")]
+
+
+def run_once(layout: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", CHILD, *paths(layout)], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def pss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        return next(int(l.split()[1]) for l in f if l.startswith("Pss:")) / 1024
+
+
+def concurrent(layout: str, workers: int) -> float:
+    procs = [subprocess.Popen([sys.executable, "-c", CHILD, *paths(layout), "hold"], cwd=ROOT,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+    try:
+        for p in procs: p.stdout.readline()
+        return sum(pss_mb(p.pid) for p in procs)
+    finally:
+        for p in procs:
+            p.stdin.close(); p.wait()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args(argv)
+    if not (ROOT / "models" / "dropout_model.mm" / "manifest.json").exists():
+        sys.exit("no memory-mapped export found; run `python -m outcomes.mmap_store` first")
+
+    keys = ("import_ms", "load_ms", "first_predict_ms", "rss_anon_mb", "rss_file_mb")
+    print(f"{'layout':>7} " + " ".join(f"{k:>16}" for k in keys) + f" {'PSS x' + str(args.workers) + ' (MB)':>16}")
+    for layout in ("pickle", "mmap"):
+        run_once(layout)  # warm the page cache
+        runs = [run_once(layout) for _ in range(args.reps)]
+        med = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in keys}
+        pss = concurrent(layout, args.workers)
+        print(f"{layout:>7} " + " ".join(f"{med[k]:>16.1f}" for k in keys) + f" {pss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
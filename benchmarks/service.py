@@ -0,0 +1,105 @@
+"""Load test for the local scoring service: concurrent single-row clients, with and without micro-batching.
+
+    python -m benchmarks.service [--clients 32] [--requests 200] [--windows 0 2 5]
+
+Starts ``python -m outcomes.service`` in its own process (so clients don't share
+its GIL) on a free localhost port for each window setting, lets ``--clients`` threads post ``--requests`` single-row drop-out
+requests each over keep-alive connections, and reports request throughput,
+client-side latency and the server's mean batch size and peak queue depth.
+"""
+import argparse
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from outcomes.registry import REGISTRY
+
+from . import ROOT
+from .suite import dropout_rows
+
+
+def client(port: int, bodies: list, latencies: list):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for body in bodies:
+        t0 = time.perf_counter()
+        conn.request("POST", "/v1/dropout", body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse(); resp.read()
+        assert resp.status == 200, resp.status
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_json(port: int, path: str) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def start_server(window_ms: float) -> tuple:
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, "-m", "outcomes.service", "--port", str(port), "--window-ms", str(window_ms)],
+                            cwd=ROOT, stdout=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            get_json(port, "/healthz")
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("scoring service did not start")
+
+
+def run(window_ms: float, clients: int, requests: int, rows: list) -> dict:
+    proc, port = start_server(window_ms)
+    try:
+        client(port, rows[:20], [])  # warm-up: model load and compile
+        before = get_json(port, "/metrics")["dropout"]
+        latencies = []
+        threads = [threading.Thread(target=client, args=(port, [rows[(c * requests + i) % len(rows)] for i in range(requests)], latencies))
+                   for c in range(clients)]
+        t0 = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        elapsed = time.perf_counter() - t0
+        m = get_json(port, "/metrics")["dropout"]
+    finally:
+        proc.terminate(); proc.wait()
+    lat = np.asarray(latencies) * 1e3
+    return {"window_ms": window_ms, "req_per_s": len(lat) / elapsed, "p50_ms": np.percentile(lat, 50),
+            "p95_ms": np.percentile(lat, 95), "mean_batch": (m["rows"] - before["rows"]) / max(m["batches"] - before["batches"], 1),
+            "max_queue": m["max_queue_depth"]}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=200, help="per client")
+    ap.add_argument("--windows", type=float, nargs="+", default=[0.0, 2.0, 5.0])
+    args = ap.parse_args(argv)
+    schema = REGISTRY.json(ROOT / "artifacts" / "schema.json")
+    rows = [json.dumps(r) for r in dropout_rows(2000, schema).to_dict("records")]
+    print(f"{args.clients} clients × {args.requests} single-row requests")
+    print(f"{'window':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch':>7} {'max q':>6}")
+    for w in args.windows:
+        r = run(w, args.clients, args.requests, rows)
+        print(f"{r['window_ms']:>7.1f} {r['req_per_s']:>9,.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['mean_batch']:>7.1f} {r['max_queue']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Startup cost of ``app.py``: lazy model loading vs eager (``OUTCOMES_PRELOAD=1``).
+
+    python -m benchmarks.startup [--reps 3]
+
+Each measurement runs the app headless (``streamlit.testing.v1.AppTest``) in a
+fresh interpreter under ``-X importtime``. Reported per mode (medians):
+
+* ``import_ms``   time spent importing modules during the first script run
+* ``paint_ms``    first script run, i.e. time until the forms and About tab are sent
+* ``sklearn``     whether sklearn was imported by the first run
+* ``g3_ms`` / ``dropout_ms``  first G3 then first drop-out prediction (includes any model load)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from . import ROOT
+
+CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+print("--- first run ---", file=sys.stderr, flush=True)
+t0 = time.perf_counter(); at.run(); t1 = time.perf_counter()
+print("--- end ---", file=sys.stderr, flush=True)
+assert not at.exception, at.exception
+sk = "sklearn" in sys.modules
+def predict(i):
+    t = time.perf_counter()
+    [b for b in at.button if "Predict" in str(b.label)][i].click().run()
+    assert not at.exception, at.exception
+    return (time.perf_counter() - t) * 1e3
+g3 = predict(1); drop = predict(0)
+print(json.dumps({"paint_ms": (t1 - t0) * 1e3, "sklearn": sk, "g3_ms": g3, "dropout_ms": drop}))
+"""
+
+
+def import_ms(stderr: str) -> float:
+    """Sum of ``-X importtime`` self times between the first-run markers."""
+    inside, total_us = False, 0
+    for line in stderr.splitlines():
+        if line.startswith("--- first run"): inside = True
+        elif line.startswith("--- end"): break
+        elif inside and line.startswith("import time:") and "|" in line:
+            field = line.split(":", 1)[1].split("|")[0].strip()
+            if field.isdigit(): total_us += int(field)
+    return total_us / 1e3
+
+
+def run_once(preload: bool) -> dict:
+    env = {**os.environ, "OUTCOMES_PRELOAD": "1" if preload else "0"}
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD, str(ROOT / "app.py")],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return {"import_ms": import_ms(out.stderr), **json.loads(out.stdout.strip().splitlines()[-1])}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reps", type=int, default=3)
+    args = ap.parse_args(argv)
+    layout = "mmap" if (ROOT / "models" / "dropout_model.mm" / "manifest.json").exists() else "pickle"
+    keys = ("import_ms", "paint_ms", "g3_ms", "dropout_ms")
+    print(f"model layout: {layout}")
+    print(f"{'mode':>6} " + " ".join(f"{k:>11}" for k in keys) + f" {'sklearn':>8}")
+    for mode, preload in (("eager", True), ("lazy", False)):
+        runs = [run_once(preload) for _ in range(args.reps)]
+        med = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in keys}
+        print(f"{mode:>6} " + " ".join(f"{med[k]:>11.0f}" for k in keys) + f" {str(runs[0]['sklearn']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Serving benchmark suite with JSON results and baseline comparison.
+
+    python -m benchmarks.suite                      # writes benchmarks/results/latest.json
+    python -m benchmarks.suite --save-baseline      # ...and stores it as benchmarks/baseline.json
+    python -m benchmarks.suite --quick              # smaller batches / fewer repetitions
+
+Inputs are synthetic rows drawn from the form domains (``schema.json`` codes,
+``RANGES`` / ``G3_RANGES``, ``G3_CATEGORY``), so any retrained model with the same
+schema can be measured. For ``dropout_pipe.predict_proba``, the compiled engine
+the app serves, and ``g3_pipe.predict`` the suite records cold start (fresh
+interpreter: import + load), single-row p50/p99 latency, throughput at 1, 100,
+10k and 100k rows, and peak traced memory of the largest batch.
+
+When a baseline exists every metric is compared with it and changes worse than
+``--tolerance`` are flagged; the exit status is 1 if any regressed. Baselines
+are machine-specific, so store one per machine rather than committing it.
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from outcomes.fields import G3_CATEGORY, G3_RANGES, RANGES
+from outcomes.forest import compile_pipeline
+from outcomes.registry import REGISTRY
+
+from . import ROOT
+from .forest import latency_ms
+
+SIZES = (1, 100, 10_000, 100_000)
+QUICK_SIZES = (1, 100, 10_000)
+
+COLD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+from outcomes.registry import REGISTRY
+t1 = time.perf_counter()
+REGISTRY.model(sys.argv[1])
+t2 = time.perf_counter()
+print(json.dumps({"cold_import_ms": (t1 - t0) * 1e3, "cold_load_ms": (t2 - t1) * 1e3,
+                  "cold_max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _grid(rng, lo, hi, step, n):
+    return lo + rng.integers(0, int(round((hi - lo) / step)) + 1, n) * step
+
+
+def dropout_rows(n: int, schema: dict, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {c: rng.choice(np.asarray(codes, dtype=int), n) for c, codes in schema["categorical"].items()}
+    for c in schema["numeric"]:
+        data[c] = np.round(_grid(rng, *RANGES[c], n), 1).astype(float)
+    return pd.DataFrame(data, columns=list(schema["categorical"]) + list(schema["numeric"]))
+
+
+def g3_rows(n: int, g3_defaults: dict, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for c, dv in g3_defaults.items():
+        if c in G3_CATEGORY: data[c] = rng.choice(G3_CATEGORY[c], n)
+        elif c in G3_RANGES: data[c] = _grid(rng, *G3_RANGES[c], n).astype(float)
+        else: data[c] = np.full(n, dv)
+    return pd.DataFrame(data, columns=list(g3_defaults))
+
+
+def cold_start(path, runs: int = 3) -> dict:
+    """Median of ``runs`` fresh interpreters (warm page cache)."""
+    out = [json.loads(subprocess.run([sys.executable, "-c", COLD, str(path)], cwd=ROOT, capture_output=True,
+                                     text=True, check=True).stdout) for _ in range(runs)]
+    return {k: float(np.median([o[k] for o in out])) for k in out[0]}
+
+
+def throughput(fn, X, min_seconds: float, windows: int = 3) -> float:
+    """Best rows/s over ``windows`` timing windows of at least ``min_seconds`` each (as ``timeit`` does)."""
+    fn(X)
+    best = 0.0
+    for _ in range(windows):
+        calls, t0 = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - t0) < min_seconds:
+            fn(X); calls += 1
+        best = max(best, calls * len(X) / elapsed)
+    return best
+
+
+def peak_mb(fn, X) -> float:
+    tracemalloc.start()
+    try:
+        fn(X)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, rows, sizes, reps: int, min_seconds: float) -> dict:
+    p50, p99 = latency_ms(fn, rows(1), reps=reps)
+    return {"p50_ms": p50, "p99_ms": p99,
+            "rows_per_s": {str(n): throughput(fn, rows(n), min_seconds) for n in sizes},
+            "peak_mb": peak_mb(fn, rows(sizes[-1]))}
+
+
+def run(quick: bool = False) -> dict:
+    sizes, reps, min_seconds = (QUICK_SIZES, 50, 0.1) if quick else (SIZES, 300, 0.3)
+    schema = REGISTRY.json(ROOT / "artifacts" / "schema.json")
+    g3_defaults = REGISTRY.json(ROOT / "artifacts" / "g3_defaults.json")
+    drop_path, g3_path = ROOT / "models" / "dropout_model.pkl", ROOT / "models" / "g3_model.pkl"
+    dropout_pipe, g3_pipe = REGISTRY.model(drop_path), REGISTRY.model(g3_path)
+    engine = compile_pipeline(dropout_pipe)
+
+    cache = {}
+    def rows(make, *args):
+        return lambda n: cache.setdefault((make.__name__, n), make(n, *args))
+    drop_rows, g3 = rows(dropout_rows, schema), rows(g3_rows, g3_defaults)
+
+    results = {"dropout_pipe.predict_proba": {**cold_start(drop_path),
+                                               **measure(dropout_pipe.predict_proba, drop_rows, sizes, reps, min_seconds)}}
+    if engine is not None:
+        results["dropout_engine.predict_proba"] = measure(engine.predict_proba, drop_rows, sizes, reps, min_seconds)
+    results["g3_pipe.predict"] = {**cold_start(g3_path), **measure(g3_pipe.predict, g3, sizes, reps, min_seconds)}
+
+    import sklearn
+    return {"meta": {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                     "sklearn": sklearn.__version__, "machine": platform.machine(), "quick": quick,
+                     "models": {"dropout": REGISTRY.version(drop_path), "g3": REGISTRY.version(g3_path)},
+                     "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024},
+            "results": results}
+
+
+def flatten(results: dict) -> dict:
+    flat = {}
+    for target, metrics in results.items():
+        for k, v in metrics.items():
+            if isinstance(v, dict): flat.update({f"{target}.{k}@{n}": x for n, x in v.items()})
+            else: flat[f"{target}.{k}"] = v
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Per-metric change vs the baseline; ``rows_per_s`` regresses when it drops, everything else when it rises."""
+    cur, base = flatten(current["results"]), flatten(baseline["results"])
+    rows = []
+    for key in cur.keys() & base.keys():
+        if base[key] <= 0: continue
+        ratio = cur[key] / base[key]
+        worse = (1 / ratio if ".rows_per_s" in key else ratio) - 1
+        rows.append({"metric": key, "baseline": base[key], "current": cur[key], "change": ratio - 1,
+                     "regression": bool(worse > tolerance)})
+    return sorted(rows, key=lambda r: r["metric"])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--out", type=Path, default=ROOT / "benchmarks" / "results" / "latest.json")
+    ap.add_argument("--baseline", type=Path, default=ROOT / "benchmarks" / "baseline.json")
+    ap.add_argument("--save-baseline", action="store_true", help="also write this run to --baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="relative change counted as a regression")
+    ap.add_argument("--quick", action="store_true")
+    args = ap.parse_args(argv)
+
+    report = run(quick=args.quick)
+    for target, m in report["results"].items():
+        rates = " ".join(f"{n}:{r:,.0f}" for n, r in m["rows_per_s"].items())
+        print(f"{target:<30} p50={m['p50_ms']:.3f}ms p99={m['p99_ms']:.3f}ms peak={m['peak_mb']:.1f}MB rows/s {rates}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        report["comparison"] = {"baseline": baseline["meta"], "tolerance": args.tolerance,
+                                "metrics": compare(report, baseline, args.tolerance)}
+        regressions = [r for r in report["comparison"]["metrics"] if r["regression"]]
+        print(f"\nvs baseline {args.baseline.name} ({baseline['meta']['timestamp']}), tolerance {args.tolerance:.0%}:")
+        for r in report["comparison"]["metrics"]:
+            flag = "  REGRESSION" if r["regression"] else ""
+            print(f"  {r['metric']:<58} {r['baseline']:>14,.3f} → {r['current']:>14,.3f} ({r['change']:+.1%}){flag}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=1))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=1))
+        print(f"baseline saved to {args.baseline}")
+    print(f"results written to {args.out}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Winsorizer: array-backed ``transform`` vs the notebook's per-column DataFrame loop.
+
+    python -m benchmarks.winsorizer
+
+Checks bit-identical output on ``datasets/data.csv`` and on synthetic blocks with
+out-of-range values, then times both implementations at 1 and 100k rows.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from outcomes.ingest import read_dataset
+from outcomes.registry import REGISTRY
+from outcomes.transformers import Winsorizer
+
+from . import ROOT
+
+
+def legacy_transform(w: Winsorizer, X):
+    df = pd.DataFrame(X, columns=w.cols if w.cols else None)
+    for col in df.columns:
+        low, up = w.bounds_[col]
+        df[col] = df[col].clip(lower=low, upper=up)
+    return df.values
+
+
+def fitted_winsorizer() -> Winsorizer:
+    """The fitted step from models/dropout_model.pkl, or a fresh fit on data.csv if the model is absent."""
+    path = ROOT / "models" / "dropout_model.pkl"
+    if path.exists():
+        pipe = REGISTRY.model(path)
+        return pipe.named_steps["pre"].named_transformers_["num"].named_steps["winsor"]
+    num_cols = REGISTRY.json(ROOT / "artifacts" / "schema.json")["numeric"]
+    return Winsorizer(cols=num_cols).fit(load_numeric(num_cols))
+
+
+def load_numeric(num_cols) -> pd.DataFrame:
+    return read_dataset(ROOT / "datasets" / "data.csv")[num_cols]
+
+
+def synthetic(num_cols, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    real = load_numeric(num_cols)
+    lo, hi = real.min().to_numpy(), real.max().to_numpy()
+    span = np.maximum(hi - lo, 1.0)
+    return pd.DataFrame(rng.uniform(lo - span, hi + span, size=(n, len(num_cols))), columns=num_cols)
+
+
+def main():
+    w = fitted_winsorizer()
+    cols = list(w.cols)
+    for name, X in [("data.csv", load_numeric(cols)), ("synthetic", synthetic(cols, 10_000))]:
+        same = np.array_equal(legacy_transform(w, X), w.transform(X), equal_nan=True)
+        print(f"bit-identical on {name:<10}: {same}")
+        assert same
+    print(f"{'rows':>8} {'legacy ms':>11} {'array ms':>10} {'speedup':>8}")
+    for n in (1, 100_000):
+        X = synthetic(cols, n, seed=n)
+        reps = 2000 if n == 1 else 20
+        t_old = min(timeit.repeat(lambda: legacy_transform(w, X), number=reps, repeat=3)) / reps
+        t_new = min(timeit.repeat(lambda: w.transform(X), number=reps, repeat=3)) / reps
+        print(f"{n:>8} {t_old * 1e3:>11.3f} {t_new * 1e3:>10.3f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Serving & training helpers shared by the Streamlit app and command-line tools."""
@@ -0,0 +1,337 @@
+"""Non-blocking, append-only audit log of predictions.
+
+    python -m outcomes.audit                      # records, segments and size per model, plus a full scan
+    python -m outcomes.audit --kind g3 --tail 20  # the latest records, decoded
+
+``AUDIT.record(kind, row, value, ...)`` (``record_batch`` for a scored frame)
+only puts the item on a bounded queue. When the queue is full the item is
+dropped and counted, never waited for, so a Streamlit rerun does not touch the
+disk. A writer thread drains the queue and appends to the current segment of
+that model at most every ``flush_seconds`` (or every ``batch_records``).
+
+Records are fixed-width binary rows, one column per field, each stored in the
+narrowest lossless type for what it has seen: integers (and integral floats)
+as int8/16/32, other numbers as float64, strings and model versions as uint16
+codes into per-segment dictionaries. A segment is ``<kind>/<start>-<seq>.bin``
+(the records) plus ``.json`` (layout and dictionaries; replaced before any
+record that needs a new entry is written). It rolls over after
+``segment_records`` records, ``segment_seconds`` of age, or when a column needs
+a wider type.
+
+``scan`` memory-maps each segment as a NumPy structured array (a torn trailing
+record is ignored), so reading millions of records costs about one pass over
+the files; ``read`` decodes the chosen columns into a DataFrame.
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+AUDIT_DIR = Path(__file__).resolve().parent.parent / "audit"
+META = [("ts", "<f8"), ("latency_ms", "<f4"), ("threshold", "<f4"), ("value", "<f8"), ("version", "<u2"), ("source", "<u2")]
+STORES = ("<i1", "<i2", "<i4", "<f8")  # numeric stores, narrowest first; "dict" holds strings
+_LIMITS = {"<i1": np.iinfo(np.int8), "<i2": np.iinfo(np.int16), "<i4": np.iinfo(np.int32)}
+_FLUSH, _STOP = object(), object()
+
+
+def store_for(values: np.ndarray) -> str:
+    """Narrowest store that holds every value of one column exactly."""
+    if values.dtype.kind in "OUS":
+        return "dict"
+    v = values.astype(np.float64) if values.dtype.kind == "b" else values
+    if not len(v):
+        return STORES[0]
+    if v.dtype.kind == "f" and not (np.isfinite(v).all() and (v == np.round(v)).all()):
+        return "<f8"
+    lo, hi = v.min(), v.max()
+    return next((s for s, lim in _LIMITS.items() if lim.min <= lo and hi <= lim.max), "<f8")
+
+
+def wider(a: str, b: str) -> str:
+    if "dict" in (a, b):
+        return "dict"
+    return max(a, b, key=STORES.index)
+
+
+class _Segment:
+    def __init__(self, base: Path, kind: str, columns: list):
+        """``columns``: ``[(name, store, pandas dtype)]`` for the input fields."""
+        self.bin, self.header = base.with_suffix(".bin"), base.with_suffix(".json")
+        self.kind, self.columns, self.started = kind, columns, time.time()
+        self.stores = {c: s for c, s, _ in columns}
+        self.dtype = np.dtype(META + [(c, "<u2" if s == "dict" else s) for c, s, _ in columns])
+        self.dicts = {name: [] for name in ["version", "source"] + [c for c, s, _ in columns if s == "dict"]}
+        self._index = {name: {} for name in self.dicts}
+        self.records = 0
+        self._write_header()
+        self.f = open(self.bin, "ab")
+
+    def _write_header(self):
+        tmp = self.header.with_name(self.header.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"format": FORMAT_VERSION, "kind": self.kind, "started": self.started,
+                       "fields": [[n, t] for n, t in self.dtype.descr],
+                       "columns": [{"name": c, "store": s, "dtype": d} for c, s, d in self.columns],
+                       "dictionaries": self.dicts}, f)
+        os.replace(tmp, self.header)
+
+    def codes(self, name: str, values) -> tuple:
+        """``(uint16 codes, grew)``: dictionary codes for ``values``, adding unseen ones."""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object).astype(str), sort=False)
+        index, grew = self._index[name], False
+        for u in uniques:
+            if u not in index:
+                if len(index) >= 65535:
+                    raise OverflowError(f"more than 65535 distinct values in {name!r}")
+                index[u] = len(index); self.dicts[name].append(u); grew = True
+        return np.asarray([index[u] for u in uniques], dtype=np.uint16)[codes], grew
+
+    def fits(self, frame: pd.DataFrame) -> bool:
+        return (list(frame.columns) == [c for c, _, _ in self.columns]
+                and all(wider(self.stores[c], store_for(frame[c].to_numpy())) == self.stores[c] for c in frame.columns))
+
+    def append(self, frame: pd.DataFrame, meta: dict, counts: np.ndarray):
+        """``meta``: per-row ``value`` plus per-item ``ts``, ``latency_ms``, ``threshold``, ``version``, ``source``; ``counts``: rows per item."""
+        rec = np.empty(len(frame), dtype=self.dtype)
+        grew = False
+        rec["value"] = meta["value"]
+        for name in ("ts", "latency_ms", "threshold"):
+            rec[name] = np.repeat(meta[name], counts)
+        for name in ("version", "source"):
+            codes, g = self.codes(name, meta[name]); grew |= g
+            rec[name] = np.repeat(codes, counts)
+        for c, s, _ in self.columns:
+            if s == "dict":
+                rec[c], g = self.codes(c, frame[c].to_numpy()); grew |= g
+            else:
+                rec[c] = frame[c].to_numpy()
+        if grew:
+            self._write_header()  # dictionaries land before the records that use them
+        self.f.write(rec.tobytes())
+        self.records += len(rec)
+
+    def close(self):
+        self.f.close()
+
+
+class AuditLog:
+    """Bounded queue in front of one writer thread (started on the first record)."""
+
+    def __init__(self, root: Path = AUDIT_DIR, queue_size: int = 10000, flush_seconds: float = 1.0,
+                 batch_records: int = 4096, segment_records: int = 1_000_000, segment_seconds: float = 3600.0):
+        self.root = Path(root)
+        self.flush_seconds, self.batch_records = flush_seconds, batch_records
+        self.segment_records, self.segment_seconds = segment_records, segment_seconds
+        self._q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._segments: dict[str, _Segment] = {}
+        self._seq = 0
+        self.enqueued = self.dropped = self.written = self.failed = 0
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _put(self, item) -> bool:
+        if self._thread is None:
+            self._start()
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            with self._lock: self.dropped += 1
+            return False
+        with self._lock: self.enqueued += 1
+        return True
+
+    def record(self, kind: str, row: dict, value: float, threshold: float = float("nan"), latency_ms: float = 0.0,
+               version: str = "", source: str = "") -> bool:
+        """Queue one prediction; ``False`` if the queue was full and the record was dropped."""
+        return self._put((kind, time.time(), row, value, threshold, latency_ms, version, source))
+
+    def record_batch(self, kind: str, frame: pd.DataFrame, values, threshold: float = float("nan"),
+                     latency_ms: float = 0.0, version: str = "", source: str = "") -> bool:
+        """Queue a scored frame as one item (``latency_ms`` is per row)."""
+        return self._put((kind, time.time(), frame, np.asarray(values, dtype=np.float64), threshold, latency_ms, version, source))
+
+    def flush(self, timeout: float = 10.0):
+        """Block until everything queued so far is on disk (for tools and benchmarks, not the app)."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._q.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        pending, rows, opened = [], 0, 0.0  # opened: when the oldest pending item arrived
+        while True:
+            timeout = max(0.0, self.flush_seconds - (time.monotonic() - opened)) if pending else None
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            control = item is _STOP or (isinstance(item, tuple) and item[0] is _FLUSH)
+            if item is not None and not control:
+                if not pending: opened = time.monotonic()
+                pending.append(item)
+                rows += len(item[2]) if isinstance(item[2], pd.DataFrame) else 1
+            if pending and (item is None or control or rows >= self.batch_records
+                            or time.monotonic() - opened >= self.flush_seconds):
+                self._write(pending)
+                pending, rows = [], 0
+            if item is _STOP:
+                for seg in self._segments.values(): seg.close()
+                self._segments.clear()
+                return
+            if control:
+                item[1].set()
+
+    def _write(self, items: list):
+        by_kind: dict[str, list] = {}
+        for it in items:
+            by_kind.setdefault(it[0], []).append(it)
+        for kind, its in by_kind.items():
+            frames, singles, values = [], [], []
+            for _, _, rows, value, *_ in its:
+                if isinstance(rows, pd.DataFrame):
+                    if singles: frames.append(pd.DataFrame(singles)); singles = []
+                    frames.append(rows.reset_index(drop=True)); values.append(value)
+                else:
+                    singles.append(rows); values.append([value])
+            if singles: frames.append(pd.DataFrame(singles))
+            counts = np.array([len(it[2]) if isinstance(it[2], pd.DataFrame) else 1 for it in its])
+            meta = {name: [it[k] for it in its] for k, name in ((1, "ts"), (4, "threshold"), (5, "latency_ms"),
+                                                               (6, "version"), (7, "source"))}
+            meta["value"] = np.concatenate([np.asarray(v, dtype=np.float64) for v in values])
+            try:
+                frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+                seg = self._segments.get(kind)
+                if seg is not None and set(frame.columns) == set(seg.stores):  # same fields in another order
+                    frame = frame[[c for c, _, _ in seg.columns]]
+                seg = self._segment_for(kind, frame)
+                seg.append(frame, meta, counts)
+                seg.f.flush()
+                self.written += len(frame)
+            except (OSError, ValueError, TypeError, OverflowError):
+                self.failed += int(counts.sum())
+
+    def _segment_for(self, kind: str, frame: pd.DataFrame) -> _Segment:
+        seg = self._segments.get(kind)
+        if seg is not None and seg.fits(frame) and seg.records < self.segment_records \
+                and time.time() - seg.started < self.segment_seconds:
+            return seg
+        stores = {c: store_for(frame[c].to_numpy()) for c in frame.columns}
+        if seg is not None:
+            seg.close()
+            if list(frame.columns) == [c for c, _, _ in seg.columns]:  # keep widths already seen
+                stores = {c: wider(s, seg.stores[c]) for c, s in stores.items()}
+        (self.root / kind).mkdir(parents=True, exist_ok=True)
+        self._seq += 1
+        base = self.root / kind / f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self._seq:05d}"
+        self._segments[kind] = _Segment(base, kind, [(c, stores[c], str(frame[c].dtype)) for c in frame.columns])
+        return self._segments[kind]
+
+    def stats(self) -> list[dict]:
+        """Counters plus, per model, the records and bytes on disk."""
+        out = []
+        for kind in sorted(p.name for p in self.root.iterdir() if p.is_dir()) if self.root.exists() else []:
+            segs = segments(self.root, kind)
+            out.append({"model": kind, "segments": len(segs), "mb": sum(p.stat().st_size for p in segs) / 1e6,
+                        "records": sum(len(r) for _, r in scan(self.root, kind))})
+        return [{**row, "enqueued": self.enqueued, "dropped": self.dropped, "written": self.written,
+                 "failed": self.failed, "queue": self._q.qsize()} for row in out]
+
+
+def segments(root: Path = AUDIT_DIR, kind: str = "dropout") -> list:
+    return sorted((Path(root) / kind).glob("*.bin"))
+
+
+def scan(root: Path = AUDIT_DIR, kind: str = "dropout"):
+    """Yield ``(header, records)`` per segment, oldest first; ``records`` is a read-only memory-mapped structured array."""
+    for path in segments(root, kind):
+        try:
+            with open(path.with_suffix(".json")) as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            continue
+        dtype = np.dtype([tuple(x) for x in header["fields"]])
+        n = path.stat().st_size // dtype.itemsize
+        if n:
+            yield header, np.memmap(path, dtype=dtype, mode="r", shape=(n,))
+
+
+def decode(header: dict, records: np.ndarray, columns=None) -> pd.DataFrame:
+    dicts = header["dictionaries"]
+    dtypes = {c["name"]: c["dtype"] for c in header["columns"]}
+    out = {}
+    for c in columns or records.dtype.names:
+        if c not in records.dtype.names:
+            continue
+        v = records[c]
+        if c in dicts:
+            out[c] = np.asarray(dicts[c], dtype=object)[v]
+        elif c == "ts":
+            out[c] = pd.to_datetime(v, unit="s")
+        else:
+            out[c] = v.astype(dtypes.get(c, v.dtype))
+    return pd.DataFrame(out)
+
+
+def read(root: Path = AUDIT_DIR, kind: str = "dropout", columns=None, since: "float | None" = None) -> pd.DataFrame:
+    """Decoded records of ``kind`` (``columns`` only, when given), optionally those with ``ts >= since``."""
+    parts = []
+    for header, rec in scan(root, kind):
+        if since is not None:
+            rec = rec[rec["ts"] >= since]
+        if len(rec):
+            parts.append(decode(header, rec, columns))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--root", type=Path, default=AUDIT_DIR)
+    ap.add_argument("--kind", default=None, help="dropout or g3 (default: every model)")
+    ap.add_argument("--tail", type=int, default=0, help="also print the latest N records")
+    args = ap.parse_args(argv)
+    kinds = [args.kind] if args.kind else sorted(p.name for p in args.root.iterdir() if p.is_dir()) if args.root.exists() else []
+    if not kinds:
+        print(f"no audit records under {args.root}")
+    for kind in kinds:
+        segs = segments(args.root, kind)
+        t0 = time.perf_counter()
+        n = flagged = 0
+        for header, rec in scan(args.root, kind):  # a full pass over one column per segment
+            n += len(rec); flagged += int((rec["value"] >= rec["threshold"]).sum())
+        dt = time.perf_counter() - t0
+        size = sum(p.stat().st_size for p in segs)
+        print(f"{kind}: {n:,} records in {len(segs)} segment(s), {size / 1e6:.1f} MB "
+              f"({size / max(n, 1):.0f} B/record) · scanned in {dt * 1e3:.1f} ms ({n / max(dt, 1e-9) / 1e6:.1f} M records/s)"
+              + (f" · {flagged:,} at/above threshold" if kind == "dropout" else ""))
+        if args.tail:
+            with pd.option_context("display.width", 200, "display.max_columns", 12):
+                print(read(args.root, kind).tail(args.tail))
+
+
+# One audit log per server process, shared by every Streamlit session.
+AUDIT = AuditLog()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Chunked, validated cohort scoring for CSV extracts in the ``datasets/data.csv`` layout."""
+import os
+import tempfile
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .validate import validate
+
+
+def clean_cols(df: pd.DataFrame) -> pd.DataFrame:
+    """Header normalization used by the training notebook (``"Daytime/evening attendance\\t"`` -> ``Daytimeevening_attendance``)."""
+    df = df.copy()
+    df.columns = (df.columns
+                  .str.strip()
+                  .str.replace(r'[\s\t]+', '_', regex=True)
+                  .str.replace(r'[^0-9A-Za-z_]', '', regex=True))
+    return df
+
+
+def iter_chunks(src, chunksize: int = 5000, sep: str = ";"):
+    """Yield header-normalized frames of at most ``chunksize`` rows from a path or file-like object."""
+    for chunk in pd.read_csv(src, sep=sep, chunksize=chunksize, encoding="utf-8-sig"):
+        yield clean_cols(chunk)
+
+
+def _unlink_all(paths: list):
+    for path in paths:
+        try: os.unlink(path)
+        except FileNotFoundError: pass
+    paths.clear()
+
+
+class ScratchFiles:
+    """Temp CSVs owned by one session; deleted on ``close`` or when the holder is garbage collected (or at exit)."""
+
+    def __init__(self, prefix: str = "outcomes-"):
+        self.prefix = prefix
+        self.paths = []
+        self._finalizer = weakref.finalize(self, _unlink_all, self.paths)
+
+    def open(self, suffix: str = ".csv"):
+        """A new text file, open for writing; it lives as long as this holder."""
+        f = tempfile.NamedTemporaryFile("w", prefix=self.prefix, suffix=suffix, delete=False, newline="")
+        self.paths.append(f.name)
+        return f
+
+    def close(self):
+        self._finalizer()
+
+
+def score_cohort(src, pipe, rules: dict, threshold: float, out, policy: str = "default", errors_out=None,
+                 chunksize: int = 5000, sep: str = ";", audit=None) -> dict:
+    """Validate and score ``src`` chunk by chunk and append CSV results to the text stream ``out``.
+
+    Only one chunk is held in memory at a time. Each chunk goes through
+    ``validate.validate`` with ``policy``; rejected rows are left out of the
+    results, and the per-cell error report is appended to ``errors_out`` when
+    given. Columns that are not model features (e.g. an ID or ``Target``) are
+    passed through next to the probability and flag. ``audit(frame, prob, seconds)``
+    is called with every scored chunk.
+    """
+    summary = {"rows": 0, "scored": 0, "rejected": 0, "flagged": 0, "chunks": 0, "missing_columns": [],
+               "filled_cells": 0, "clipped_cells": 0, "problems": {}}
+    for i, chunk in enumerate(iter_chunks(src, chunksize=chunksize, sep=sep)):
+        chunk.index = range(summary["rows"], summary["rows"] + len(chunk))
+        v = validate(chunk, rules, policy=policy, row_offset=summary["rows"])
+        if i == 0:
+            summary["missing_columns"] = v.missing_columns
+        t0 = time.perf_counter()
+        prob = pipe.predict_proba(v.frame)[:, 1] if len(v.frame) else np.empty(0)
+        if audit is not None and len(v.frame):
+            audit(v.frame, prob, time.perf_counter() - t0)
+        res = chunk.loc[v.kept, [c for c in chunk.columns if c not in rules]]
+        res.insert(0, "row", res.index)
+        res["dropout_probability"] = prob.round(6)
+        res["flag"] = (prob >= threshold).astype(int)
+        res.to_csv(out, index=False, header=(i == 0))
+        if errors_out is not None:
+            v.errors.to_csv(errors_out, index=False, header=(i == 0))
+        for (col, problem), k in v.errors.groupby(["column", "problem"], sort=False).size().items():
+            summary["problems"][f"{col}: {problem}"] = summary["problems"].get(f"{col}: {problem}", 0) + int(k)
+        summary["filled_cells"] += int((v.errors["action"] == "filled").sum())
+        summary["clipped_cells"] += int((v.errors["action"] == "clipped").sum())
+        summary["rows"] += len(chunk); summary["scored"] += len(v.frame); summary["rejected"] += v.rejected
+        summary["flagged"] += int(res["flag"].sum()); summary["chunks"] += 1
+    return summary
@@ -0,0 +1,65 @@
+"""Process-wide LRU memos, shared by every session in the process.
+
+Single-row predictions have one cache per model. Explanations, what-if sweeps,
+the Quick-mode surrogate's teacher check and cohort curves each get a small
+cache of their own, so they never evict predictions and their hit rates are
+reported separately (About tab).
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def row_key(row: dict, version: str = "") -> str:
+    """Canonical hash of a typed input row (order-independent), namespaced by model version."""
+    blob = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(f"{version}|{blob}".encode(), digest_size=16).hexdigest()
+
+
+class LRUCache:
+    """Size-bounded LRU: a hit moves the key to the back, inserts past ``maxsize`` evict the front."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_compute(self, key: str, compute):
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": (self.hits / total) if total else 0.0}
+
+
+DROPOUT_CACHE = LRUCache(maxsize=4096)
+G3_CACHE = LRUCache(maxsize=4096)
+EXPLAIN_CACHE = LRUCache(maxsize=256)
+SWEEP_CACHE = LRUCache(maxsize=64)     # up to 25 × 25 scored rows each
+TEACHER_CACHE = LRUCache(maxsize=8)    # one verdict per (forest, surrogate) pair
+CURVE_CACHE = LRUCache(maxsize=4)      # see outcomes.curves.cohort_curve
+CACHES = {"Drop-Out predictions": DROPOUT_CACHE, "G3 predictions": G3_CACHE, "Explanations": EXPLAIN_CACHE,
+          "What-if sweeps": SWEEP_CACHE, "Surrogate teacher check": TEACHER_CACHE, "Cohort curves": CURVE_CACHE}
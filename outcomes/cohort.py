@@ -0,0 +1,155 @@
+"""Cached cohort scores: group-by risk aggregates and a streaming top-k of the highest-risk students.
+
+``batch.score_cohort`` hands every scored chunk to ``CohortScores.add``. This
+keeps the probability of every row plus the codes of the group columns, about
+20 bytes per student. The full scored table is written to the CSV stream and
+never held. A min-heap keeps the ``capacity`` highest-risk rows seen so far,
+with their features. A chunk first narrows itself to its own top ``capacity``
+with ``np.argpartition``, so neither a chunk nor the cohort is ever sorted.
+
+* ``groups(col, threshold)``: students, mean risk and flagged count per group.
+  It is one ``np.bincount`` pass over the cached probabilities, so a threshold
+  change never re-scores.
+* ``top(threshold)``: the ``k`` highest-risk students, sorted from the heap
+  alone. The heap holds ``capacity`` (twice ``k`` by default) candidates. That
+  way editing up to ``k`` of them, which can lower their risk, still leaves a
+  list that is provably the true top ``k``; ``exact`` tells.
+* ``rescore(edited, pipe, rules)``: re-validates and re-scores only the rows
+  whose inputs changed. Their probabilities, the aggregates and the heap are
+  updated in place.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from .validate import validate
+
+GROUP_COLS = ("Course", "Application_mode", "Daytimeevening_attendance")
+
+
+class CohortScores:
+    def __init__(self, k: int = 50, group_cols=GROUP_COLS, reserve: int = 2):
+        self.k, self.capacity = k, k * reserve
+        self.group_cols = list(group_cols)
+        self.version = None          # set by the caller: the model version the probabilities came from
+        self._heap = []              # (probability, row) for the ``capacity`` highest-risk rows seen
+        self._features = {}          # row -> model inputs, for rows in the heap
+        self.floor = -np.inf         # highest probability of any row outside the heap
+        self._parts = []             # (rows, prob, {col: codes}) per chunk, until the first query
+        self._rows = self._prob = None
+        self._codes, self._labels = {}, {}
+
+    # ---------- building ----------
+    def add(self, frame: pd.DataFrame, prob: np.ndarray):
+        """One scored chunk: model-ready ``frame`` (index = cohort row number) and its drop-out probabilities."""
+        prob = np.asarray(prob, dtype=np.float64)
+        rows = frame.index.to_numpy(dtype=np.int64)
+        self._parts.append((rows, prob, {c: frame[c].to_numpy(dtype=np.int64) for c in self.group_cols}))
+        if len(prob) > self.capacity:
+            cut = np.argpartition(-prob, self.capacity - 1)
+            top, rest = cut[:self.capacity], cut[self.capacity:]
+            self.floor = max(self.floor, float(prob[rest].max()))
+        else:
+            top = np.arange(len(prob))
+        self._offer(frame, rows, prob, top)
+
+    def _offer(self, frame, rows, prob, positions):
+        taken = []
+        for i in positions:
+            item = (float(prob[i]), int(rows[i]))
+            if len(self._heap) < self.capacity:
+                heapq.heappush(self._heap, item); taken.append(i)
+            elif item > self._heap[0]:
+                out = heapq.heapreplace(self._heap, item); taken.append(i)
+                self.floor = max(self.floor, out[0])
+                self._features.pop(out[1], None)
+            else:
+                self.floor = max(self.floor, item[0])
+        if taken:
+            for r, rec in zip(rows[taken], frame.iloc[taken].to_dict("records")):
+                self._features[int(r)] = rec
+
+    def _finish(self):
+        if self._parts:
+            parts = ([], [], {c: [] for c in self.group_cols})
+            if self._prob is not None:  # a second batch of chunks after a query
+                parts[0].append(self._rows); parts[1].append(self._prob)
+                for c in self.group_cols: parts[2][c].append(self._labels[c][self._codes[c]])
+            for rows, prob, codes in self._parts:
+                parts[0].append(rows); parts[1].append(prob)
+                for c in self.group_cols: parts[2][c].append(codes[c])
+            self._rows, self._prob = np.concatenate(parts[0]), np.concatenate(parts[1])
+            for c in self.group_cols:
+                labels, codes = np.unique(np.concatenate(parts[2][c]), return_inverse=True)
+                self._labels[c], self._codes[c] = labels, codes.astype(np.min_scalar_type(max(len(labels) - 1, 0)))
+            self._parts = []
+
+    # ---------- queries ----------
+    @property
+    def n(self) -> int:
+        self._finish()
+        return 0 if self._prob is None else len(self._prob)
+
+    @property
+    def nbytes(self) -> int:
+        self._finish()
+        if self._prob is None: return 0
+        return self._rows.nbytes + self._prob.nbytes + sum(c.nbytes for c in self._codes.values())
+
+    def groups(self, col: str, threshold: float) -> pd.DataFrame:
+        """``group, students, mean_risk, flagged, flagged_share`` per value of ``col``, highest mean risk first."""
+        self._finish()
+        if self._prob is None:
+            return pd.DataFrame(columns=["group", "students", "mean_risk", "flagged", "flagged_share"])
+        codes, m = self._codes[col], len(self._labels[col])
+        students = np.bincount(codes, minlength=m)
+        flagged = np.bincount(codes, weights=self._prob >= threshold, minlength=m).astype(np.int64)
+        df = pd.DataFrame({"group": self._labels[col], "students": students,
+                           "mean_risk": np.bincount(codes, weights=self._prob, minlength=m) / np.maximum(students, 1),
+                           "flagged": flagged, "flagged_share": flagged / np.maximum(students, 1)})
+        return df[df["students"] > 0].sort_values("mean_risk", ascending=False, kind="mergesort", ignore_index=True)
+
+    def flagged(self, threshold: float) -> int:
+        self._finish()
+        return 0 if self._prob is None else int((self._prob >= threshold).sum())
+
+    def top(self, threshold: float = None) -> pd.DataFrame:
+        """The ``k`` highest-risk students: ``row``, ``dropout_probability`` (and ``flag``), then their inputs."""
+        best = heapq.nlargest(self.k, self._heap)
+        df = pd.DataFrame([self._features[r] for _, r in best], index=pd.Index([r for _, r in best], name="row"))
+        df.insert(0, "dropout_probability", [p for p, _ in best])
+        if threshold is not None:
+            df.insert(1, "flag", (df["dropout_probability"] >= threshold).astype(int))
+        return df
+
+    @property
+    def exact(self) -> bool:
+        """Whether ``top()`` is the true top ``k``: its last entry scores at least as high as any row outside the heap."""
+        if len(self._heap) < min(self.k, self.n):
+            return False
+        return not self._heap or heapq.nlargest(self.k, self._heap)[-1][0] >= self.floor
+
+    # ---------- edits ----------
+    def rescore(self, edited: pd.DataFrame, pipe, rules: dict, policy: str = "default") -> int:
+        """Re-score the rows of ``edited`` (index = row, model input columns) whose inputs changed; returns how many."""
+        self._finish()
+        current = pd.DataFrame([self._features.get(r, {}) for r in edited.index], index=edited.index,
+                               columns=edited.columns)
+        cols = [c for c in edited.columns if c in rules]
+        diff = (edited[cols].astype(np.float64) != current[cols].astype(np.float64)).any(axis=1).to_numpy()
+        if not diff.any():
+            return 0
+        v = validate(edited.loc[diff, cols], rules, policy=policy)
+        if not len(v.frame):
+            return 0
+        prob = pipe.predict_proba(v.frame)[:, 1]
+        rows = v.frame.index.to_numpy(dtype=np.int64)
+        pos = np.searchsorted(self._rows, rows)  # chunks arrive in file order: rows are sorted
+        self._prob[pos] = prob
+        for r in rows:
+            self._features.pop(int(r), None)
+        self._heap = [item for item in self._heap if item[1] in self._features]
+        heapq.heapify(self._heap)
+        self._offer(v.frame, rows, prob, np.arange(len(rows)))
+        return len(rows)
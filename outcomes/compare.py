@@ -0,0 +1,135 @@
+"""Comparison workspace: candidate students or scenarios stored column-wise and scored as one batch.
+
+A ``Workspace`` holds up to ``capacity`` candidates. Each candidate is a
+drop-out input row, a G3 input row and a label. Every input column is one
+preallocated NumPy array. Codes are stored in the narrowest integer type that
+holds their schema values and G3 categories as ``uint8`` indexes: about 300
+bytes per candidate of session state, not one widget key per field.
+
+Every input change (``add``, ``remove``, ``update``) bumps ``revision``. ``score``
+runs one ``predict_proba`` call and one ``predict`` call over all candidates.
+It reuses the last result until the revision or the model versions change.
+``varying`` lists the inputs that differ between candidates.
+"""
+import numpy as np
+import pandas as pd
+
+from .validate import validate
+
+KINDS = ("dropout", "g3")
+
+
+def _storage(rule) -> np.dtype:
+    if rule.dtype == "object":
+        return np.dtype(np.uint8)
+    if rule.dtype == "int64" and rule.allowed is not None and len(rule.allowed):
+        return np.result_type(np.min_scalar_type(int(np.min(rule.allowed))), np.min_scalar_type(int(np.max(rule.allowed))))
+    return np.dtype(np.float64)  # measured values keep full precision: candidates must score like the form
+
+
+class Workspace:
+    def __init__(self, rules: dict, capacity: int = 300):
+        """``rules``: ``{"dropout": dropout_rules(...), "g3": g3_rules(...)}`` (``outcomes.validate``)."""
+        self.rules, self.capacity = rules, capacity
+        self.n, self.revision = 0, 0
+        self.labels = np.empty(capacity, dtype=object)
+        self.columns = {kind: {c: np.zeros(capacity, dtype=_storage(r)) for c, r in rules[kind].items()} for kind in KINDS}
+        self._categories = {kind: {c: pd.Index(r.allowed) for c, r in rules[kind].items() if r.dtype == "object"}
+                            for kind in KINDS}
+        self._scored = (None, None)
+
+    @property
+    def full(self) -> bool:
+        return self.n >= self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for cols in self.columns.values() for a in cols.values()) + self.labels.nbytes
+
+    def _store(self, kind: str, frame: pd.DataFrame, positions: np.ndarray):
+        """Write validated ``frame`` rows at ``positions``; whether any stored value changed."""
+        changed = False
+        for c, arr in self.columns[kind].items():
+            v = frame[c].to_numpy()
+            if c in self._categories[kind]:
+                v = self._categories[kind][c].get_indexer(v)
+            v = v.astype(arr.dtype)
+            if not np.array_equal(arr[positions], v):
+                arr[positions] = v
+                changed = True
+        return changed
+
+    def add(self, label: str, rows: dict) -> int:
+        """Append one candidate (``rows``: ``{kind: input dict}``, validated with defaults for bad cells); its position."""
+        if self.full:
+            raise ValueError(f"the workspace holds at most {self.capacity} candidates")
+        pos = np.array([self.n])
+        for kind in KINDS:
+            self._store(kind, validate(pd.DataFrame([rows[kind]]), self.rules[kind]).frame, pos)
+        self.labels[self.n] = label
+        self.n += 1
+        self.revision += 1
+        return self.n - 1
+
+    def remove(self, positions):
+        keep = np.ones(self.n, dtype=bool)
+        keep[np.asarray(positions, dtype=np.intp)] = False
+        if keep.all():
+            return
+        m = int(keep.sum())
+        for arr in [self.labels, *(a for cols in self.columns.values() for a in cols.values())]:
+            arr[:m] = arr[:self.n][keep]
+        self.n = m
+        self.revision += 1
+
+    def clear(self):
+        self.n = 0
+        self.revision += 1
+
+    def frame(self, kind: str) -> pd.DataFrame:
+        """Model-ready inputs of all candidates (codes as int64, G3 categories as strings)."""
+        data = {}
+        for c, arr in self.columns[kind].items():
+            v = arr[:self.n]
+            if c in self._categories[kind]:
+                data[c] = self._categories[kind][c].to_numpy()[v]
+            else:
+                data[c] = v.astype(self.rules[kind][c].dtype)
+        return pd.DataFrame(data, columns=list(self.columns[kind]))
+
+    def update(self, kind: str, edited: pd.DataFrame, policy: str = "clip") -> bool:
+        """Apply edited cells (index = position, any subset of ``kind``'s inputs), validated with ``policy``."""
+        current = self.frame(kind)
+        cols = [c for c in edited.columns if c in self.columns[kind]]
+        if not cols or not len(edited):
+            return False
+        pos = edited.index.to_numpy(dtype=np.intp)
+        merged = current.iloc[pos].copy()
+        merged[cols] = edited[cols].to_numpy()
+        v = validate(merged, self.rules[kind], policy=policy)
+        if self._store(kind, v.frame, pos[v.kept]):
+            self.revision += 1
+            return True
+        return False
+
+    def relabel(self, labels):
+        """Rename candidates (labels are not model inputs: nothing is re-scored)."""
+        self.labels[:self.n] = np.asarray(labels, dtype=object)
+
+    def varying(self, kind: str) -> list:
+        """Inputs whose value is not the same for every candidate, in model column order."""
+        if self.n < 2:
+            return []
+        return [c for c, arr in self.columns[kind].items() if (arr[:self.n] != arr[0]).any()]
+
+    def score(self, dropout_model, g3_model, key=None) -> pd.DataFrame:
+        """``dropout_probability, g3`` per candidate: one batched call per model, reused while no input changed.
+
+        ``key`` identifies the models (e.g. their versions); a different key scores again.
+        """
+        token = (self.revision, self.n, key)
+        if self._scored[0] != token:
+            prob = dropout_model.predict_proba(self.frame("dropout"))[:, 1] if self.n else np.empty(0)
+            g3 = g3_model.predict(self.frame("g3")) if self.n else np.empty(0)
+            self._scored = (token, pd.DataFrame({"dropout_probability": prob, "g3": g3}))
+        return self._scored[1]
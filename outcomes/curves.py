@@ -0,0 +1,88 @@
+"""Precision/recall/F2 over every threshold from one scored, labeled cohort.
+
+Probabilities are sorted once; positives-at-or-above each position come from a
+reverse cumulative sum. Any threshold then maps to its confusion counts with a
+single ``searchsorted`` (O(log n)), so moving the threshold slider never re-scores.
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CURVE_CACHE
+from .ingest import read_dataset
+
+
+def load_labeled_cohort(path, cols, split: str = "holdout"):
+    """``(X, y)`` from ``data.csv`` with ``y = Target == "Dropout"``.
+
+    ``split="holdout"`` reproduces the notebook's stratified 80/20 split
+    (``random_state=42``) and keeps the 20% test part; ``"all"`` keeps every row,
+    including those the model was trained on.
+    """
+    df = read_dataset(path)
+    X, y = df[list(cols)], (df["Target"] == "Dropout").astype(int).to_numpy()
+    if split == "holdout":
+        from sklearn.model_selection import train_test_split
+        _, X, _, y = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    return X.reset_index(drop=True), np.asarray(y)
+
+
+class ThresholdCurve:
+    def __init__(self, prob, y, beta: float = 2.0):
+        order = np.argsort(prob, kind="mergesort")
+        self.prob = np.asarray(prob, dtype=np.float64)[order]
+        y = np.asarray(y, dtype=np.int64)[order]
+        # tp_from[i] = positives among prob[i:], with a trailing 0 for "nothing flagged".
+        self.tp_from = np.append(np.cumsum(y[::-1])[::-1], 0)
+        self.n, self.pos = len(y), int(y.sum())
+        self.beta = beta
+
+    def _metrics(self, idx) -> dict:
+        flagged = self.n - idx
+        tp = self.tp_from[idx]
+        fp, fn = flagged - tp, self.pos - tp
+        tn = (self.n - self.pos) - fp
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(flagged > 0, tp / np.maximum(flagged, 1), 1.0)
+            recall = tp / max(self.pos, 1)
+            b2 = self.beta ** 2
+            fbeta = np.where(precision + recall > 0, (1 + b2) * precision * recall / (b2 * precision + recall), 0.0)
+        return {"tp": tp, "fp": fp, "fn": fn, "tn": tn, "flagged": flagged,
+                "precision": precision, "recall": recall, "f2": fbeta, "accuracy": (tp + tn) / self.n}
+
+    def at(self, threshold: float) -> dict:
+        """Metrics when flagging ``prob >= threshold``."""
+        idx = int(np.searchsorted(self.prob, threshold, side="left"))
+        return {k: v.item() if hasattr(v, "item") else v for k, v in self._metrics(idx).items()} | {"threshold": float(threshold)}
+
+    def frame(self) -> pd.DataFrame:
+        """Full curve, one row per distinct probability (all thresholds at once)."""
+        thr = np.unique(self.prob)
+        m = self._metrics(np.searchsorted(self.prob, thr, side="left"))
+        return pd.DataFrame({"threshold": thr, **m})
+
+    def best_f2(self, min_recall: float = 0.0) -> dict:
+        """Threshold with the highest F2 among those meeting ``min_recall`` (the notebook's tuning rule)."""
+        df = self.frame()
+        ok = df[df["recall"] >= min_recall]
+        row = (ok if len(ok) else df).sort_values("f2", ascending=False, kind="mergesort").iloc[0]
+        return row.to_dict()
+
+
+# CURVE_CACHE keeps a few curves (current model and file, both splits, plus a previous version during a reload).
+_curves_lock = threading.Lock()  # held while scoring, so concurrent sessions score a cohort once
+
+
+def cohort_curve(model, model_version: str, data_path, cols, split: str = "holdout") -> ThresholdCurve:
+    """Score the labeled cohort once per (model, dataset file, split) and keep its curve while it is recent."""
+    st_ = Path(data_path).stat()
+    key = f"{model_version}|{data_path}|{st_.st_mtime_ns}|{st_.st_size}|{split}"
+
+    def score():
+        X, y = load_labeled_cohort(data_path, cols, split=split)
+        return ThresholdCurve(model.predict_proba(X)[:, 1], y)
+
+    with _curves_lock:
+        return CURVE_CACHE.get_or_compute(key, score)
@@ -0,0 +1,234 @@
+"""Streaming drift monitor: live inputs and predictions against the training data.
+
+    python -m outcomes.drift                  # build artifacts/drift_baseline.json, then replay datasets/ as a check
+
+The baseline is built once from ``datasets/``: for every feature in
+``schema.json`` and ``g3_defaults.json``, a fixed binning and the share of
+training rows per bin. Codes, string categories and numbers with at most
+``bins`` distinct values are binned by value, with one extra "other" bin.
+Other numbers use baseline quantile edges, with open ends. Each model's
+predicted drop-out probability or G3 is binned with fixed edges as well.
+
+``DriftMonitor.observe`` adds each incoming batch to the matching bins. Counts
+decay by half every ``half_life`` rows, so scores follow recent traffic and
+memory stays at one small array per feature whatever the volume. ``status()``
+computes, from counts alone, PSI = sum((q - p) * ln(q / p)) over bins and, for
+ordered bins, KS = max |CDF_q - CDF_p| at the bin edges. The PSI level uses the
+usual cut-offs: below 0.1 "stable", below 0.25 "moderate", otherwise "major".
+Below ``min_rows`` of effective weight it reports "warming up".
+"""
+import argparse
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .fields import G3_CATEGORY
+from .ingest import read_dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+FORMAT_VERSION = 1
+PREDICTION_EDGES = {"dropout": np.linspace(0.1, 0.9, 9).tolist(), "g3": np.arange(2.0, 20.0, 2.0).tolist()}
+LEVELS = ((0.10, "stable"), (0.25, "moderate"), (np.inf, "major"))
+EPS = 1e-4  # floor on bin shares, so an empty bin on either side keeps PSI finite
+
+
+def bin_spec(values, categorical: bool = False, bins: int = 10) -> dict:
+    """Binning and baseline shares for one feature."""
+    v = pd.Series(values).dropna()
+    uniques = pd.unique(v)
+    if categorical or len(uniques) <= bins:
+        cats = sorted(uniques.tolist(), key=lambda x: (isinstance(x, str), x))
+        counts = v.value_counts().reindex(cats, fill_value=0).to_numpy()
+        return {"type": "category", "categories": cats, "expected": _shares(np.append(counts, 0))}
+    edges = np.unique(np.quantile(v.to_numpy(dtype=np.float64), np.linspace(0, 1, bins + 1)[1:-1])).tolist()
+    return numeric_spec(v.to_numpy(dtype=np.float64), edges)
+
+
+def numeric_spec(values: np.ndarray, edges: list) -> dict:
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {"type": "numeric", "edges": list(edges), "expected": _shares(counts)}
+
+
+def _shares(counts) -> list:
+    counts = np.asarray(counts, dtype=np.float64)
+    return (counts / max(counts.sum(), 1.0)).tolist()
+
+
+def build_baseline(data_dir: Path, schema: dict, g3_defaults: dict, predict_dropout, predict_g3, bins: int = 10) -> dict:
+    """Baseline snapshot from ``data.csv`` and ``student-por.csv``; ``predict_*`` score the full files."""
+    drop = read_dataset(data_dir / "data.csv")
+    g3 = read_dataset(data_dir / "student-por.csv")
+    drop_cols = list(schema["categorical"]) + list(schema["numeric"])
+    models = {
+        "dropout": {"features": {c: bin_spec(drop[c], c in schema["categorical"], bins) for c in drop_cols},
+                    "prediction": numeric_spec(predict_dropout(drop[drop_cols]), PREDICTION_EDGES["dropout"])},
+        "g3": {"features": {c: bin_spec(g3[c], c in G3_CATEGORY, bins) for c in g3_defaults},
+               "prediction": numeric_spec(predict_g3(g3[list(g3_defaults)]), PREDICTION_EDGES["g3"])},
+    }
+    return {"format": FORMAT_VERSION, "rows": {"dropout": len(drop), "g3": len(g3)}, "models": models}
+
+
+class FeatureStream:
+    """Decayed bin counts for one feature, compared with its baseline shares."""
+
+    def __init__(self, spec: dict):
+        self.type = spec["type"]
+        self.expected = np.asarray(spec["expected"], dtype=np.float64)
+        if self.type == "category":
+            cats = spec["categories"]
+            self._values = None if any(isinstance(c, str) for c in cats) else np.asarray(cats, dtype=np.float64)
+            self._lookup = {c: i for i, c in enumerate(cats)}
+        else:
+            self.edges = np.asarray(spec["edges"], dtype=np.float64)
+        self.counts = np.zeros(len(self.expected))
+
+    def bins(self, values) -> np.ndarray:
+        other = len(self.expected) - 1  # unseen values
+        if self.type == "category" and self._values is not None:  # sorted numbers: exact-match binary search
+            values = np.asarray(values, dtype=np.float64)
+            idx = np.minimum(np.searchsorted(self._values, values), other - 1)
+            return np.where(self._values[idx] == values, idx, other)
+        if self.type == "category":  # strings (G3 form fields): a few rows at a time
+            return np.fromiter((self._lookup.get(v, other) for v in values), dtype=np.intp, count=len(values))
+        return np.searchsorted(self.edges, np.asarray(values, dtype=np.float64), side="right")
+
+    def add(self, values, decay: float):
+        self.counts *= decay
+        self.counts += np.bincount(self.bins(values), minlength=len(self.counts))
+
+    @property
+    def n(self) -> float:
+        return float(self.counts.sum())
+
+    def scores(self) -> tuple:
+        """``(psi, ks)``; KS is ``nan`` for unordered categories."""
+        p = np.maximum(self.expected, EPS)
+        q = np.maximum(self.counts / max(self.n, 1e-12), EPS)
+        psi = float(np.sum((q - p) * np.log(q / p)))
+        if self.type == "category":
+            return psi, float("nan")
+        return psi, float(np.abs(np.cumsum(self.counts / max(self.n, 1e-12)) - np.cumsum(self.expected)).max())
+
+
+def level(psi: float, n: float, min_rows: float) -> str:
+    if n < min_rows:
+        return "warming up"
+    return next(name for cut, name in LEVELS if psi < cut)
+
+
+class DriftMonitor:
+    def __init__(self, baseline: dict, half_life: float = 5000.0, min_rows: float = 200.0):
+        self.half_life, self.min_rows = half_life, min_rows
+        self.streams = {kind: ({c: FeatureStream(s) for c, s in m["features"].items()}, FeatureStream(m["prediction"]))
+                        for kind, m in baseline["models"].items()}
+        self.observed = {kind: 0 for kind in self.streams}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, frame: pd.DataFrame, predictions=None, fields=None):
+        """Add scored rows.
+
+        ``fields`` limits the features updated (Quick mode: only what the user entered). Leave ``predictions`` out
+        when the rows are not like training rows (Quick mode fills the other fields with defaults).
+        """
+        features, prediction = self.streams[kind]
+        decay = 0.5 ** (len(frame) / self.half_life)
+        cols = [c for c in (features if fields is None else fields) if c in features and c in frame.columns]
+        numeric = [c for c in cols if frame[c].dtype != object]
+        block = dict(zip(numeric, frame[numeric].to_numpy(dtype=np.float64).T))  # one conversion, not one per column
+        with self._lock:
+            for c in cols:
+                features[c].add(block[c] if c in block else frame[c].to_numpy(), decay)
+            if predictions is not None:
+                prediction.add(np.asarray(predictions, dtype=np.float64).ravel(), decay)
+            self.observed[kind] += len(frame)
+
+    def status(self, kind: "str | None" = None) -> pd.DataFrame:
+        """One row per model feature plus ``(prediction)``, highest PSI first."""
+        rows = []
+        with self._lock:
+            for k, (features, prediction) in self.streams.items():
+                if kind is not None and k != kind:
+                    continue
+                for name, s in [*features.items(), ("(prediction)", prediction)]:
+                    psi, ks = s.scores() if s.n > 0 else (float("nan"), float("nan"))
+                    rows.append({"model": k, "feature": name, "rows": round(s.n, 1), "psi": psi, "ks": ks,
+                                 "level": level(psi, s.n, self.min_rows)})
+        df = pd.DataFrame(rows, columns=["model", "feature", "rows", "psi", "ks", "level"])
+        return df.sort_values("psi", ascending=False, kind="mergesort", na_position="last", ignore_index=True)
+
+    def overall(self, kind: str) -> str:
+        """Worst level among the model's judged features, or "warming up" / "no traffic"."""
+        if not self.observed[kind]:
+            return "no traffic"
+        levels = set(self.status(kind)["level"])
+        return next((name for _, name in reversed(LEVELS) if name in levels), "warming up")
+
+
+_monitor: dict = {}
+_monitor_lock = threading.Lock()
+
+
+def monitor_for(baseline_path: Path, versions: dict, build) -> DriftMonitor:
+    """Process-wide monitor for these model ``versions``; a new version (re)loads or rebuilds the baseline and starts fresh.
+
+    ``build()`` returns a baseline snapshot; it is written to ``baseline_path`` together with ``versions``.
+    """
+    key = tuple(sorted(versions.items()))
+    with _monitor_lock:
+        if _monitor.get("key") != key:
+            baseline = None
+            if Path(baseline_path).exists():
+                with open(baseline_path) as f:
+                    baseline = json.load(f)
+                if baseline.get("format") != FORMAT_VERSION or baseline.get("versions") != versions:
+                    baseline = None
+            if baseline is None:
+                baseline = {**build(), "versions": versions}
+                tmp = Path(baseline_path).with_name(Path(baseline_path).name + ".tmp")
+                with open(tmp, "w") as f:
+                    json.dump(baseline, f)
+                tmp.replace(baseline_path)
+            _monitor.update(key=key, monitor=DriftMonitor(baseline))
+        return _monitor["monitor"]
+
+
+def existing_monitor(versions: dict) -> "DriftMonitor | None":
+    """The process-wide monitor if one was already created for these ``versions``; never loads or builds a baseline."""
+    with _monitor_lock:
+        return _monitor["monitor"] if _monitor.get("key") == tuple(sorted(versions.items())) else None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--data-dir", type=Path, default=ROOT / "datasets")
+    ap.add_argument("--models-dir", type=Path, default=ROOT / "models")
+    ap.add_argument("--artifacts-dir", type=Path, default=ROOT / "artifacts")
+    args = ap.parse_args(argv)
+
+    from .forest import compile_pipeline
+    from .registry import REGISTRY
+    schema = REGISTRY.json(args.artifacts_dir / "schema.json")
+    g3_defaults = REGISTRY.json(args.artifacts_dir / "g3_defaults.json")
+    drop_pipe = REGISTRY.model(args.models_dir / "dropout_model.pkl")
+    g3_pipe = REGISTRY.model(args.models_dir / "g3_model.pkl")
+    drop_model = compile_pipeline(drop_pipe) or drop_pipe
+    versions = {"dropout": REGISTRY.version(args.models_dir / "dropout_model.pkl"),
+                "g3": REGISTRY.version(args.models_dir / "g3_model.pkl")}
+    monitor = monitor_for(args.artifacts_dir / "drift_baseline.json", versions, lambda: build_baseline(
+        args.data_dir, schema, g3_defaults, lambda X: drop_model.predict_proba(X)[:, 1], g3_pipe.predict))
+    # Replaying the baseline data must read as stable; a shifted copy must not.
+    drop = read_dataset(args.data_dir / "data.csv")
+    cols = list(schema["categorical"]) + list(schema["numeric"])
+    monitor.observe("dropout", drop[cols], drop_model.predict_proba(drop[cols])[:, 1])
+    print(f"replayed data.csv ({len(drop):,} rows): {monitor.overall('dropout')}")
+    shifted = drop[cols].assign(Admission_grade=drop["Admission_grade"] + 15.0)
+    monitor.observe("dropout", shifted, drop_model.predict_proba(shifted)[:, 1])
+    print("after a +15 Admission_grade shift:")
+    print(monitor.status("dropout").head(5).round(4).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Per-prediction feature attribution, reported on the original input features.
+
+* Drop-out forest: path-based per-tree contributions from the compiled forest
+  (one traversal per block of rows); one-hot columns are summed back into their
+  ``schema.json`` feature.
+* G3 ElasticNet: exact linear contributions ``coef * (x - x_ref)`` in the
+  preprocessed space, relative to the ``g3_defaults.json`` student.
+* Quick-mode surrogate: the same path contributions summed over its boosting
+  stages, on its quick fields; every other input contributes 0.
+
+In every case ``base + contributions.sum(axis=1) == prediction`` (for the
+surrogate, up to its clip of the probability to [0, 1]).
+"""
+import weakref
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .forest import compile_pipeline
+from .linear import CompiledLinear
+
+
+@dataclass
+class Explanation:
+    base: float                  # prediction for the reference (training average / default student)
+    contributions: pd.DataFrame  # rows x input features
+    prediction: np.ndarray
+
+    def top(self, i: int = 0, k: int = 8) -> pd.DataFrame:
+        """The ``k`` largest absolute contributions for row ``i``, largest first."""
+        c = self.contributions.iloc[i]
+        c = c.reindex(c.abs().sort_values(ascending=False, kind="mergesort").index)[:k]
+        return pd.DataFrame({"feature": c.index, "contribution": c.to_numpy()})
+
+
+class ForestExplainer:
+    def __init__(self, pipe, cols=None, block_rows: int = 2048):
+        engine = compile_pipeline(pipe)
+        if engine is None:
+            raise TypeError("forest attribution needs a pipeline the compiled engine supports")
+        self.pre, self.forest = engine.pre, engine.forest
+        self.cols = list(cols) if cols is not None else self.pre.input_cols
+        self.M = self.pre.source_matrix(self.cols)
+        self.block_rows = block_rows
+
+    def explain(self, X) -> Explanation:
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        parts, bias = [], 0.0
+        for s in range(0, len(X), self.block_rows):
+            bias, C = self.forest.contributions(self.pre.transform(X.iloc[s:s + self.block_rows]))
+            parts.append(C @ self.M)
+        C = np.vstack(parts) if parts else np.zeros((0, len(self.cols)))
+        return Explanation(bias, pd.DataFrame(C, columns=self.cols, index=X.index), bias + C.sum(axis=1))
+
+
+class LinearExplainer:
+    def __init__(self, pipe, reference: dict, cols=None):
+        lin = pipe if isinstance(pipe, CompiledLinear) else CompiledLinear(pipe)
+        self.pre, self.coef = lin.pre, lin.coef
+        self.cols = list(cols) if cols is not None else self.pre.input_cols
+        self.M = self.pre.source_matrix(self.cols)
+        self.ref = self.pre.transform(pd.DataFrame([reference]))[0]
+        self.base = float(lin.intercept + self.ref @ self.coef)
+
+    def explain(self, X) -> Explanation:
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        C = ((self.pre.transform(X) - self.ref) * self.coef) @ self.M
+        return Explanation(self.base, pd.DataFrame(C, columns=self.cols, index=X.index), self.base + C.sum(axis=1))
+
+
+class SurrogateExplainer:
+    def __init__(self, surrogate, cols=None):
+        self.surrogate = surrogate
+        self.cols = list(cols) if cols is not None else list(surrogate.fields)
+        self.M = np.zeros((len(surrogate.fields), len(self.cols)))
+        self.M[np.arange(len(surrogate.fields)), [self.cols.index(f) for f in surrogate.fields]] = 1.0
+
+    def explain(self, X) -> Explanation:
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        bias, C = self.surrogate.contributions(X)
+        return Explanation(bias, pd.DataFrame(C @ self.M, columns=self.cols, index=X.index),
+                           self.surrogate.predict_proba(X)[:, 1])
+
+
+EXPLAINERS = {"forest": ForestExplainer, "linear": LinearExplainer, "surrogate": SurrogateExplainer}
+_explainers = weakref.WeakKeyDictionary()
+
+
+def explainer_for(pipe, kind: str, **kwargs):
+    """Memoized explainer of ``kind`` (a key of ``EXPLAINERS``) for ``pipe``; ``None`` if unsupported."""
+    if pipe not in _explainers:
+        try:
+            _explainers[pipe] = EXPLAINERS[kind](pipe, **kwargs)
+        except (TypeError, KeyError, AttributeError, ValueError):
+            _explainers[pipe] = None
+    return _explainers[pipe]
@@ -0,0 +1,50 @@
+"""Input domains of both forms: value bounds/steps and categorical options.
+
+Shared by ``app.py`` (widget limits) and the tooling that needs realistic
+inputs without running the app (benchmarks, validation).
+"""
+
+CONTINUOUS_NUMS = {
+    "Previous_qualification_grade","Admission_grade",
+    "Curricular_units_1st_sem_grade","Curricular_units_2nd_sem_grade",
+    "Unemployment_rate","Inflation_rate","GDP"
+}
+RANGES = {
+    "Application_order": (0, 9, 1),
+    "Curricular_units_1st_sem_credited": (0, 30, 1),
+    "Curricular_units_1st_sem_enrolled": (0, 30, 1),
+    "Curricular_units_1st_sem_evaluations": (0, 45, 1),
+    "Curricular_units_1st_sem_approved": (0, 30, 1),
+    "Curricular_units_1st_sem_without_evaluations": (0, 12, 1),
+    "Curricular_units_2nd_sem_credited": (0, 30, 1),
+    "Curricular_units_2nd_sem_enrolled": (0, 30, 1),
+    "Curricular_units_2nd_sem_evaluations": (0, 40, 1),
+    "Curricular_units_2nd_sem_approved": (0, 30, 1),
+    "Curricular_units_2nd_sem_without_evaluations": (0, 12, 1),
+    "Age_at_enrollment": (15, 70, 1),
+    "Previous_qualification_grade": (0.0, 200.0, 0.1),
+    "Admission_grade": (0.0, 200.0, 0.1),
+    "Curricular_units_1st_sem_grade": (0.0, 20.0, 0.1),
+    "Curricular_units_2nd_sem_grade": (0.0, 20.0, 0.1),
+    "Unemployment_rate": (0.0, 40.0, 0.1),
+    "Inflation_rate": (-5.0, 20.0, 0.1),
+    "GDP": (-10.0, 10.0, 0.1),
+}
+
+G3_RANGES = {
+    "age": (15, 22, 1),
+    "traveltime": (1, 4, 1), "studytime": (1, 4, 1),
+    "failures": (0, 3, 1),
+    "famrel": (1, 5, 1), "freetime": (1, 5, 1), "goout": (1, 5, 1),
+    "Dalc": (1, 5, 1), "Walc": (1, 5, 1),
+    "health": (1, 5, 1), "absences": (0, 93, 1),
+    "Medu": (0, 4, 1), "Fedu": (0, 4, 1),
+    "G1": (0, 20, 1), "G2": (0, 20, 1), "G3": (0, 20, 1)
+}
+G3_CATEGORY = {
+    "school":["GP","MS"], "sex":["F","M"], "address":["U","R"], "famsize":["LE3","GT3"], "Pstatus":["T","A"],
+    "Mjob":["teacher","health","services","at_home","other"], "Fjob":["teacher","health","services","at_home","other"],
+    "reason":["home","reputation","course","other"], "guardian":["mother","father","other"],
+    "schoolsup":["yes","no"], "famsup":["yes","no"], "paid":["yes","no"], "activities":["yes","no"],
+    "nursery":["yes","no"], "higher":["yes","no"], "internet":["yes","no"], "romantic":["yes","no"]
+}
@@ -0,0 +1,140 @@
+"""Scoring relative to a fixed reference row (the dataset-default student).
+
+Quick mode fills most inputs from ``defaults.json`` / ``g3_defaults.json``, and
+a what-if sweep moves one or two features of an otherwise fixed row. Both
+predictors below do the reference row's work once and then only redo what the
+changed features can affect:
+
+* ``IncrementalForest``: caches the reference row's leaf in every tree and which
+  input features its path tests. A row re-walks only the trees whose reference
+  path tests one of its changed features; every other tree's leaf is provably
+  the same. Leaf values are summed in estimator order, so results equal
+  ``CompiledPipeline.predict_proba`` (and sklearn's) exactly. Batches needing
+  more tree walks than the engine's ``max_rows`` rows are handed to the engine.
+* ``IncrementalLinear``: caches the reference prediction and preprocessed row;
+  a row adds ``coef * (t(x) - t(ref))`` over the output columns of its changed
+  features only. Equal to the full pipeline to float rounding (the terms are
+  summed in a different order), like ``CompiledLinear``.
+
+Rows are preprocessed per changed column as well (``transform_column``); the
+other columns are copied from the cached reference.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .forest import compile_pipeline
+from .linear import CompiledLinear
+
+
+class _Incremental:
+    def __init__(self, pre, reference: dict):
+        self.pre = pre
+        self.cols = pre.input_cols
+        self.reference = {c: reference[c] for c in self.cols}
+        self.ref_t = pre.transform(pd.DataFrame([self.reference], columns=self.cols))[0]
+        self.slices = pre.output_slices()
+        self.numeric = not pre.cat_cols or all(isinstance(v, (int, float, np.number)) for v in self.reference.values())
+        self.ref_vec = np.array([self.reference[c] for c in self.cols], dtype=np.float64) if self.numeric else None
+
+    def changed(self, X: pd.DataFrame) -> dict:
+        """``{input column: (values, rows that differ from the reference)}`` for columns that differ anywhere."""
+        if self.numeric:  # one float block and one comparison instead of a pass per column
+            V = X[self.cols].to_numpy(dtype=np.float64)
+            D = V != self.ref_vec
+            return {self.cols[k]: (V[:, k], D[:, k]) for k in np.flatnonzero(D.any(axis=0))}
+        out = {}
+        for c in self.cols:
+            v = X[c].to_numpy()
+            diff = v != self.reference[c]
+            if diff.any():
+                out[c] = (v, diff)
+        return out
+
+    def transform(self, X: pd.DataFrame, changed: dict) -> np.ndarray:
+        Xt = np.tile(self.ref_t, (len(X), 1))
+        for c, (v, _) in changed.items():
+            Xt[:, self.slices[c]] = self.pre.transform_column(c, v)
+        return Xt
+
+
+class IncrementalForest(_Incremental):
+    def __init__(self, engine, reference: dict):
+        super().__init__(engine.pre, reference)
+        self.engine = engine
+        self.forest = f = engine.forest
+        self.classes_ = engine.classes_
+        # uses[t, k]: tree t's reference path splits on an output column of input feature k.
+        # All trees step down together, as in CompiledForest.descend.
+        col_of = {c: k for k, c in enumerate(self.cols)}
+        source = np.array([col_of[c] for c in self.pre.source_], dtype=np.intp)
+        self.uses = np.zeros((f.n_trees, len(self.cols)), dtype=bool)
+        xf = self.ref_t.astype(np.float32)
+        node, tree = f.roots.copy(), np.arange(f.n_trees)
+        leaves = f.roots.copy()
+        while node.size:
+            inner = ~f.is_leaf[node]
+            leaves[tree[~inner]] = node[~inner]
+            node, tree = node[inner], tree[inner]
+            feat = f.feature[node]
+            self.uses[tree, source[feat]] = True
+            node = np.where(xf[feat] <= f.threshold[node], f.left[node], f.right[node])
+        self.ref_leaves = leaves
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=self.cols)
+        changed = self.changed(X)
+        leaves = np.tile(self.ref_leaves, (len(X), 1))
+        if changed:
+            diff = np.zeros((len(X), len(self.cols)), dtype=bool)
+            for c, (_, d) in changed.items():
+                diff[:, self.cols.index(c)] = d
+            rows, trees = np.nonzero(diff.astype(np.uint8) @ self.uses.T.astype(np.uint8))
+            if len(rows) > self.engine.max_rows * self.forest.n_trees:
+                # More walks than the engine hands to sklearn's Cython traversal: that path is faster.
+                return self.engine.predict_proba(X)
+            Xf = np.ascontiguousarray(self.transform(X, changed), dtype=np.float32)
+            leaves[rows, trees] = self.forest.descend(Xf, self.forest.roots[trees], rows)
+        return self.forest.leaf_proba(leaves)
+
+    def trees_to_walk(self, changed_cols) -> int:
+        """How many trees a row differing from the reference in ``changed_cols`` re-walks."""
+        idx = [self.cols.index(c) for c in changed_cols]
+        return int(self.uses[:, idx].any(axis=1).sum())
+
+
+class IncrementalLinear(_Incremental):
+    def __init__(self, lin: CompiledLinear, reference: dict):
+        super().__init__(lin.pre, reference)
+        self.coef = lin.coef
+        self.base = float(lin.intercept + self.ref_t @ self.coef)
+
+    def predict(self, X) -> np.ndarray:
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X, columns=self.cols)
+        out = np.full(len(X), self.base)
+        for c, (v, d) in self.changed(X).items():
+            sl = self.slices[c]
+            rows = np.flatnonzero(d)
+            out[rows] += (self.pre.transform_column(c, v[rows]) - self.ref_t[sl]) @ self.coef[sl]
+        return out
+
+
+_incremental = weakref.WeakKeyDictionary()
+
+
+def incremental_for(pipe, reference: dict):
+    """Memoized incremental predictor for a drop-out forest or G3 linear pipeline; ``None`` if unsupported.
+
+    Keyed by pipeline object only: callers pass the same reference (the dataset defaults) for a given model.
+    """
+    if pipe not in _incremental:
+        try:
+            engine = compile_pipeline(pipe)
+            if engine is not None:
+                _incremental[pipe] = IncrementalForest(engine, reference)
+            else:
+                _incremental[pipe] = IncrementalLinear(pipe if isinstance(pipe, CompiledLinear) else CompiledLinear(pipe), reference)
+        except (TypeError, KeyError, AttributeError, ValueError):
+            _incremental[pipe] = None
+    return _incremental[pipe]
@@ -0,0 +1,146 @@
+"""Typed, cached ingestion of the raw datasets in ``datasets/``.
+
+    python -m outcomes.ingest            # build (or verify) the cache for every known dataset
+
+``read_dataset(path)`` parses a CSV once with explicit per-column dtypes and the
+notebook's ``clean_cols`` headers, then stores the frame as one uncompressed
+``.npy`` block per column plus ``manifest.json`` under ``datasets/.cache/``
+(string columns with missing cells also get a boolean mask block, so they read
+back as NaN rather than "nan").
+The cache directory is named after the sha256 of the source bytes and the
+parsing spec, so an edited file (or a changed spec) is re-parsed and the stale
+entry removed; later loads only hash the source and read the blocks back.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .batch import clean_cols
+from .fields import CONTINUOUS_NUMS, G3_CATEGORY
+from .registry import file_digest
+
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+DATA_DIR = Path(__file__).resolve().parent.parent / "datasets"
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """How to parse one CSV: separator, string columns and float columns (by cleaned name); the rest are int64."""
+    sep: str = ","
+    strings: frozenset = field(default_factory=frozenset)
+    floats: frozenset = field(default_factory=frozenset)
+
+    def dtype(self, col: str) -> str:
+        return "object" if col in self.strings else ("float64" if col in self.floats else "int64")
+
+    def fingerprint(self) -> str:
+        return json.dumps({"sep": self.sep, "strings": sorted(self.strings), "floats": sorted(self.floats)})
+
+
+SPECS = {
+    # BOM, tab in "Daytime/evening attendance\t"; every column but Target is a code or a measurement.
+    "data.csv": DatasetSpec(sep=";", strings=frozenset({"Target"}), floats=frozenset(CONTINUOUS_NUMS)),
+    # Quoted string categories and quoted numbers ("0","11") in G1/G2.
+    "student-por.csv": DatasetSpec(sep=",", strings=frozenset(G3_CATEGORY)),
+}
+
+
+def parse(path, spec: DatasetSpec) -> pd.DataFrame:
+    """Parse ``path`` with explicit dtypes; header names are normalized first so the spec can use clean names."""
+    raw = pd.read_csv(path, sep=spec.sep, nrows=0, encoding="utf-8-sig").columns
+    names = clean_cols(pd.DataFrame(columns=raw)).columns
+    df = pd.read_csv(path, sep=spec.sep, encoding="utf-8-sig",
+                     dtype={r: spec.dtype(n) for r, n in zip(raw, names)})
+    df.columns = names
+    return df
+
+
+def cache_key(path, spec: DatasetSpec) -> str:
+    h = hashlib.sha256(f"{FORMAT_VERSION}|{spec.fingerprint()}|{file_digest(Path(path))}".encode())
+    return h.hexdigest()[:16]
+
+
+def _write(df: pd.DataFrame, out_dir: Path, key: str):
+    """Write blocks into a sibling temp dir and rename it into place, so readers never see a partial cache."""
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.", dir=out_dir.parent))
+    cols = []
+    for i, (name, s) in enumerate(df.items()):
+        col = {"name": name, "dtype": str(s.dtype), "npy": f"{i}.npy"}
+        arr = s.to_numpy()
+        if s.dtype == object:
+            missing = s.isna().to_numpy()
+            arr = np.where(missing, "", arr).astype(str)
+            if missing.any():
+                np.save(tmp / f"{i}.missing.npy", missing, allow_pickle=False)
+                col["missing"] = f"{i}.missing.npy"
+        np.save(tmp / f"{i}.npy", np.ascontiguousarray(arr), allow_pickle=False)
+        cols.append(col)
+    with open(tmp / MANIFEST, "w") as f:
+        json.dump({"format": FORMAT_VERSION, "key": key, "rows": len(df), "columns": cols}, f, indent=1)
+    try:
+        os.replace(tmp, out_dir)
+    except OSError:  # another process built the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read(cache_dir: Path) -> pd.DataFrame:
+    with open(cache_dir / MANIFEST) as f:
+        manifest = json.load(f)
+    data = {}
+    for c in manifest["columns"]:
+        arr = np.load(cache_dir / c["npy"], allow_pickle=False)
+        if c["dtype"] == "object":
+            arr = arr.astype(object)
+            if "missing" in c:
+                arr[np.load(cache_dir / c["missing"], allow_pickle=False)] = np.nan
+        data[c["name"]] = arr
+    return pd.DataFrame(data, columns=[c["name"] for c in manifest["columns"]])
+
+
+def read_dataset(path, spec: "DatasetSpec | None" = None, cache_dir=None) -> pd.DataFrame:
+    """Typed frame for ``path`` (spec looked up by file name in ``SPECS``), from the cache when it is current."""
+    path = Path(path)
+    if spec is None:
+        if path.name not in SPECS:
+            raise ValueError(f"no parsing spec for {path.name!r}; known layouts: {', '.join(SPECS)} (or pass spec=)")
+        spec = SPECS[path.name]
+    cache_dir = Path(cache_dir) if cache_dir is not None else path.parent / ".cache"
+    key = cache_key(path, spec)
+    entry = cache_dir / f"{path.stem}-{key}"
+    if (entry / MANIFEST).exists():
+        return _read(entry)
+    df = parse(path, spec)
+    _write(df, entry, key)
+    for stale in cache_dir.glob(f"{path.stem}-*"):
+        if stale.is_dir() and stale.name != entry.name and not stale.name.startswith("."):
+            shutil.rmtree(stale, ignore_errors=True)
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = ap.parse_args(argv)
+    for name, spec in SPECS.items():
+        path = args.data_dir / name
+        t0 = time.perf_counter(); parsed = parse(path, spec); t_parse = time.perf_counter() - t0
+        read_dataset(path, spec)
+        t0 = time.perf_counter(); cached = read_dataset(path, spec); t_cached = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(parsed, cached)
+        print(f"{name}: {len(cached):,} rows × {cached.shape[1]} cols · parse {t_parse * 1e3:.1f} ms · "
+              f"cached {t_cached * 1e3:.1f} ms · {cache_key(path, spec)}")
+
+
+if __name__ == "__main__":
+    main()
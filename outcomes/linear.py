@@ -0,0 +1,21 @@
+"""Array form of a fitted ``[prep, linear regressor]`` pipeline (the G3 ElasticNet)."""
+import numpy as np
+
+from .preprocess import CompiledPreprocessor
+
+
+class CompiledLinear:
+    """``predict(X) = transform(X) @ coef + intercept`` on dense arrays.
+
+    Agrees with ``pipe.predict`` to float rounding (sklearn multiplies the sparse
+    one-hot block, so the summation order differs).
+    """
+
+    def __init__(self, pipe):
+        self.pre = CompiledPreprocessor(pipe.steps[0][1])
+        reg = pipe.steps[-1][1]
+        self.coef = np.ascontiguousarray(np.asarray(reg.coef_, dtype=np.float64).ravel())
+        self.intercept = float(np.ravel(reg.intercept_)[0])
+
+    def predict(self, X) -> np.ndarray:
+        return self.pre.transform(X) @ self.coef + self.intercept
@@ -0,0 +1,139 @@
+"""Memory-mappable export of the compiled models.
+
+    python -m outcomes.mmap_store                 # models/*.pkl -> models/*.mm/
+    python -m outcomes.mmap_store --check         # also verify predictions against the pickles
+
+An export is a directory of uncompressed ``.npy`` blocks (tree node arrays,
+leaf values, winsor/scaler parameters, one-hot categories, linear coefficients)
+plus ``manifest.json`` describing how they fit together. ``load`` maps every
+block read-only, so a cold start only parses the manifest, and the OS shares
+the pages between all server processes that map the same files. Loaded models
+are the compiled engines (``CompiledPipeline`` / ``CompiledLinear``) and expose
+the same ``predict_proba`` / ``predict`` as the pickled pipelines.
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .forest import CompiledBoosting, CompiledForest, CompiledPipeline, QuickSurrogate
+from .linear import CompiledLinear
+from .preprocess import CompiledPreprocessor
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+CLASSES = {c.__name__: c for c in (CompiledPipeline, CompiledForest, CompiledPreprocessor, CompiledLinear,
+                                    CompiledBoosting, QuickSurrogate)}
+
+
+def _save(arr: np.ndarray, path: Path) -> str:
+    # Write beside and rename: a process that still maps the old file keeps its inode
+    # instead of faulting on a truncated one.
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr, allow_pickle=False)
+    os.replace(tmp, path)
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _dump(obj, name: str, out_dir: Path):
+    if isinstance(obj, np.ndarray):
+        arr = obj.astype(str) if obj.dtype == object else obj
+        return {"npy": name, "sha256": _save(np.ascontiguousarray(arr), out_dir / f"{name}.npy")}
+    if type(obj).__name__ in CLASSES:
+        # Private attributes (caches, the weakref back to the sklearn pipeline) are not exported.
+        return {"class": type(obj).__name__,
+                "state": {k: _dump(v, f"{name}.{k}", out_dir) for k, v in vars(obj).items() if not k.startswith("_")}}
+    if isinstance(obj, list) and any(isinstance(v, np.ndarray) for v in obj):
+        return {"list": [_dump(v, f"{name}.{i}", out_dir) for i, v in enumerate(obj)]}
+    return {"value": obj.item() if isinstance(obj, np.generic) else obj}
+
+
+def _restore(spec, root: Path, mmap_mode):
+    if "npy" in spec:
+        # np.asarray drops the np.memmap subclass (cheaper ufunc dispatch) but keeps the mapping.
+        return np.asarray(np.load(root / f"{spec['npy']}.npy", mmap_mode=mmap_mode, allow_pickle=False))
+    if "class" in spec:
+        obj = CLASSES[spec["class"]].__new__(CLASSES[spec["class"]])
+        vars(obj).update({k: _restore(v, root, mmap_mode) for k, v in spec["state"].items()})
+        if isinstance(obj, CompiledPipeline):
+            obj._pipe = None
+        return obj
+    if "list" in spec:
+        return [_restore(v, root, mmap_mode) for v in spec["list"]]
+    return spec["value"]
+
+
+def compile_for_export(pipe):
+    """The compiled engine matching ``pipe``: forest classifier or linear regressor (a distilled surrogate as is)."""
+    if type(pipe).__name__ in CLASSES:
+        return pipe
+    last = pipe.steps[-1][1]
+    return CompiledPipeline(pipe) if hasattr(last, "estimators_") else CompiledLinear(pipe)
+
+
+def export(pipe, out_dir) -> Path:
+    """Write ``pipe``'s compiled arrays to ``out_dir``.
+
+    The manifest is replaced last, so readers never see a partial export, and it
+    carries each block's sha256, so its own digest changes whenever any block does.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    spec = _dump(compile_for_export(pipe), "model", out_dir)
+    tmp = out_dir / f"{MANIFEST}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"format": FORMAT_VERSION, "model": spec}, f, indent=1)
+    os.replace(tmp, out_dir / MANIFEST)
+    return out_dir
+
+
+def load(path, mmap_mode="r"):
+    """Load an export from its directory or its ``manifest.json``; ``mmap_mode=None`` reads blocks into private memory."""
+    path = Path(path)
+    root = path if path.is_dir() else path.parent
+    with open(root / MANIFEST) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported export format {manifest.get('format')!r} in {root}")
+    return _restore(manifest["model"], root, mmap_mode)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--models-dir", type=Path, default=Path(__file__).resolve().parent.parent / "models")
+    ap.add_argument("--check", action="store_true", help="compare exported predictions with the pickles on datasets/")
+    args = ap.parse_args(argv)
+
+    import joblib
+    from .transformers import install_pickle_aliases
+    install_pickle_aliases()
+    for pkl in sorted(args.models_dir.glob("*.pkl")):
+        pipe = joblib.load(pkl)
+        out = export(pipe, pkl.with_suffix(".mm"))
+        size = sum(p.stat().st_size for p in out.iterdir())
+        print(f"{pkl.name} -> {out.name}/ ({size / 1e6:.1f} MB)")
+        if args.check:
+            _check(pipe, load(out))
+
+
+def _check(pipe, mapped):
+    from .ingest import read_dataset
+    data = Path(__file__).resolve().parent.parent / "datasets"
+    if isinstance(mapped, QuickSurrogate):
+        X = read_dataset(data / "data.csv")[mapped.fields]
+        diff = np.abs(pipe.predict_proba(X) - mapped.predict_proba(X)).max()
+    elif isinstance(mapped, CompiledPipeline):
+        X = read_dataset(data / "data.csv")[mapped.pre.input_cols]
+        diff = np.abs(pipe.predict_proba(X) - mapped.predict_proba(X)).max()
+    else:
+        X = read_dataset(data / "student-por.csv")[mapped.pre.input_cols]
+        diff = np.abs(pipe.predict(X) - mapped.predict(X)).max()
+    print(f"  max |Δ| vs pickle on {len(X)} rows: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Array form of the fitted ``ColumnTransformer`` preprocessors used by both pipelines.
+
+sklearn is only imported to compile a fitted transformer; instances restored from
+a memory-mapped export (see ``mmap_store``) never import it.
+"""
+import numpy as np
+import pandas as pd
+
+
+class CompiledPreprocessor:
+    """Array form of a fitted ``ColumnTransformer`` made of Winsorizer/RobustScaler/OneHotEncoder branches.
+
+    Output columns follow the transformer order: numeric block first, then one
+    indicator per (categorical column, category). ``source_`` maps every output
+    column back to its input column name.
+    """
+
+    def __init__(self, ct):
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder, RobustScaler
+
+        from .transformers import Winsorizer
+
+        if ct.remainder != "drop":
+            raise TypeError("compiled preprocessing requires remainder='drop'")
+        self.num_cols, self.cat_cols = [], []
+        lo, hi, center, scale, cats = [], [], [], [], []
+        for name, trans, cols in ct.transformers_:
+            if trans == "drop": continue
+            steps = trans.steps if isinstance(trans, Pipeline) else [(name, trans)]
+            if len(steps) == 1 and isinstance(steps[0][1], OneHotEncoder):
+                ohe = steps[0][1]
+                if ohe.drop is not None or ohe.handle_unknown != "ignore" or getattr(ohe, "_infrequent_enabled", False):
+                    raise TypeError("compiled one-hot encoding supports handle_unknown='ignore' without drop/infrequent")
+                self.cat_cols += list(cols); cats += [np.asarray(c) for c in ohe.categories_]
+                continue
+            n = len(cols)
+            l, h, c, s = np.full(n, -np.inf), np.full(n, np.inf), np.zeros(n), np.ones(n)
+            for _, step in steps:
+                if isinstance(step, Winsorizer):
+                    l, h = step.bound_arrays()
+                elif isinstance(step, RobustScaler):
+                    if step.center_ is not None: c = step.center_
+                    if step.scale_ is not None: s = step.scale_
+                else:
+                    raise TypeError(f"cannot compile numeric step {type(step).__name__}")
+            self.num_cols += list(cols); lo.append(l); hi.append(h); center.append(c); scale.append(s)
+        self.lo_, self.hi_ = np.concatenate(lo), np.concatenate(hi)
+        self.center_, self.scale_ = np.concatenate(center), np.concatenate(scale)
+        self.categories_ = cats
+        self.source_ = np.array(self.num_cols + [c for c, k in zip(self.cat_cols, cats) for _ in k], dtype=object)
+        self.n_features_out_ = len(self.source_)
+
+    @property
+    def input_cols(self):
+        return self.num_cols + self.cat_cols
+
+    def transform(self, X) -> np.ndarray:
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X)
+        num = np.clip(X[self.num_cols].to_numpy(dtype=np.float64), self.lo_, self.hi_)
+        num -= self.center_
+        num /= self.scale_
+        out = np.empty((len(X), self.n_features_out_), dtype=np.float64)
+        out[:, :num.shape[1]] = num
+        j = num.shape[1]
+        for col, cats in zip(self.cat_cols, self.categories_):
+            out[:, j:j + len(cats)] = X[col].to_numpy()[:, None] == cats[None, :]
+            j += len(cats)
+        return out
+
+    def output_slices(self) -> dict:
+        """``{input column: slice of its output columns}`` (derived on first use, not exported)."""
+        slices = self.__dict__.get("_slices_")
+        if slices is None:
+            slices = {c: slice(i, i + 1) for i, c in enumerate(self.num_cols)}
+            j = len(self.num_cols)
+            for col, cats in zip(self.cat_cols, self.categories_):
+                slices[col] = slice(j, j + len(cats)); j += len(cats)
+            self._slices_ = slices
+        return slices
+
+    def transform_column(self, col: str, values) -> np.ndarray:
+        """Output block (rows x width) of one input column, with the same arithmetic as ``transform``."""
+        values = np.asarray(values)
+        if col in self.cat_cols:
+            return values[:, None] == self.categories_[self.cat_cols.index(col)][None, :]
+        i = self.num_cols.index(col)
+        x = np.clip(values.astype(np.float64), self.lo_[i], self.hi_[i])
+        x -= self.center_[i]
+        x /= self.scale_[i]
+        return x[:, None]
+
+    def source_matrix(self, cols=None) -> np.ndarray:
+        """0/1 matrix (output columns x ``cols``) that sums output columns back into input features."""
+        cols = list(cols) if cols is not None else self.input_cols
+        pos = {c: i for i, c in enumerate(cols)}
+        M = np.zeros((self.n_features_out_, len(cols)))
+        M[np.arange(self.n_features_out_), [pos[c] for c in self.source_]] = 1.0
+        return M
@@ -0,0 +1,238 @@
+"""Warm-start refresh of both models from a newly labeled cohort, without a full retrain.
+
+    python -m outcomes.refresh --dropout-new term.csv                  # data.csv layout, with Target
+    python -m outcomes.refresh --dropout-new term.csv --g3-new por.csv # student-por.csv layout, with G3
+    python -m outcomes.refresh ... --new-trees 50 --max-trees 250 --recent 2000 --time-full
+
+The fitted preprocessors are kept as they are, so every tree and coefficient
+sees the same encoded features as before. Only the final estimators change:
+
+* Drop-out: ``new_trees`` trees are grown with ``warm_start`` on the training
+  window, resampled with SMOTE as in training. The window is the new rows plus
+  the ``recent`` latest rows of the current training split, in file order. The
+  oldest trees are then evicted, so the forest never exceeds ``max_trees``.
+  Thresholds in ``schema.json`` are left alone.
+* G3: an ``ElasticNet`` with the chosen ``alpha_`` / ``l1_ratio_`` is refit on
+  the same kind of window, starting from the current coefficients. The result
+  goes back into a copy of the ``ElasticNetCV`` pipeline.
+
+New rows are read untyped and validated like cohort uploads (``--policy``,
+rejecting rows with bad cells by default); rows without a label are dropped. A stratified 20% of them is held out. The report
+compares the current and refreshed models on the notebook's test split and on
+that holdout. It also compares the refresh time with a full retrain: taken
+from ``training_report.json``, or measured with ``--time-full``. The refreshed
+models go to ``models/*_refreshed.pkl`` and the report to
+``artifacts/refresh_report.json``. The current models are left untouched:
+copy a refreshed model over its current file to promote it, then re-run
+``python -m outcomes.train``'s exports (mmap, surrogate) as needed.
+"""
+import argparse
+import copy
+import json
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from sklearn.linear_model import ElasticNet
+from sklearn.metrics import average_precision_score, mean_absolute_error, mean_squared_error, r2_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from .batch import clean_cols
+from .ingest import SPECS, read_dataset
+from .train import SEED, classification_metrics, load_dropout, train_dropout, train_g3
+from .validate import dropout_rules, g3_rules, validate
+
+ROOT = Path(__file__).resolve().parent.parent
+TIMINGS: dict[str, float] = {}
+
+
+def _timed(name: str, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    TIMINGS[name] = time.perf_counter() - t0
+    print(f"[refresh] {name}: {TIMINGS[name]:.2f}s", flush=True)
+    return out
+
+
+def load_new(path: Path, layout: str, rules: dict, target: str, policy: str):
+    """``(X, y)`` of a new labeled batch in the ``layout`` of ``datasets/<layout>``, validated against ``rules``.
+
+    The file is read without dtypes (a blank or text cell must reach ``validate``, not fail the parse); rows whose
+    ``target`` is missing, or not a number for a numeric target, are dropped before validation.
+    """
+    spec = SPECS[layout]
+    raw = clean_cols(pd.read_csv(path, sep=spec.sep, encoding="utf-8-sig"))
+    if target not in raw.columns:
+        raise ValueError(f"{path.name} has no {target!r} column")
+    y = raw[target] if spec.dtype(target) == "object" else pd.to_numeric(raw[target], errors="coerce")
+    labeled = y.notna().to_numpy()
+    v = validate(raw[labeled], rules, policy=policy)
+    print(f"  {path.name}: {len(raw):,} rows, {(~labeled).sum():,} without {target}, {v.rejected:,} rejected, "
+          f"{len(v.errors):,} bad cells")
+    return v.frame, y[labeled][v.kept]
+
+
+def recent_rows(X: pd.DataFrame, y: pd.Series, n: int):
+    """The ``n`` latest rows of a shuffled split, by original file position."""
+    X, y = X.sort_index(), y.sort_index()
+    return X.iloc[len(X) - min(n, len(X)):], y.iloc[len(y) - min(n, len(y)):]
+
+
+def split_new(X, y, stratify: bool, holdout: float = 0.2, min_rows: int = 50):
+    """``(X_fit, y_fit, X_hold, y_hold)``; ``stratify`` on the labels only when every class has two rows to split."""
+    if len(X) < min_rows:
+        return X, y, X.iloc[:0], y.iloc[:0]
+    stratify = stratify and y.value_counts().min() >= 2
+    X_fit, X_hold, y_fit, y_hold = train_test_split(X, y, test_size=holdout, stratify=y if stratify else None,
+                                                    random_state=SEED)
+    return X_fit, y_fit, X_hold, y_hold
+
+
+# ============== Drop-out forest ==============
+def refresh_forest(pipe, X: pd.DataFrame, y: pd.Series, new_trees: int, max_trees: int):
+    """Copy of ``pipe`` with ``new_trees`` trees grown on ``(X, y)`` and the oldest evicted down to ``max_trees``."""
+    pipe = copy.deepcopy(pipe)
+    pre, clf = pipe.named_steps["pre"], pipe.named_steps["clf"]
+    Xt = pre.transform(X)
+    minority = int(np.bincount(np.asarray(y), minlength=2).min())
+    if minority > 1:  # SMOTE as in training; a batch without positives can't be resampled
+        Xt, y = SMOTE(random_state=SEED, k_neighbors=min(5, minority - 1)).fit_resample(Xt, y)
+    before = len(clf.estimators_)
+    clf.set_params(warm_start=True, n_estimators=before + new_trees)
+    with warnings.catch_warnings():  # "balanced" is moot here: the window is already balanced by SMOTE
+        warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+        clf.fit(Xt, y)
+    evicted = max(0, len(clf.estimators_) - max_trees)
+    clf.estimators_ = clf.estimators_[evicted:]  # estimators_ is in fit order: the oldest come first
+    clf.set_params(warm_start=False, n_estimators=len(clf.estimators_))
+    return pipe, {"trees_before": before, "trees_added": new_trees, "trees_evicted": evicted,
+                  "trees_after": len(clf.estimators_), "window_rows": len(X), "fit_rows": len(Xt)}
+
+
+def dropout_metrics(pipe, X, y, thresholds: dict) -> dict:
+    if not len(X) or y.nunique() < 2:
+        return {}
+    prob = pipe.predict_proba(X)[:, 1]
+    return {"rows": len(X), "roc_auc": roc_auc_score(y, prob), "pr_auc": average_precision_score(y, prob),
+            **{name: classification_metrics(y, prob, thr) for name, thr in thresholds.items()}}
+
+
+# ============== G3 linear model ==============
+def refresh_linear(pipe, X: pd.DataFrame, y: pd.Series):
+    """Copy of the ``ElasticNetCV`` pipeline refit on ``(X, y)`` at its chosen penalty, warm-started from its coefficients."""
+    pipe = copy.deepcopy(pipe)
+    prep, reg = pipe.steps[0][1], pipe.steps[-1][1]
+    enet = ElasticNet(alpha=reg.alpha_, l1_ratio=reg.l1_ratio_, max_iter=reg.max_iter, tol=reg.tol,
+                      selection=reg.selection, warm_start=True)
+    enet.coef_ = np.array(reg.coef_, dtype=np.float64)
+    enet.fit(prep.transform(X), y)
+    iters_before = reg.n_iter_
+    reg.coef_, reg.intercept_, reg.n_iter_, reg.dual_gap_ = enet.coef_, enet.intercept_, enet.n_iter_, enet.dual_gap_
+    return pipe, {"alpha": reg.alpha_, "l1_ratio": reg.l1_ratio_, "window_rows": len(X), "cd_iterations": int(enet.n_iter_),
+                  "cd_iterations_full_fit": int(iters_before), "nonzero_coefs": int(np.count_nonzero(reg.coef_))}
+
+
+def g3_metrics(pipe, X, y) -> dict:
+    if not len(X):
+        return {}
+    pred = pipe.predict(X)
+    return {"rows": len(X), "mae": mean_absolute_error(y, pred), "rmse": float(np.sqrt(mean_squared_error(y, pred))),
+            "r2": r2_score(y, pred)}
+
+
+def g3_split(data_dir: Path):
+    """train.train_g3's split of ``student-por.csv``."""
+    reg = read_dataset(data_dir / "student-por.csv")
+    return train_test_split(reg.drop(columns=["G3"]), reg["G3"], test_size=0.2, random_state=SEED)
+
+
+# ============== Entry point ==============
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--dropout-new", type=Path, help="newly labeled drop-out cohort (data.csv layout, with Target)")
+    ap.add_argument("--g3-new", type=Path, help="newly labeled G3 batch (student-por.csv layout, with G3)")
+    ap.add_argument("--data-dir", type=Path, default=ROOT / "datasets")
+    ap.add_argument("--models-dir", type=Path, default=ROOT / "models")
+    ap.add_argument("--artifacts-dir", type=Path, default=ROOT / "artifacts")
+    ap.add_argument("--new-trees", type=int, default=50)
+    ap.add_argument("--max-trees", type=int, default=250, help="forest size bound; the oldest trees are evicted beyond it")
+    ap.add_argument("--recent", type=int, default=2000, help="latest rows of the current training split added to the window")
+    ap.add_argument("--policy", choices=("default", "clip", "reject"), default="reject", help="for bad cells in new rows")
+    ap.add_argument("--time-full", action="store_true", help="also time a full retrain (outcomes.train, without writing)")
+    ap.add_argument("--jobs", type=int, default=-1, help="worker processes for --time-full")
+    args = ap.parse_args(argv)
+    if args.dropout_new is None and args.g3_new is None:
+        ap.error("nothing to refresh: pass --dropout-new and/or --g3-new")
+
+    from .registry import REGISTRY
+    schema = REGISTRY.json(args.artifacts_dir / "schema.json")
+    defaults = REGISTRY.json(args.artifacts_dir / "defaults.json")["defaults"]
+    g3_defaults = REGISTRY.json(args.artifacts_dir / "g3_defaults.json")
+    report = {"params": {"new_trees": args.new_trees, "max_trees": args.max_trees, "recent": args.recent,
+                         "policy": args.policy}}
+    t0 = time.perf_counter()
+
+    if args.dropout_new is not None:
+        pipe = REGISTRY.model(args.models_dir / "dropout_model.pkl")
+        rules = dropout_rules(schema, defaults)
+        X_new, y_new = load_new(args.dropout_new, "data.csv", rules, "Target", args.policy)
+        y_new = (y_new == "Dropout").astype(int)
+        X_fit, y_fit, X_hold, y_hold = split_new(X_new, y_new, stratify=True)
+        X_train, X_test, y_train, y_test = load_dropout(args.data_dir)
+        X_old, y_old = recent_rows(X_train[list(rules)], y_train, args.recent)
+        window = pd.concat([X_old, X_fit]), pd.concat([y_old, y_fit])
+        refreshed, info = _timed("dropout: warm-start trees", refresh_forest, pipe, *window, args.new_trees, args.max_trees)
+        thresholds = {k: float(v) for k, v in schema["thresholds"].items()}
+        report["dropout"] = {**info, "new_rows": len(X_new), "holdout_rows": len(X_hold),
+                             "before": {"test": dropout_metrics(pipe, X_test, y_test, thresholds),
+                                        "new_holdout": dropout_metrics(pipe, X_hold, y_hold, thresholds)},
+                             "after": {"test": dropout_metrics(refreshed, X_test, y_test, thresholds),
+                                       "new_holdout": dropout_metrics(refreshed, X_hold, y_hold, thresholds)}}
+        joblib.dump(refreshed, args.models_dir / "dropout_model_refreshed.pkl")
+
+    if args.g3_new is not None:
+        pipe = REGISTRY.model(args.models_dir / "g3_model.pkl")
+        rules = g3_rules(g3_defaults)
+        X_new, y_new = load_new(args.g3_new, "student-por.csv", rules, "G3", args.policy)
+        X_fit, y_fit, X_hold, y_hold = split_new(X_new, y_new.astype(np.float64), stratify=False)
+        X_train, X_test, y_train, y_test = g3_split(args.data_dir)
+        X_old, y_old = recent_rows(X_train[list(rules)], y_train, args.recent)
+        window = pd.concat([X_old, X_fit]), pd.concat([y_old.astype(np.float64), y_fit])
+        refreshed, info = _timed("g3: warm-start ElasticNet", refresh_linear, pipe, *window)
+        report["g3"] = {**info, "new_rows": len(X_new), "holdout_rows": len(X_hold),
+                        "before": {"test": g3_metrics(pipe, X_test, y_test), "new_holdout": g3_metrics(pipe, X_hold, y_hold)},
+                        "after": {"test": g3_metrics(refreshed, X_test, y_test),
+                                  "new_holdout": g3_metrics(refreshed, X_hold, y_hold)}}
+        joblib.dump(refreshed, args.models_dir / "g3_model_refreshed.pkl")
+
+    TIMINGS["total"] = time.perf_counter() - t0
+    full = None
+    if args.time_full:
+        t1 = time.perf_counter()
+        train_dropout(args.data_dir, args.jobs, compare=False)
+        train_g3(args.data_dir, args.jobs)
+        full = time.perf_counter() - t1
+    elif (args.artifacts_dir / "training_report.json").exists():
+        with open(args.artifacts_dir / "training_report.json") as f:
+            full = json.load(f).get("timings_s", {}).get("total")
+    report["timings_s"] = {**TIMINGS, "full_retrain": full}
+    with open(args.artifacts_dir / "refresh_report.json", "w") as f:
+        json.dump(report, f, indent=2, default=float)
+
+    for kind, key in (("dropout", "roc_auc"), ("g3", "mae")):
+        if kind in report:
+            b, a = report[kind]["before"], report[kind]["after"]
+            line = " · ".join(f"{split} {key} {b[split][key]:.4f} → {a[split][key]:.4f}"
+                              for split in ("test", "new_holdout") if b[split])
+            print(f"[refresh] {kind}: {line}")
+    vs = f" vs full retrain {full:.1f}s ({full / TIMINGS['total']:.0f}x)" if full else ""
+    print(f"[refresh] done in {TIMINGS['total']:.1f}s{vs} → {args.models_dir}/*_refreshed.pkl, "
+          f"{args.artifacts_dir / 'refresh_report.json'}")
+
+
+if __name__ == "__main__":
+    main()
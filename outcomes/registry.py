@@ -0,0 +1,155 @@
+"""Process-wide registry for model pipelines and JSON artifacts.
+
+Streamlit re-executes ``app.py`` on every widget interaction, but modules it
+imports stay in ``sys.modules``. Holding loaded artifacts here means each file is
+read once per server process and shared by every session; it is only re-read
+when its bytes change on disk.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass
+class Entry:
+    path: Path
+    value: object
+    mtime_ns: int
+    size: int
+    digest: str
+    load_seconds: float
+    rss_delta_bytes: int
+    array_bytes: int
+    loads: int = 1
+
+
+def file_digest(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def rss_bytes() -> int:
+    """Current resident set size (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def array_bytes(obj, _seen=None) -> int:
+    """Bytes held by NumPy arrays reachable from ``obj`` (fitted estimators, tree nodes...)."""
+    seen = {} if _seen is None else _seen  # id -> obj, kept alive so ids of temporaries aren't reused
+    if id(obj) in seen or obj is None or isinstance(obj, (str, bytes, int, float, bool, type)):
+        return 0
+    seen[id(obj)] = obj
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + (sum(array_bytes(v, seen) for v in obj.flat) if obj.dtype == object else 0)
+    if isinstance(obj, dict):
+        return sum(array_bytes(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(array_bytes(v, seen) for v in obj)
+    state = getattr(obj, "__dict__", None)
+    if state is None:
+        try: state = obj.__getstate__()  # Cython objects such as sklearn's Tree
+        except Exception: return 0
+    return array_bytes(state, seen) if isinstance(state, dict) else 0
+
+
+class ArtifactRegistry:
+    """Load-once cache keyed by path; reloads when the file's content changes.
+
+    Every ``get`` stats the file (for a memory-mapped export, its manifest). If
+    mtime and size are unchanged the cached object is returned; otherwise the
+    file is hashed and only reloaded when the digest differs (a ``touch`` or a
+    re-copy of identical bytes keeps the cached object).
+    """
+
+    def __init__(self):
+        self._entries: dict[Path, Entry] = {}
+        self._locks: dict[Path, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, path: Path) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def get(self, path, loader):
+        path = Path(path).resolve()
+        st_ = path.stat()
+        entry = self._entries.get(path)
+        if entry is not None and (entry.mtime_ns, entry.size) == (st_.st_mtime_ns, st_.st_size):
+            return entry.value
+        with self._lock_for(path):
+            entry = self._entries.get(path)
+            st_ = path.stat()
+            if entry is not None and (entry.mtime_ns, entry.size) == (st_.st_mtime_ns, st_.st_size):
+                return entry.value
+            digest = file_digest(path)
+            if entry is not None and entry.digest == digest:
+                entry.mtime_ns, entry.size = st_.st_mtime_ns, st_.st_size
+                return entry.value
+            rss0, t0 = rss_bytes(), time.perf_counter()
+            value = loader(path)
+            elapsed, rss1 = time.perf_counter() - t0, rss_bytes()
+            self._entries[path] = Entry(
+                path=path, value=value, mtime_ns=st_.st_mtime_ns, size=st_.st_size, digest=digest,
+                load_seconds=elapsed, rss_delta_bytes=max(rss1 - rss0, 0), array_bytes=array_bytes(value),
+                loads=(entry.loads + 1) if entry is not None else 1,
+            )
+            return value
+
+    def model(self, path):
+        """A pickled pipeline, or a memory-mapped export when ``path`` is a ``.mm`` directory."""
+        if Path(path).is_dir():
+            from . import mmap_store
+            return self.get(Path(path) / mmap_store.MANIFEST, mmap_store.load)
+        import joblib  # deferred with sklearn: neither is needed until a pickle is read
+        from .transformers import install_pickle_aliases
+        install_pickle_aliases()
+        return self.get(path, joblib.load)
+
+    def json(self, path):
+        return self.get(path, _load_json)
+
+    def loaded(self, path) -> bool:
+        """Whether ``path`` (a file or a ``.mm`` export) is already in memory, without loading it."""
+        path = Path(path).resolve()
+        return (path / "manifest.json" if path.is_dir() else path) in self._entries
+
+    def version(self, path) -> str:
+        """Short content hash of a loaded file (e.g. to namespace caches or tag predictions)."""
+        path = Path(path).resolve()
+        entry = self._entries.get(path / "manifest.json" if path.is_dir() else path)
+        return entry.digest[:12] if entry is not None else ""
+
+    def invalidate(self, path=None):
+        with self._guard:
+            if path is None: self._entries.clear()
+            else: self._entries.pop(Path(path).resolve(), None)
+
+    def stats(self) -> list[dict]:
+        return [{
+            "file": f"{e.path.parent.name}/{e.path.name}" if e.path.parent.suffix == ".mm" else e.path.name,
+            "size_mb": e.size / 1e6, "load_ms": e.load_seconds * 1e3,
+            "rss_delta_mb": e.rss_delta_bytes / 1e6, "array_mb": e.array_bytes / 1e6,
+            "loads": e.loads, "sha256": e.digest[:12],
+        } for e in self._entries.values()]
+
+
+def _load_json(path: Path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# One registry per server process, shared by every Streamlit session.
+REGISTRY = ArtifactRegistry()
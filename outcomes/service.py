@@ -0,0 +1,291 @@
+"""Local HTTP scoring service with request micro-batching.
+
+    python -m outcomes.service                          # http://127.0.0.1:8502
+    python -m outcomes.service --window-ms 5 --max-batch 512 --max-rows 5000 --policy reject
+
+Endpoints (JSON in, JSON out):
+
+* ``POST /v1/dropout``  ``{"rows": [{...}, ...], "threshold": 0.26}`` (or one row object)
+  -> ``{"probability": [...], "flag": [...], "threshold", "model_version", "errors": [...]}``
+* ``POST /v1/g3``       ``{"rows": [{...}, ...]}`` -> ``{"g3": [...], "model_version", "errors": [...]}``
+* ``GET /metrics``      per-model requests, rows, batches, queue depth, rows/s, latency p50/p95
+* ``GET /healthz``
+
+Models and artifacts are the app's (same files, same ``REGISTRY``, a ``.mm``
+export preferred over the pickle, the compiled drop-out engine). Rows are
+validated with ``outcomes.validate`` (missing fields are filled from the
+defaults); a row rejected under ``--policy reject`` scores as ``null``. A
+request is a 400 before it is queued when it has more than ``--max-rows`` rows,
+a field value that is not a string, number, boolean or null, or a threshold
+that is not a number in [0, 1].
+
+Concurrent requests are coalesced: a scoring thread per model takes the first
+queued request, keeps collecting for up to ``--window-ms`` or ``--max-batch``
+rows, then makes one ``predict_proba`` / ``predict`` call for all of them. If
+that call fails, each request of the batch is scored on its own, so only the
+one that caused the failure gets the error.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .forest import compile_pipeline
+from .registry import REGISTRY
+from .validate import dropout_rules, g3_rules, validate
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_threshold(value) -> float:
+    """A request's threshold as a float; ``ValueError`` unless it is a finite number in [0, 1]."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0.0 <= value <= 1.0:
+        raise ValueError(f"threshold must be a number in [0, 1], got {json.dumps(value)}")
+    return float(value)
+
+
+def parse_rows(body, max_rows: int) -> list:
+    """A request's rows; ``ValueError`` unless they are 1 to ``max_rows`` objects of scalar fields."""
+    rows = body["rows"] if isinstance(body, dict) and "rows" in body else [body]
+    if not isinstance(rows, list) or not rows or not all(isinstance(r, dict) for r in rows):
+        raise ValueError("expected a row object or {\"rows\": [row objects]}")
+    if len(rows) > max_rows:
+        raise ValueError(f"at most {max_rows} rows per request, got {len(rows)}")
+    for i, r in enumerate(rows):
+        for k, v in r.items():
+            if v is not None and not isinstance(v, (str, int, float, bool)):
+                raise ValueError(f"row {i}: field {k!r} must be a string, number, boolean or null, got {json.dumps(v)}")
+    return rows
+
+
+@dataclass
+class _Request:
+    rows: list
+    future: Future = field(default_factory=Future)
+    t0: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Coalesces submitted row lists into batched ``score(df) -> (values, errors)`` calls on one worker thread."""
+
+    def __init__(self, score, window_ms: float = 5.0, max_batch: int = 512):
+        self.score, self.window, self.max_batch = score, window_ms / 1e3, max_batch
+        self._q: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latency = deque(maxlen=2048)
+        self._batches = deque(maxlen=2048)  # (finish time, rows)
+        self.requests = self.rows = self.batches = self.max_depth = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: list) -> Future:
+        req = _Request(rows)
+        self._q.put(req)
+        with self._lock:
+            self.max_depth = max(self.max_depth, self._q.qsize())
+        return req.future
+
+    def close(self):
+        self._q.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Request) -> list:
+        items, n = [first], len(first.rows)
+        deadline = time.perf_counter() + self.window
+        while n < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._q.get(timeout=timeout) if timeout > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._q.put(None)  # let the main loop see the stop marker after this batch
+                break
+            items.append(item); n += len(item.rows)
+        return items
+
+    def _run(self):
+        while (first := self._q.get()) is not None:
+            items = self._collect(first)
+            df = pd.DataFrame([r for it in items for r in it.rows])
+            try:
+                self._resolve(items, *self.score(df))
+            except Exception as e:
+                if len(items) == 1:
+                    first.future.set_exception(e)
+                    continue
+                for it in items:  # one bad request must not fail the others: score each on its own
+                    try:
+                        self._resolve([it], *self.score(pd.DataFrame(it.rows)))
+                    except Exception as e1:
+                        it.future.set_exception(e1)
+            done = time.perf_counter()
+            with self._lock:
+                self.requests += len(items); self.rows += len(df); self.batches += 1
+                self._batches.append((done, len(df)))
+                self._latency.extend(done - it.t0 for it in items)
+
+    @staticmethod
+    def _resolve(items: list, values, errors):
+        start = 0
+        for it in items:
+            stop = start + len(it.rows)
+            errs = errors if errors.empty else \
+                errors[(errors["row"] >= start) & (errors["row"] < stop)].assign(row=lambda d: d["row"] - start)
+            it.future.set_result((values[start:stop], errs))
+            start = stop
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lat = np.asarray(self._latency) * 1e3
+            recent = [(t, n) for t, n in self._batches if t >= time.perf_counter() - 10.0]
+        rate = sum(n for _, n in recent) / 10.0
+        return {"requests": self.requests, "rows": self.rows, "batches": self.batches,
+                "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "queue_depth": self._q.qsize(), "max_queue_depth": self.max_depth, "rows_per_s_10s": rate,
+                "latency_p50_ms": float(np.percentile(lat, 50)) if lat.size else None,
+                "latency_p95_ms": float(np.percentile(lat, 95)) if lat.size else None,
+                "window_ms": self.window * 1e3, "max_batch": self.max_batch}
+
+
+def model_path(models_dir: Path, name: str) -> Path:
+    mm = models_dir / f"{name}.mm"
+    return mm if (mm / "manifest.json").exists() else models_dir / f"{name}.pkl"
+
+
+class ScoringService:
+    """The two models with their validation rules, each behind its own ``MicroBatcher``."""
+
+    def __init__(self, root: Path = ROOT, policy: str = "default", window_ms: float = 5.0, max_batch: int = 512,
+                 max_rows: int = 5000):
+        artifacts = root / "artifacts"
+        self.schema = REGISTRY.json(artifacts / "schema.json")
+        self.threshold = float(self.schema.get("thresholds", {}).get("balanced", 0.50))
+        self.dropout_path, self.g3_path = model_path(root / "models", "dropout_model"), model_path(root / "models", "g3_model")
+        self.defaults = {"dropout": REGISTRY.json(artifacts / "defaults.json")["defaults"],
+                         "g3": REGISTRY.json(artifacts / "g3_defaults.json")}
+        self.dropout_rules = dropout_rules(self.schema, self.defaults["dropout"])
+        self.g3_rules = g3_rules(self.defaults["g3"])
+        self.policy, self.max_rows = policy, max_rows
+        self.batchers = {"dropout": MicroBatcher(self._score_dropout, window_ms, max_batch),
+                         "g3": MicroBatcher(self._score_g3, window_ms, max_batch)}
+
+    def _score(self, df, rules, predict):
+        v = validate(df, rules, policy=self.policy)
+        out = np.full(len(df), np.nan)
+        if len(v.frame): out[v.kept] = predict(v.frame)
+        return out, v.errors
+
+    def _score_dropout(self, df):
+        pipe = REGISTRY.model(self.dropout_path)  # a stat per batch; reloads when the file changes
+        model = compile_pipeline(pipe) or pipe
+        return self._score(df, self.dropout_rules, lambda X: model.predict_proba(X)[:, 1])
+
+    def _score_g3(self, df):
+        return self._score(df, self.g3_rules, REGISTRY.model(self.g3_path).predict)
+
+    def predict(self, kind: str, rows: list, threshold=None, timeout: float = 30.0) -> dict:
+        # Fields a row leaves out take the defaults here, so a row scores the same whatever it is batched with.
+        rows = [{**self.defaults[kind], **r} for r in rows]
+        values, errors = self.batchers[kind].submit(rows).result(timeout=timeout)
+        vals = [None if np.isnan(x) else float(x) for x in values]
+        res = {"model_version": REGISTRY.version(self.dropout_path if kind == "dropout" else self.g3_path),
+               "errors": errors.to_dict("records") if len(errors) else []}
+        if kind == "g3":
+            return {"g3": vals, **res}
+        thr = self.threshold if threshold is None else parse_threshold(threshold)
+        return {"probability": vals, "flag": [None if p is None else int(p >= thr) for p in vals], "threshold": thr, **res}
+
+    def metrics(self) -> dict:
+        return {kind: b.metrics() for kind, b in self.batchers.items()}
+
+    def close(self):
+        for b in self.batchers.values(): b.close()
+
+
+def make_handler(service: ScoringService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, obj):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics": self._send(200, service.metrics())
+            elif self.path == "/healthz": self._send(200, {"status": "ok"})
+            else: self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            kind = {"/v1/dropout": "dropout", "/v1/g3": "g3"}.get(self.path)
+            if kind is None:
+                return self._send(404, {"error": f"unknown path {self.path}"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                rows = parse_rows(body, service.max_rows)
+                threshold = None
+                if kind == "dropout" and isinstance(body, dict) and "threshold" in body:
+                    threshold = parse_threshold(body["threshold"])
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send(400, {"error": str(e)})
+            try:
+                self._send(200, service.predict(kind, rows, threshold=threshold))
+            except (ValueError, TypeError) as e:  # this request's rows could not be scored, even on their own
+                self._send(400, {"error": f"{type(e).__name__}: {e}"})
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, *args):  # keep stdout quiet under load
+            pass
+
+    return Handler
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # listen backlog; socketserver's default of 5 resets bursts of new connections
+
+
+def serve(host: str = "127.0.0.1", port: int = 8502, **kwargs) -> Server:
+    """A bound server; call ``serve_forever()`` (or run it in a thread), then ``shutdown()`` and ``service.close()``."""
+    service = ScoringService(**kwargs)
+    server = Server((host, port), make_handler(service))
+    server.service = service
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("--window-ms", type=float, default=5.0, help="how long a batch waits for more requests")
+    ap.add_argument("--max-batch", type=int, default=512, help="rows per model call")
+    ap.add_argument("--max-rows", type=int, default=5000, help="rows per request (more is a 400)")
+    ap.add_argument("--policy", choices=("default", "clip", "reject"), default="default", help="invalid-value handling")
+    args = ap.parse_args(argv)
+    server = serve(args.host, args.port, policy=args.policy, window_ms=args.window_ms, max_batch=args.max_batch,
+                   max_rows=args.max_rows)
+    print(f"scoring on http://{args.host}:{server.server_address[1]} (window {args.window_ms} ms, max batch {args.max_batch})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close(); server.service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Distilled Quick-mode surrogate for the drop-out forest, with a fidelity report.
+
+    python -m outcomes.surrogate                   # models/dropout_quick.pkl + artifacts/dropout_quick.json
+    python -m outcomes.surrogate --trees 150 --depth 3
+    python -m outcomes.train --distill             # the same, after retraining the forest
+
+Quick mode only takes ``quick_fields``; every other input is the dataset
+default. The surrogate is a shallow ``GradientBoostingRegressor`` over the quick
+fields alone, fitted to the forest's probabilities on such rows: the training
+split's quick values plus ``augment`` rows drawn independently from their
+marginals (the form accepts any combination). It is compiled to flat node
+arrays (``CompiledBoosting``) and saved as a separate artifact.
+
+The report compares surrogate and forest on the held-out split in Quick form:
+decision agreement at the Balanced and High Recall thresholds, probability
+error, ROC AUC against the true labels (``auc_gap`` = forest minus surrogate)
+and single-row latency. The app serves Quick mode from the surrogate only while
+``serves`` holds: ``meets_bounds`` for its configured bounds and
+``matches_teacher`` for the forest being served. Otherwise Quick mode falls back
+to the forest; either way the probability, explanation and what-if sweep come
+from the same model.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .forest import CompiledBoosting, QuickSurrogate, compile_pipeline
+
+ROOT = Path(__file__).resolve().parent.parent
+MIN_AGREEMENT, MAX_AUC_GAP = 0.97, 0.01
+
+
+def quick_rows(X: pd.DataFrame, fields, defaults: dict) -> pd.DataFrame:
+    """``X`` as Quick mode sees it: ``fields`` kept, every other column set to its default."""
+    return pd.DataFrame({c: X[c].to_numpy() if c in fields else np.full(len(X), defaults[c])
+                         for c in X.columns}, index=X.index)
+
+
+def meets_bounds(report: dict, min_agreement: float = MIN_AGREEMENT, max_auc_gap: float = MAX_AUC_GAP) -> bool:
+    return min(report["agreement"].values()) >= min_agreement and report["auc_gap"] <= max_auc_gap
+
+
+def matches_teacher(report: dict, model, defaults: dict, cols) -> bool:
+    """Whether ``model`` (the served forest: pipeline, engine or export) is the one ``report`` was distilled from."""
+    check = report["teacher_check"]
+    rows = pd.DataFrame([{**defaults, **r} for r in check["rows"]], columns=list(cols))
+    return bool(np.allclose(model.predict_proba(rows)[:, 1], check["proba"], rtol=0.0, atol=1e-9))
+
+
+def serves(report: dict, model, defaults: dict, cols,
+           min_agreement: float = MIN_AGREEMENT, max_auc_gap: float = MAX_AUC_GAP) -> bool:
+    """Whether Quick mode may use the surrogate behind ``report`` next to ``model`` rather than ``model`` itself."""
+    return meets_bounds(report, min_agreement, max_auc_gap) and matches_teacher(report, model, defaults, cols)
+
+
+def _latency_ms(predict, row: pd.DataFrame, n: int = 200) -> float:
+    predict(row)
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter(); predict(row); times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1e3)
+
+
+def distill(pipe, data_dir: Path, defaults: dict, thresholds: dict, fields=None,
+            trees: int = 300, depth: int = 4, augment: int = 20000):
+    """``(QuickSurrogate, report)`` for the fitted drop-out ``pipe`` on the notebook's train/test split."""
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.metrics import roc_auc_score
+
+    from .train import QUICK_FIELDS, SEED, load_dropout
+
+    fields = list(QUICK_FIELDS if fields is None else fields)
+    X_train, X_test, _, y_test = load_dropout(data_dir)
+    rng = np.random.default_rng(SEED)
+    extra = X_train.iloc[rng.integers(0, len(X_train), augment)].reset_index(drop=True)
+    for c in fields:  # break the joint distribution of the quick fields, keep their marginals
+        extra[c] = X_train[c].to_numpy()[rng.integers(0, len(X_train), augment)]
+    fit_rows = quick_rows(pd.concat([X_train.reset_index(drop=True), extra], ignore_index=True), fields, defaults)
+    teacher = pipe.predict_proba(fit_rows)[:, 1]
+    gbr = GradientBoostingRegressor(n_estimators=trees, max_depth=depth, random_state=SEED)
+    gbr.fit(fit_rows[fields].to_numpy(dtype=np.float64), teacher)
+    surrogate = QuickSurrogate(CompiledBoosting(gbr), fields, pipe.classes_)
+
+    holdout = quick_rows(X_test, fields, defaults)
+    p_forest, p_quick = pipe.predict_proba(holdout)[:, 1], surrogate.predict_proba(holdout)[:, 1]
+    err = np.abs(p_quick - p_forest)
+    auc_forest, auc_quick = roc_auc_score(y_test, p_forest), roc_auc_score(y_test, p_quick)
+    reference = quick_rows(X_test.iloc[:1], fields, defaults)
+    engine = compile_pipeline(pipe) or pipe
+    report = {
+        "fields": fields, "trees": trees, "depth": depth, "fit_rows": len(fit_rows), "holdout_rows": len(holdout),
+        "thresholds": dict(thresholds),
+        "agreement": {name: float(np.mean((p_quick >= t) == (p_forest >= t))) for name, t in thresholds.items()},
+        "auc": {"forest": float(auc_forest), "surrogate": float(auc_quick)},
+        "auc_gap": float(auc_forest - auc_quick),
+        "mae": float(err.mean()), "max_abs_error": float(err.max()),
+        "latency_ms": {"forest": _latency_ms(engine.predict_proba, reference),
+                       "surrogate": _latency_ms(surrogate.predict_proba, reference)},
+        # A few forest probabilities, so a surrogate is only used next to the forest it was distilled from.
+        "teacher_check": {"rows": holdout[fields].iloc[:16].to_dict("records"), "proba": p_forest[:16].tolist()},
+    }
+    return surrogate, report
+
+
+def write(surrogate, report: dict, models_dir: Path, artifacts_dir: Path):
+    """Pickle the surrogate (and refresh its memory-mapped export if there is one) and write the report."""
+    import joblib
+
+    from . import mmap_store
+    joblib.dump(surrogate, models_dir / "dropout_quick.pkl")
+    if (models_dir / "dropout_quick.mm").exists():
+        mmap_store.export(surrogate, models_dir / "dropout_quick.mm")
+    with open(artifacts_dir / "dropout_quick.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def summary(report: dict) -> str:
+    agree = " · ".join(f"{k} {v:.1%}" for k, v in report["agreement"].items())
+    return (f"agreement {agree} · AUC {report['auc']['surrogate']:.3f} vs forest {report['auc']['forest']:.3f} "
+            f"(gap {report['auc_gap']:+.4f}) · MAE {report['mae']:.4f} · "
+            f"{report['latency_ms']['surrogate']:.2f} ms vs {report['latency_ms']['forest']:.2f} ms per row")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--data-dir", type=Path, default=ROOT / "datasets")
+    ap.add_argument("--models-dir", type=Path, default=ROOT / "models")
+    ap.add_argument("--artifacts-dir", type=Path, default=ROOT / "artifacts")
+    ap.add_argument("--trees", type=int, default=300)
+    ap.add_argument("--depth", type=int, default=4)
+    ap.add_argument("--augment", type=int, default=20000, help="extra rows sampled from the quick fields' marginals")
+    args = ap.parse_args(argv)
+
+    from .registry import REGISTRY
+    pipe = REGISTRY.model(args.models_dir / "dropout_model.pkl")
+    schema = REGISTRY.json(args.artifacts_dir / "schema.json")
+    blob = REGISTRY.json(args.artifacts_dir / "defaults.json")
+    thresholds = {k: float(schema["thresholds"][k]) for k in ("balanced", "high_recall")}
+    surrogate, report = distill(pipe, args.data_dir, blob["defaults"], thresholds, blob["quick_fields"],
+                                trees=args.trees, depth=args.depth, augment=args.augment)
+    write(surrogate, report, args.models_dir, args.artifacts_dir)
+    print(summary(report))
+    print(f"within default bounds (agreement ≥ {MIN_AGREEMENT:.0%}, AUC gap ≤ {MAX_AUC_GAP}): {meets_bounds(report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""What-if sweeps: expand one input row over a grid of one or two features and score it in one call."""
+import numpy as np
+import pandas as pd
+
+
+def grid_values(lo, hi, step, max_points: int = 61) -> np.ndarray:
+    """Points from ``lo`` to ``hi`` at ``step``, thinned to at most ``max_points`` (integers stay integers)."""
+    n = int(np.floor((hi - lo) / step + 1e-9)) + 1
+    if n <= max_points:
+        vals = lo + step * np.arange(n)
+    else:
+        vals = np.linspace(lo, hi, max_points)
+    if float(step).is_integer() and float(lo).is_integer():
+        return np.unique(np.round(vals).astype(np.int64))
+    return np.round(vals, 6)
+
+
+def expand_grid(row: dict, axes: dict, columns) -> pd.DataFrame:
+    """``row`` repeated once per grid point, with each swept feature set from the Cartesian product of ``axes``."""
+    mesh = np.meshgrid(*[np.asarray(v) for v in axes.values()], indexing="ij")
+    n = mesh[0].size
+    data = {c: np.repeat(np.asarray([row[c]], dtype=object if isinstance(row[c], str) else None), n) for c in columns}
+    for name, m in zip(axes, mesh):
+        data[name] = m.ravel().astype(type(row[name]) if isinstance(row[name], (int, float)) else m.dtype)
+    return pd.DataFrame(data, columns=list(columns))
+
+
+def sweep(predict, row: dict, axes: dict, columns) -> pd.DataFrame:
+    """Swept feature values plus a ``prediction`` column from a single batched ``predict(X)`` call."""
+    X = expand_grid(row, axes, columns)
+    out = X[list(axes)].copy()
+    out["prediction"] = np.asarray(predict(X), dtype=np.float64)
+    return out
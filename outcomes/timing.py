@@ -0,0 +1,193 @@
+"""Opt-in per-stage wall-time instrumentation for the loaded pipelines.
+
+``instrument(model, "dropout")`` walks a fitted pipeline (``Pipeline`` steps,
+``ColumnTransformer`` branches such as ``pre/num/winsor``, the final estimator)
+or a compiled engine (``pre``, ``forest``) and shadows each ``transform`` /
+``predict`` / ``predict_proba`` with a timed wrapper on the instance. Every call
+lands in a ``StageTimer`` (a bounded rolling window per stage, so p50/p95 track
+recent traffic) and, when the ``outcomes.timing`` logger is enabled for INFO, in
+one JSON log line. ``uninstrument`` removes the wrappers again.
+
+Loaded models are shared by every session in the process (see ``registry``), so
+instrumentation is process-wide as well. ``TimingLease`` reference-counts it:
+one lease per session, the wrappers go on when the first lease holds a model and
+come off when the last one lets go (or its session is garbage collected), so no
+session switches timing off under another. Exporting an instrumented object with
+``mmap_store`` is not supported; exports are made from freshly loaded pickles.
+"""
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+import numpy as np
+
+log = logging.getLogger("outcomes.timing")
+
+METHODS = ("transform", "predict", "predict_proba")
+
+
+class StageTimer:
+    """Last ``window`` durations per ``(model, stage, method)`` plus lifetime call counts."""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._times: dict[tuple, deque] = {}
+        self._calls: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, stage: str, method: str, seconds: float, rows: int):
+        key = (model, stage, method)
+        with self._lock:
+            if key not in self._times:
+                self._times[key] = deque(maxlen=self.window)
+                self._calls[key] = 0
+            self._times[key].append(seconds)
+            self._calls[key] += 1
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps({"event": "stage_time", "model": model, "stage": stage, "method": method,
+                                 "ms": round(seconds * 1e3, 4), "rows": rows}))
+
+    def clear(self):
+        with self._lock:
+            self._times.clear()
+            self._calls.clear()
+
+    def summary(self) -> list[dict]:
+        """One row per stage in first-seen order: call count, window size, p50/p95/last in ms."""
+        with self._lock:
+            items = [(k, np.asarray(v) * 1e3, self._calls[k]) for k, v in self._times.items()]
+        return [{"model": m, "stage": s, "method": meth, "calls": calls, "window": len(ms),
+                 "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)), "last_ms": float(ms[-1])}
+                for (m, s, meth), ms, calls in items]
+
+
+def _children(obj):
+    if hasattr(obj, "steps"):  # sklearn / imblearn Pipeline (samplers have no inference method and are skipped)
+        return list(obj.steps)
+    if hasattr(obj, "transformers_"):  # fitted ColumnTransformer; "drop"/"passthrough" entries are strings
+        return [(name, trans) for name, trans, _ in obj.transformers_ if not isinstance(trans, str)]
+    if type(obj).__module__.startswith("outcomes."):  # compiled engines: their compiled parts
+        return [(k, v) for k, v in vars(obj).items()
+                if not k.startswith("_") and type(v).__module__.startswith("outcomes.") and _methods(v)]
+    return []
+
+
+def _methods(obj):
+    found = []
+    for m in METHODS:
+        try:
+            if callable(getattr(obj, m, None)): found.append(m)
+        except AttributeError:  # sklearn's available_if raises for e.g. Pipeline.transform on a classifier
+            pass
+    return found
+
+
+def _is_timed(obj, method: str) -> bool:
+    return getattr(getattr(obj, "__dict__", {}).get(method), "_timed_stage", None) is not None
+
+
+def _rows(X) -> int:
+    try: return len(X)
+    except TypeError: return 0
+
+
+def _wrap(obj, method: str, model: str, stage: str, timer: StageTimer):
+    orig = getattr(obj, method)
+
+    def timed(X, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return orig(X, *args, **kwargs)
+        finally:
+            timer.record(model, stage, method, time.perf_counter() - t0, _rows(X))
+
+    timed._timed_stage = stage
+    setattr(obj, method, timed)
+
+
+def _walk(obj, path: str = "total"):
+    yield path, obj
+    for name, child in _children(obj):
+        yield from _walk(child, name if path == "total" else f"{path}/{name}")
+
+
+def instrument(model, name: str, timer: "StageTimer | None" = None):
+    """Time every stage of ``model`` into ``timer`` (default ``TIMER``); idempotent."""
+    timer = TIMER if timer is None else timer
+    for stage, obj in _walk(model):
+        for m in _methods(obj):
+            if not _is_timed(obj, m):
+                _wrap(obj, m, name, stage, timer)
+    return model
+
+
+def uninstrument(model):
+    for _, obj in _walk(model):
+        for m in METHODS:
+            if _is_timed(obj, m):
+                delattr(obj, m)
+    return model
+
+
+_holds: dict[int, list] = {}  # id(model) -> [model, leases holding it]
+_holds_lock = threading.Lock()
+
+
+def acquire(model, name: str, timer: "StageTimer | None" = None):
+    """Count one more holder of ``model``; the first one instruments it."""
+    with _holds_lock:
+        held = _holds.setdefault(id(model), [model, 0])
+        if not held[1]:
+            instrument(model, name, timer)
+        held[1] += 1
+    return model
+
+
+def release(model):
+    """Count one holder less; the last one removes the wrappers."""
+    with _holds_lock:
+        held = _holds.get(id(model))
+        if held is None:
+            return model
+        held[1] -= 1
+        if not held[1]:
+            del _holds[id(model)]
+            uninstrument(model)
+    return model
+
+
+def _release_all(models: dict):
+    for model in models.values():
+        release(model)
+    models.clear()
+
+
+class TimingLease:
+    """One session's hold on instrumented models, by name; released when the lease is garbage collected."""
+
+    def __init__(self):
+        self.models = {}
+        self._finalizer = weakref.finalize(self, _release_all, self.models)
+
+    def hold(self, model, name: str, on: bool):
+        """Hold ``model`` as ``name`` while ``on``; a new object under the same name (a reload) replaces the old one."""
+        held = self.models.get(name)
+        if held is not None and (held is not model or not on):
+            release(self.models.pop(name))
+        if on and name not in self.models:
+            self.models[name] = acquire(model, name)
+        return model
+
+    def close(self):
+        self._finalizer()
+
+
+def is_instrumented(model) -> bool:
+    return any(_is_timed(model, m) for m in METHODS)
+
+
+# One timer per server process, shared by every Streamlit session.
+TIMER = StageTimer(window=256)
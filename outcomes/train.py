@@ -0,0 +1,271 @@
+"""Rebuild both models and every app artifact from ``datasets/``.
+
+    python -m outcomes.train                     # writes models/ and artifacts/ in place
+    python -m outcomes.train --jobs 8 --compare  # also re-runs the notebook's model comparison
+    python -m outcomes.train --mmap              # also writes memory-mapped exports (models/*.mm/)
+    python -m outcomes.train --distill           # also distills the Quick-mode surrogate (outcomes.surrogate)
+
+Reproduces the notebook (same splits, seeds, SMOTE, RandomForest, F2 threshold
+rule, ElasticNetCV). Each CV fold's preprocessing and SMOTE resampling is fitted
+once and reused by every model evaluated on that fold; folds and fits run in
+parallel across ``--jobs`` processes. Per-stage timings are printed, and a
+metrics report is written next to the artifacts.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import ElasticNetCV, LogisticRegression
+from sklearn.metrics import (average_precision_score, f1_score, mean_absolute_error, mean_squared_error,
+                             precision_recall_curve, precision_score, r2_score, recall_score, roc_auc_score)
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, RobustScaler
+
+from . import mmap_store, surrogate
+from .ingest import read_dataset
+from .transformers import Winsorizer
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED = 42
+
+CATEGORICAL_COLS = [
+    "Marital_status", "Application_mode", "Application_order", "Course",
+    "Daytimeevening_attendance", "Previous_qualification", "Nacionality",
+    "Mothers_qualification", "Fathers_qualification",
+    "Mothers_occupation", "Fathers_occupation",
+    "Displaced", "Educational_special_needs", "Debtor",
+    "Tuition_fees_up_to_date", "Gender", "Scholarship_holder",
+    "International",
+]
+NUMERIC_COLS = [
+    "Previous_qualification_grade", "Admission_grade", "Age_at_enrollment",
+    "Curricular_units_1st_sem_credited", "Curricular_units_1st_sem_enrolled",
+    "Curricular_units_1st_sem_evaluations", "Curricular_units_1st_sem_approved",
+    "Curricular_units_1st_sem_grade", "Curricular_units_1st_sem_without_evaluations",
+    "Curricular_units_2nd_sem_credited", "Curricular_units_2nd_sem_enrolled",
+    "Curricular_units_2nd_sem_evaluations", "Curricular_units_2nd_sem_approved",
+    "Curricular_units_2nd_sem_grade", "Curricular_units_2nd_sem_without_evaluations",
+    "Unemployment_rate", "Inflation_rate", "GDP",
+]
+QUICK_FIELDS = [
+    "Admission_grade",
+    "Curricular_units_1st_sem_enrolled",
+    "Curricular_units_1st_sem_evaluations",
+    "Curricular_units_1st_sem_approved",
+    "Curricular_units_1st_sem_grade",
+    "Curricular_units_2nd_sem_enrolled",
+    "Curricular_units_2nd_sem_evaluations",
+    "Curricular_units_2nd_sem_approved",
+    "Curricular_units_2nd_sem_grade",
+    "Debtor",
+    "Tuition_fees_up_to_date",
+    "Age_at_enrollment",
+]
+BETA, MIN_RECALL = 2.0, 0.85
+
+
+# ============== Timing ==============
+TIMINGS: dict[str, float] = {}
+
+
+@contextmanager
+def stage(name: str, tag: str = "train"):
+    t0 = time.perf_counter()
+    print(f"[{tag}] {name} ...", flush=True)
+    yield
+    TIMINGS[name] = time.perf_counter() - t0
+    print(f"[{tag}] {name}: {TIMINGS[name]:.2f}s", flush=True)
+
+
+# ============== Drop-out model ==============
+def make_preprocessor() -> ColumnTransformer:
+    numeric_transformer = Pipeline(steps=[("winsor", Winsorizer(cols=NUMERIC_COLS)), ("scaler", RobustScaler())])
+    categorical_transformer = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    return ColumnTransformer(transformers=[
+        ("num", numeric_transformer, NUMERIC_COLS),
+        ("cat", categorical_transformer, CATEGORICAL_COLS),
+    ])
+
+
+def candidate_models() -> dict:
+    return {
+        "LogReg": LogisticRegression(max_iter=500, class_weight="balanced", solver="saga"),
+        "RandomForest": RandomForestClassifier(n_estimators=200, class_weight="balanced", random_state=SEED),
+        "HistGB": HistGradientBoostingClassifier(random_state=SEED),
+    }
+
+
+def load_dropout(data_dir: Path):
+    df = read_dataset(data_dir / "data.csv")
+    X = df.drop(columns=["Target"])
+    y = (df["Target"] == "Dropout").astype(int)
+    return train_test_split(X, y, test_size=0.2, stratify=y, random_state=SEED)
+
+
+def prepare_fold(X, y, train_idx, val_idx):
+    """Fit preprocessing + SMOTE on the fold's training part once; reused by every model on this fold."""
+    pre = make_preprocessor()
+    Xtr = pre.fit_transform(X.iloc[train_idx], y.iloc[train_idx])
+    Xtr, ytr = SMOTE(random_state=SEED).fit_resample(Xtr, y.iloc[train_idx])
+    return Xtr, np.asarray(ytr), pre.transform(X.iloc[val_idx]), val_idx
+
+
+def fit_fold(model, fold):
+    Xtr, ytr, Xva, val_idx = fold
+    return val_idx, clone(model).fit(Xtr, ytr).predict_proba(Xva)[:, 1]
+
+
+def tune_threshold(y, prob) -> float:
+    """Notebook rule: highest F2 among thresholds with recall >= MIN_RECALL on out-of-fold probabilities."""
+    prec, rec, thr = precision_recall_curve(y, prob)
+    fbeta = (1 + BETA**2) * (prec * rec) / (BETA**2 * prec + rec + 1e-12)
+    valid = rec[:-1] >= MIN_RECALL
+    if valid.any():
+        return float(thr[valid][np.argmax(fbeta[:-1][valid])])
+    return float(thr[np.argmax(fbeta[:-1])])
+
+
+def classification_metrics(y, prob, thr) -> dict:
+    pred = (prob >= thr).astype(int)
+    return {"threshold": thr, "precision": precision_score(y, pred), "recall": recall_score(y, pred),
+            "f1_macro": f1_score(y, pred, average="macro")}
+
+
+def train_dropout(data_dir: Path, jobs: int, compare: bool):
+    with stage("dropout: load + split"):
+        X_train, X_test, y_train, y_test = load_dropout(data_dir)
+
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=SEED)
+    with stage("dropout: preprocess folds"):
+        folds = Parallel(n_jobs=jobs)(delayed(prepare_fold)(X_train, y_train, tr, va) for tr, va in cv.split(X_train, y_train))
+
+    models = candidate_models() if compare else {"RandomForest": candidate_models()["RandomForest"]}
+    with stage(f"dropout: 5-fold CV ({', '.join(models)})"):
+        tasks = [(name, fold) for name in models for fold in folds]
+        outs = Parallel(n_jobs=jobs)(delayed(fit_fold)(models[name], fold) for name, fold in tasks)
+    oof = {name: np.empty(len(y_train)) for name in models}
+    cv_f1 = {name: [] for name in models}
+    for (name, _), (val_idx, prob) in zip(tasks, outs):
+        oof[name][val_idx] = prob
+        cv_f1[name].append(f1_score(y_train.iloc[val_idx], (prob >= 0.5).astype(int), average="macro"))
+    for name, scores in cv_f1.items():
+        print(f"  {name} CV F1_macro: mean={np.mean(scores):.3f}, std={np.std(scores):.3f}")
+
+    with stage("dropout: threshold tuning (F2, OOF)"):
+        thr = tune_threshold(y_train.to_numpy(), oof["RandomForest"])
+    print(f"  chosen high-recall threshold: {thr:.3f}")
+
+    with stage("dropout: final fit"):
+        clf = clone(candidate_models()["RandomForest"]).set_params(n_jobs=jobs)
+        pipe = ImbPipeline(steps=[("pre", make_preprocessor()), ("smote", SMOTE(random_state=SEED)), ("clf", clf)])
+        pipe.fit(X_train, y_train)
+        clf.set_params(n_jobs=None)  # serve single-threaded, as the notebook's pickle did
+
+    prob = pipe.predict_proba(X_test)[:, 1]
+    report = {
+        "cv_f1_macro": {k: float(np.mean(v)) for k, v in cv_f1.items()},
+        "test_roc_auc": roc_auc_score(y_test, prob), "test_pr_auc": average_precision_score(y_test, prob),
+        "test_balanced": classification_metrics(y_test, prob, 0.50),
+        "test_high_recall": classification_metrics(y_test, prob, thr),
+    }
+    return pipe, thr, X_train, report
+
+
+def dropout_artifacts(pipe, thr: float, X_train: pd.DataFrame):
+    schema = {"target": "DropoutFlag", "categorical": {}, "numeric": NUMERIC_COLS,
+              "thresholds": {"balanced": 0.50, "high_recall": thr}}
+    ohe = pipe.named_steps["pre"].named_transformers_["cat"]
+    for col, cats in zip(CATEGORICAL_COLS, ohe.categories_):
+        schema["categorical"][col] = list(map(str, cats))
+    defaults = {col: float(X_train[col].median()) for col in NUMERIC_COLS}
+    defaults.update({col: int(Counter(X_train[col]).most_common(1)[0][0]) for col in CATEGORICAL_COLS})
+    return schema, {"defaults": defaults, "quick_fields": QUICK_FIELDS}
+
+
+# ============== G3 model ==============
+def train_g3(data_dir: Path, jobs: int):
+    with stage("g3: load + split"):
+        reg = read_dataset(data_dir / "student-por.csv")
+        cat_cols = [c for c in reg.columns if reg[c].dtype == "object"]
+        num_cols = [c for c in reg.columns if c not in cat_cols + ["G3"]]
+        X, y = reg.drop(columns=["G3"]), reg["G3"]
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED)
+
+    with stage("g3: ElasticNetCV fit"):
+        preproc = ColumnTransformer([
+            ("num", RobustScaler(), num_cols),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
+        ])
+        model = ElasticNetCV(l1_ratio=[.1, .5, .9], alphas=np.logspace(-3, 1, 20), cv=5, max_iter=5000, n_jobs=jobs)
+        pipe = Pipeline([("prep", preproc), ("reg", model)]).fit(X_train, y_train)
+        model.set_params(n_jobs=-1)  # matches the notebook's pickled params
+
+    preds = pipe.predict(X_test)
+    report = {"test_mae": mean_absolute_error(y_test, preds), "test_rmse": float(np.sqrt(mean_squared_error(y_test, preds))),
+              "test_r2": r2_score(y_test, preds)}
+    g3_defaults = {col: (X[col].mode()[0] if col in cat_cols else float(X[col].median())) for col in X.columns}
+    return pipe, g3_defaults, report
+
+
+# ============== Entry point ==============
+def write_json(path: Path, obj, indent=2):
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=indent, default=float)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--data-dir", type=Path, default=ROOT / "datasets")
+    ap.add_argument("--models-dir", type=Path, default=ROOT / "models")
+    ap.add_argument("--artifacts-dir", type=Path, default=ROOT / "artifacts")
+    ap.add_argument("--jobs", type=int, default=-1, help="worker processes for folds and fits (-1 = all cores)")
+    ap.add_argument("--compare", action="store_true", help="also cross-validate LogReg and HistGB on the cached folds")
+    ap.add_argument("--mmap", action="store_true", help="also export memory-mapped models (refreshed anyway if present)")
+    ap.add_argument("--distill", action="store_true", help="also distill the Quick-mode surrogate (refreshed anyway if present)")
+    args = ap.parse_args(argv)
+    args.models_dir.mkdir(parents=True, exist_ok=True)
+    args.artifacts_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    pipe, thr, X_train, dropout_report = train_dropout(args.data_dir, args.jobs, args.compare)
+    schema, defaults = dropout_artifacts(pipe, thr, X_train)
+    g3_pipe, g3_defaults, g3_report = train_g3(args.data_dir, args.jobs)
+
+    with stage("write artifacts"):
+        joblib.dump(pipe, args.models_dir / "dropout_model.pkl")
+        joblib.dump(g3_pipe, args.models_dir / "g3_model.pkl")
+        write_json(args.artifacts_dir / "schema.json", schema)
+        write_json(args.artifacts_dir / "defaults.json", defaults)
+        write_json(args.artifacts_dir / "g3_defaults.json", g3_defaults, indent=None)
+        for name, model in (("dropout_model", pipe), ("g3_model", g3_pipe)):
+            # The app prefers an export over the pickle, so a stale one must never be left behind.
+            if args.mmap or (args.models_dir / f"{name}.mm").exists():
+                mmap_store.export(model, args.models_dir / f"{name}.mm")
+    quick_report = None
+    # Like the exports: a surrogate distilled from the previous forest must not outlive it.
+    if args.distill or (args.models_dir / "dropout_quick.pkl").exists():
+        with stage("dropout: distill Quick-mode surrogate"):
+            quick, quick_report = surrogate.distill(pipe, args.data_dir, defaults["defaults"], schema["thresholds"])
+            surrogate.write(quick, quick_report, args.models_dir, args.artifacts_dir)
+        print(f"  {surrogate.summary(quick_report)}")
+    TIMINGS["total"] = time.perf_counter() - t0
+    write_json(args.artifacts_dir / "training_report.json",
+               {"dropout": dropout_report, "dropout_quick": quick_report, "g3": g3_report, "timings_s": TIMINGS})
+    print(f"[train] done in {TIMINGS['total']:.1f}s → {args.models_dir}, {args.artifacts_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Custom transformers referenced by the pickled pipelines."""
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class Winsorizer(BaseEstimator, TransformerMixin):
+    """Caps values outside 1.5*IQR range (robust to outliers).
+
+    ``bounds_`` keeps the notebook's ``{col: (lower, upper)}`` layout so existing
+    pickles load unchanged; ``transform`` clips the whole block with one ``np.clip``
+    against bound arrays derived from it on first use.
+    """
+    def __init__(self, cols=None):
+        self.cols = cols
+        self.bounds_ = {}
+
+    def fit(self, X, y=None):
+        df = pd.DataFrame(X, columns=self.cols if self.cols else None)
+        self.bounds_ = {}
+        for col in df.columns:
+            Q1, Q3 = df[col].quantile([0.25, 0.75])
+            IQR = Q3 - Q1
+            self.bounds_[col] = (Q1 - 1.5*IQR, Q3 + 1.5*IQR)
+        self.__dict__.pop("_clip_", None)
+        return self
+
+    def bound_arrays(self):
+        """``(lower, upper)`` float arrays in column order; NaN bounds (all-NaN column) don't clip."""
+        clip = self.__dict__.get("_clip_")
+        if clip is None:
+            b = np.asarray(list(self.bounds_.values()), dtype=np.float64).reshape(-1, 2)
+            clip = (np.where(np.isnan(b[:, 0]), -np.inf, b[:, 0]), np.where(np.isnan(b[:, 1]), np.inf, b[:, 1]))
+            self._clip_ = clip
+        return clip
+
+    def transform(self, X):
+        if self.cols and isinstance(X, pd.DataFrame) and list(X.columns) != list(self.cols):
+            X = X.reindex(columns=self.cols)
+        lo, hi = self.bound_arrays()
+        return np.clip(np.asarray(X, dtype=np.float64), lo, hi)
+
+
+def install_pickle_aliases():
+    """Expose ``Winsorizer`` on ``__main__``: the notebook pickled it from there, so
+    ``models/dropout_model.pkl`` references ``__main__.Winsorizer``."""
+    main = sys.modules.get("__main__")
+    if main is not None and not hasattr(main, "Winsorizer"):
+        main.Winsorizer = Winsorizer
@@ -0,0 +1,161 @@
+"""Column-wise validation and coercion of input rows before scoring.
+
+Rules come from the same domains as the form widgets: ``schema.json``
+categorical codes and ``RANGES`` for the drop-out model, ``G3_CATEGORY`` and
+``G3_RANGES`` for G3. Each column is checked with whole-array operations
+(parse, integer, range, allowed values); every problem is listed in a per-cell
+error report and handled by one policy:
+
+* ``"default"``  replace the bad cell with the dataset default
+* ``"clip"``     clip out-of-range numbers to the bound and round non-integers;
+  a code that rounds to no allowed value and other problems fall back to the default
+* ``"reject"``   drop every row with at least one problem
+
+Columns missing from the input entirely are filled from defaults under every
+policy and reported once in ``missing_columns``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .fields import G3_CATEGORY, G3_RANGES, RANGES
+
+POLICIES = ("default", "clip", "reject")
+ERROR_COLUMNS = ("row", "column", "value", "problem", "action")
+
+
+@dataclass
+class Rule:
+    dtype: str                              # output dtype: "int64", "float64" or "object"
+    default: object
+    allowed: "np.ndarray | None" = None     # permitted codes / categories
+    lo: "float | None" = None
+    hi: "float | None" = None
+    integer: bool = False
+
+
+@dataclass
+class Validation:
+    frame: pd.DataFrame       # model-ready rows (input index kept); rejected rows are absent
+    kept: np.ndarray          # bool per input row: present in ``frame``
+    errors: pd.DataFrame      # one row per bad cell: row, column, value, problem, action
+    missing_columns: list
+
+    @property
+    def rejected(self) -> int:
+        return int((~self.kept).sum())
+
+    def counts(self) -> pd.DataFrame:
+        """Problem counts per (column, problem), most frequent first."""
+        return (self.errors.groupby(["column", "problem"], sort=False).size().rename("cells")
+                .sort_values(ascending=False, kind="mergesort").reset_index())
+
+
+def dropout_rules(schema: dict, defaults: dict) -> dict:
+    rules = {c: Rule("int64", int(defaults[c]), allowed=np.asarray([int(x) for x in codes]))
+             for c, codes in schema["categorical"].items()}
+    for c in schema["numeric"]:
+        lo, hi, step = RANGES.get(c, (None, None, None))
+        rules[c] = Rule("float64", float(defaults[c]), lo=lo, hi=hi, integer=step is not None and float(step).is_integer())
+    return rules
+
+
+def g3_rules(g3_defaults: dict) -> dict:
+    rules = {}
+    for c, dv in g3_defaults.items():
+        if c in G3_CATEGORY:
+            rules[c] = Rule("object", str(dv), allowed=np.asarray(G3_CATEGORY[c], dtype=object))
+        elif c in G3_RANGES:
+            lo, hi, step = G3_RANGES[c]
+            rules[c] = Rule("float64", float(dv), lo=lo, hi=hi, integer=float(step).is_integer())
+        else:
+            rules[c] = Rule("float64", float(dv))
+    return rules
+
+
+def _check_numeric(raw: np.ndarray, rule: Rule, policy: str):
+    """``(values, {problem: mask})`` for one numeric/code column; values are already fixed per ``policy``."""
+    if raw.dtype.kind in "biuf":
+        x = raw.astype(np.float64)
+        absent = np.isnan(x)
+    else:
+        absent = pd.isna(raw)
+        try:  # text columns that all parse (e.g. a CSV read as strings)
+            x = raw.astype(np.float64)
+        except (ValueError, TypeError):
+            x = pd.to_numeric(pd.Series(raw), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    nan = np.isnan(x)
+    problems = {"missing": absent, "not_numeric": nan & ~absent}
+    ok = ~nan
+    if rule.integer or rule.allowed is not None:
+        frac = ok & (x != np.round(x))
+        if policy == "clip": x = np.where(frac, np.round(x), x)
+        problems["not_integer"] = frac
+    if rule.allowed is not None:
+        unknown = ok & ~np.isin(x, rule.allowed.astype(np.float64))  # rounded values under "clip"
+        if policy == "clip":  # e.g. Course=9119.6 -> 9120: not a code, so filled rather than clipped
+            problems["not_integer"] = frac & ~unknown
+        else:
+            unknown &= ~frac
+        problems["unknown_code"] = unknown
+    if rule.lo is not None:
+        problems["below_min"] = ok & (x < rule.lo)
+        problems["above_max"] = ok & (x > rule.hi)
+        if policy == "clip": x = np.clip(x, rule.lo, rule.hi)  # NaN stays NaN and is filled below
+    return x, problems
+
+
+def _check_category(raw: np.ndarray, rule: Rule):
+    absent = pd.isna(raw)
+    s = raw.astype(object)
+    known = np.isin(s, rule.allowed)
+    retry = np.flatnonzero(~known & ~absent)
+    if retry.size:  # only unmatched cells pay for str()/strip()
+        s = s.copy()
+        s[retry] = [str(v).strip() for v in s[retry]]
+        known[retry] = np.isin(s[retry], rule.allowed)
+    return s, {"missing": absent, "unknown_category": ~absent & ~known}
+
+
+def validate(df: pd.DataFrame, rules: dict, policy: str = "default", row_offset: int = 0) -> Validation:
+    """Validate and coerce ``df`` to the columns of ``rules`` (in that order).
+
+    ``row_offset`` is added to positional row numbers in the error report (for chunked input).
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+    n = len(df)
+    bad_row = np.zeros(n, dtype=bool)
+    out, missing, reports = {}, [], []
+    for col, rule in rules.items():
+        if col not in df.columns:
+            missing.append(col)
+            out[col] = np.full(n, rule.default, dtype=object if rule.dtype == "object" else rule.dtype)
+            continue
+        raw = df[col].to_numpy()
+        if rule.dtype == "object":
+            vals, problems = _check_category(raw, rule)
+        else:
+            vals, problems = _check_numeric(raw, rule, policy)
+        clipped = {"below_min", "above_max", "not_integer"} if policy == "clip" else set()
+        fill = np.zeros(n, dtype=bool)
+        for problem, mask in problems.items():
+            idx = np.flatnonzero(mask)
+            if not idx.size: continue
+            if problem not in clipped: fill |= mask
+            bad_row |= mask
+            action = "rejected" if policy == "reject" else ("clipped" if problem in clipped else "filled")
+            reports.append(pd.DataFrame({"row": idx + row_offset, "column": col,
+                                         "value": raw[idx].astype(str), "problem": problem, "action": action}))
+        if policy != "reject" and fill.any():
+            vals = np.where(fill, rule.default, vals)
+        out[col] = vals
+    kept = ~bad_row if policy == "reject" else np.ones(n, dtype=bool)
+    if policy == "reject":  # rejected rows may hold NaN / bad strings; kept ones can take the final dtypes
+        out = {c: v[kept] for c, v in out.items()}
+    frame = pd.DataFrame({c: out[c].astype(r.dtype, copy=False) for c, r in rules.items()},
+                         index=df.index[kept] if policy == "reject" else df.index)
+    errors = (pd.concat(reports, ignore_index=True).sort_values(["row", "column"], kind="mergesort", ignore_index=True)
+              if reports else pd.DataFrame({k: pd.Series(dtype="int64" if k == "row" else object) for k in ERROR_COLUMNS}))
+    return Validation(frame=frame, kept=kept, errors=errors, missing_columns=missing)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from outcomes.audit import AuditLog, read, segments, store_for
+
+
+def test_store_for_picks_the_narrowest_lossless_type():
+    assert store_for(np.array([0, 1, 100])) == "<i1"
+    assert store_for(np.array([3.0, 200.0])) == "<i2"
+    assert store_for(np.array([1.5])) == "<f8"
+    assert store_for(np.array(["GP", "MS"], dtype=object)) == "dict"
+
+
+def test_records_round_trip_and_a_wider_value_rolls_the_segment(tmp_path):
+    log = AuditLog(tmp_path, flush_seconds=0.05)
+    log.record("g3", {"age": 17, "school": "GP", "grade": 12.5}, 11.2, version="v1", source="quick")
+    log.record_batch("g3", pd.DataFrame({"age": [18, 19], "school": ["MS", "GP"], "grade": [10.0, 9.25]}),
+                     [10.5, 9.0], version="v1", source="cohort")
+    log.flush()
+    assert len(segments(tmp_path, "g3")) == 1
+    log.record("g3", {"age": 1000, "school": "MS", "grade": 14.0}, 13.0, version="v2", source="accurate")  # int8 -> int16
+    log.flush()
+    log.close()
+
+    assert len(segments(tmp_path, "g3")) == 2
+    df = read(tmp_path, "g3")
+    assert df["age"].tolist() == [17, 18, 19, 1000]
+    assert df["school"].tolist() == ["GP", "MS", "GP", "MS"]
+    assert df["grade"].tolist() == [12.5, 10.0, 9.25, 14.0]
+    assert df["value"].tolist() == [11.2, 10.5, 9.0, 13.0]
+    assert df["version"].tolist() == ["v1", "v1", "v1", "v2"]
+    assert df["source"].tolist() == ["quick", "cohort", "cohort", "accurate"]
+    assert read(tmp_path, "g3", columns=["value"]).columns.tolist() == ["value"]
+    assert log.written == 4 and log.dropped == log.failed == 0
+
+
+def test_a_full_queue_drops_instead_of_blocking(tmp_path):
+    log = AuditLog(tmp_path, queue_size=1, flush_seconds=60.0)
+    log._thread = object()  # no writer: the queue never drains
+    assert log.record("dropout", {"a": 1}, 0.5)
+    assert not log.record("dropout", {"a": 2}, 0.5)
+    assert (log.enqueued, log.dropped) == (1, 1)
@@ -0,0 +1,32 @@
+from outcomes.cache import CACHES, DROPOUT_CACHE, EXPLAIN_CACHE, LRUCache, row_key
+
+
+def test_row_key_ignores_field_order_and_separates_versions():
+    assert row_key({"a": 1, "b": 2.5}, "v1") == row_key({"b": 2.5, "a": 1}, "v1")
+    assert row_key({"a": 1}, "v1") != row_key({"a": 1}, "v2")
+    assert row_key({"a": 1}) != row_key({"a": 2})
+
+
+def test_lru_evicts_the_least_recently_used_and_counts():
+    cache, calls = LRUCache(maxsize=2), []
+
+    def compute(v):
+        return lambda: calls.append(v) or v
+
+    assert cache.get_or_compute("a", compute(1)) == 1
+    cache.get_or_compute("b", compute(2))
+    assert cache.get_or_compute("a", compute(0)) == 1  # hit: "a" becomes most recent
+    cache.get_or_compute("c", compute(3))              # evicts "b"
+    assert cache.get_or_compute("b", compute(4)) == 4
+    assert calls == [1, 2, 3, 4]
+    assert len(cache) == 2
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 4, "evictions": 2, "hit_rate": 0.2}
+
+
+def test_explanations_never_evict_predictions():
+    assert len({id(c) for c in CACHES.values()}) == len(CACHES)
+    key = row_key({"a": 1}, "test")
+    DROPOUT_CACHE.get_or_compute(key, lambda: 0.5)
+    for i in range(EXPLAIN_CACHE.maxsize + 1):
+        EXPLAIN_CACHE.get_or_compute(row_key({"a": i}, "test:explain"), lambda: None)
+    assert DROPOUT_CACHE.get_or_compute(key, lambda: -1.0) == 0.5
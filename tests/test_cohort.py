@@ -0,0 +1,82 @@
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+
+from outcomes.batch import ScratchFiles
+from outcomes.cohort import CohortScores
+from outcomes.validate import Rule
+
+RULES = {"Course": Rule("int64", 1), "Application_mode": Rule("int64", 1),
+         "Daytimeevening_attendance": Rule("int64", 1), "x": Rule("float64", 0.0, lo=0, hi=100)}
+
+
+class Model:
+    def predict_proba(self, X):
+        p = X["x"].to_numpy(dtype=np.float64) / 100.0
+        return np.column_stack([1 - p, p])
+
+
+def cohort(n=1000, chunk=128, k=10, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({"Course": rng.choice([33, 171, 9500], n), "Application_mode": rng.choice([1, 17], n),
+                          "Daytimeevening_attendance": rng.choice([0, 1], n), "x": rng.random(n) * 100})
+    scores = CohortScores(k=k)
+    for s in range(0, n, chunk):
+        part = frame.iloc[s:s + chunk]
+        scores.add(part, Model().predict_proba(part)[:, 1])
+    return scores, frame
+
+
+def test_top_equals_a_full_sort_and_groups_match_pandas():
+    scores, frame = cohort()
+    prob = frame["x"] / 100
+    top = scores.top(0.5)
+    assert top.index.tolist() == prob.sort_values(ascending=False).index[:10].tolist()
+    assert top["flag"].tolist() == (top["dropout_probability"] >= 0.5).astype(int).tolist()
+    assert scores.exact and scores.n == 1000
+    g = scores.groups("Course", 0.5).set_index("group")
+    ref = prob.groupby(frame["Course"]).agg(["size", "mean"])
+    assert g["students"].to_dict() == ref["size"].to_dict()
+    np.testing.assert_allclose(g.loc[ref.index, "mean_risk"], ref["mean"])
+    assert g["flagged"].sum() == scores.flagged(0.5) == int((prob >= 0.5).sum())
+
+
+def test_rescore_updates_only_edited_rows():
+    scores, frame = cohort()
+    top = scores.top()
+    edited = top.drop(columns=["dropout_probability"]).copy()
+    assert scores.rescore(edited, Model(), RULES) == 0  # nothing changed: nothing scored
+    first, last = edited.index[0], edited.index[-1]
+    edited.loc[first, "x"] = 1.0
+    assert scores.rescore(edited, Model(), RULES) == 1
+    after = scores.top()
+    assert first not in after.index and last in after.index
+    assert scores.groups("Course", 0.0)["students"].sum() == 1000
+    assert scores.exact  # the heap holds 2k candidates: one lowered row still leaves a provable top k
+
+
+def test_exact_turns_false_once_the_reserve_is_used_up():
+    scores, _ = cohort(k=5)
+    for _ in range(3):  # lower the whole top 5 three times over: 15 rows > the 10 held
+        edited = scores.top().drop(columns=["dropout_probability"]).assign(x=0.0)
+        scores.rescore(edited, Model(), RULES)
+    assert not scores.exact  # only edited rows are left in the heap; unseen rows may now rank higher
+    assert (scores.top()["dropout_probability"] == 0.0).all()
+
+
+def test_scratch_files_go_with_their_session():
+    files = ScratchFiles()
+    with files.open() as a, files.open() as b:
+        a.write("x\n"); b.write("y\n")
+    paths = [a.name, b.name]
+    assert all(os.path.exists(p) for p in paths)
+    files.close()
+    assert not any(os.path.exists(p) for p in paths)
+    files = ScratchFiles()
+    with files.open() as a:
+        pass
+    del files  # an abandoned session: its state is dropped without a close
+    gc.collect()
+    assert not os.path.exists(a.name)
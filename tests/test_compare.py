@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from outcomes.compare import Workspace
+from outcomes.validate import Rule
+
+RULES = {"dropout": {"Course": Rule("int64", 9500, allowed=np.asarray([33, 171, 9500])),
+                     "grade": Rule("float64", 120.0, lo=0, hi=200)},
+         "g3": {"school": Rule("object", "GP", allowed=np.asarray(["GP", "MS"], dtype=object)),
+                "G2": Rule("float64", 10.0, lo=0, hi=20, integer=True)}}
+
+
+class Models:
+    calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        p = X["grade"].to_numpy() / 200
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        self.calls += 1
+        return X["G2"].to_numpy() + (X["school"] == "MS").to_numpy()
+
+
+def workspace():
+    ws = Workspace(RULES, capacity=3)
+    ws.add("a", {"dropout": {"Course": 33, "grade": 150.5}, "g3": {"school": "GP", "G2": 12}})
+    ws.add("b", {"dropout": {"Course": 171, "grade": 99.0}, "g3": {"school": "MS", "G2": 15}})
+    return ws
+
+
+def test_round_trip_and_storage_types():
+    ws = workspace()
+    assert ws.frame("dropout").to_dict("list") == {"Course": [33, 171], "grade": [150.5, 99.0]}
+    assert ws.frame("g3").to_dict("list") == {"school": ["GP", "MS"], "G2": [12.0, 15.0]}
+    assert ws.columns["dropout"]["Course"].dtype == np.uint16 and ws.columns["g3"]["school"].dtype == np.uint8
+    assert ws.varying("dropout") == ["Course", "grade"]
+
+
+def test_score_is_one_call_per_model_and_reused_until_an_input_changes():
+    ws, m = workspace(), Models()
+    first = ws.score(m, m, key="v1")
+    assert m.calls == 2 and first["g3"].tolist() == [12.0, 16.0]
+    assert ws.score(m, m, key="v1") is first and m.calls == 2
+    ws.relabel(["x", "y"])
+    assert ws.score(m, m, key="v1") is first
+    assert not ws.update("dropout", pd.DataFrame({"grade": [150.5]}, index=[0]))  # same value: no new revision
+    assert ws.score(m, m, key="v1") is first
+    assert ws.update("dropout", pd.DataFrame({"grade": [250.0]}, index=[1]))  # clipped to 200
+    assert ws.score(m, m, key="v1")["dropout_probability"].tolist() == [150.5 / 200, 1.0] and m.calls == 4
+    ws.score(m, m, key="v2")
+    assert m.calls == 6
+
+
+def test_capacity_and_remove():
+    ws = workspace()
+    ws.add("c", {"dropout": {"Course": 9500, "grade": 1.0}, "g3": {"school": "GP", "G2": 3}})
+    assert ws.full
+    with pytest.raises(ValueError, match="at most 3"):
+        ws.add("d", {"dropout": {}, "g3": {}})
+    ws.remove([0])
+    assert ws.n == 2 and ws.labels[:2].tolist() == ["b", "c"] and ws.frame("g3")["G2"].tolist() == [15.0, 3.0]
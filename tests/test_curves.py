@@ -0,0 +1,40 @@
+import numpy as np
+from sklearn.metrics import fbeta_score, precision_score, recall_score
+
+from outcomes.curves import ThresholdCurve, cohort_curve
+
+DATA = __import__("pathlib").Path(__file__).resolve().parent.parent / "datasets" / "data.csv"
+
+
+def test_metrics_match_sklearn_at_any_threshold():
+    rng = np.random.default_rng(0)
+    prob = rng.random(500).round(2)  # ties on purpose
+    y = (rng.random(500) < prob).astype(int)
+    curve = ThresholdCurve(prob, y)
+    for thr in (0.0, 0.1, 0.26, 0.5, 0.905, 1.0):
+        m, pred = curve.at(thr), (prob >= thr).astype(int)
+        assert m["flagged"] == pred.sum()
+        assert np.isclose(m["recall"], recall_score(y, pred))
+        assert np.isclose(m["precision"], precision_score(y, pred, zero_division=1.0))
+        assert np.isclose(m["f2"], fbeta_score(y, pred, beta=2.0))
+    best = curve.best_f2(min_recall=0.9)
+    assert best["recall"] >= 0.9 and best["f2"] == curve.frame().query("recall >= 0.9")["f2"].max()
+
+
+class CountingModel:
+    calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        p = np.linspace(0, 1, len(X))
+        return np.column_stack([1 - p, p])
+
+
+def test_cohort_is_scored_once_per_model_version():
+    model, cols = CountingModel(), ["Course", "Age_at_enrollment"]
+    curve = cohort_curve(model, "test-v1", DATA, cols)
+    assert cohort_curve(model, "test-v1", DATA, cols) is curve
+    assert model.calls == 1
+    cohort_curve(model, "test-v2", DATA, cols)
+    assert model.calls == 2
+    assert curve.n == 885  # the notebook's 20% holdout of 4,424 rows
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from outcomes.drift import DriftMonitor, bin_spec, monitor_for, numeric_spec
+
+
+def baseline(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    train = pd.DataFrame({"grade": rng.normal(130, 15, n), "course": rng.choice([33, 171, 9500], n, p=[.2, .3, .5]),
+                          "school": rng.choice(["GP", "MS"], n)})
+    pred = rng.random(n)
+    features = {"grade": bin_spec(train["grade"]), "course": bin_spec(train["course"], categorical=True),
+                "school": bin_spec(train["school"], categorical=True)}
+    return {"format": 1, "models": {"dropout": {"features": features,
+                                                "prediction": numeric_spec(pred, np.linspace(0.1, 0.9, 9).tolist())}}}
+
+
+def test_replayed_training_data_is_stable_and_a_shift_is_major():
+    monitor = DriftMonitor(baseline(), half_life=2000, min_rows=200)
+    assert monitor.overall("dropout") == "no traffic"
+    rng = np.random.default_rng(1)
+    live = pd.DataFrame({"grade": rng.normal(130, 15, 3000), "course": rng.choice([33, 171, 9500], 3000, p=[.2, .3, .5]),
+                         "school": rng.choice(["GP", "MS"], 3000)})
+    monitor.observe("dropout", live, rng.random(3000))
+    assert monitor.overall("dropout") == "stable"
+
+    monitor.observe("dropout", live.assign(grade=live["grade"] + 25.0, course=9999), rng.random(3000))
+    status = monitor.status("dropout").set_index("feature")
+    assert monitor.overall("dropout") == "major"
+    assert status.loc["grade", "level"] == "major" and status.loc["grade", "ks"] > 0.3
+    assert status.loc["course", "level"] == "major"  # an unseen code lands in the "other" bin
+    assert status.loc["school", "level"] == "stable"
+
+
+def test_few_rows_are_warming_up():
+    monitor = DriftMonitor(baseline(), min_rows=200)
+    monitor.observe("dropout", pd.DataFrame({"grade": [200.0] * 10}), fields=["grade"])
+    assert monitor.status("dropout").set_index("feature").loc["grade", "level"] == "warming up"
+    assert monitor.overall("dropout") == "warming up"
+
+
+def test_monitor_is_rebuilt_only_for_new_versions(tmp_path):
+    path, builds = tmp_path / "drift_baseline.json", []
+
+    def build():
+        builds.append(1)
+        return baseline()
+
+    first = monitor_for(path, {"dropout": "test-a"}, build)
+    assert monitor_for(path, {"dropout": "test-a"}, build) is first and path.exists()
+    second = monitor_for(path, {"dropout": "test-b"}, build)
+    assert second is not first and len(builds) == 2
+    monitor_for(path, {"dropout": "test-a"}, build)  # stored baseline is for test-b: rebuilt
+    assert len(builds) == 3
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from sklearn.ensemble import RandomForestClassifier
+
+from outcomes.forest import CompiledPipeline, compile_pipeline
+from outcomes.train import ROOT, SEED, load_dropout, make_preprocessor
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X_train, X_test, y_train, _ = load_dropout(ROOT / "datasets")
+    clf = RandomForestClassifier(n_estimators=15, max_depth=12, class_weight="balanced", random_state=SEED)
+    pipe = ImbPipeline(steps=[("pre", make_preprocessor()), ("smote", SMOTE(random_state=SEED)), ("clf", clf)])
+    return pipe.fit(X_train.iloc[:800], y_train.iloc[:800]), X_test
+
+
+def test_single_rows_match_sklearn(fitted):
+    pipe, X = fitted
+    engine = compile_pipeline(pipe)
+    assert engine is compile_pipeline(pipe)  # memoized per pipeline
+    for i in range(25):
+        row = X.iloc[[i]]
+        np.testing.assert_array_equal(engine.predict_proba(row), pipe.predict_proba(row))
+
+
+def test_batches_match_sklearn(fitted):
+    pipe, X = fitted
+    engine = CompiledPipeline(pipe, max_rows=len(X))  # every batch goes through the flat arrays
+    for rows in (X.iloc[:7], X.iloc[:128], X):
+        np.testing.assert_array_equal(engine.predict_proba(rows), pipe.predict_proba(rows))
+    np.testing.assert_array_equal(compile_pipeline(pipe).predict_proba(X), pipe.predict_proba(X))  # handed back
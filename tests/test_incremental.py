@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from sklearn.ensemble import RandomForestClassifier
+
+from outcomes.forest import compile_pipeline
+from outcomes.incremental import IncrementalForest, incremental_for
+from outcomes.registry import REGISTRY
+from outcomes.train import SEED, load_dropout, make_preprocessor
+from outcomes.validate import g3_rules, validate
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    X_train, X_test, y_train, _ = load_dropout(ROOT / "datasets")
+    clf = RandomForestClassifier(n_estimators=15, max_depth=12, class_weight="balanced", random_state=SEED)
+    pipe = ImbPipeline(steps=[("pre", make_preprocessor()), ("smote", SMOTE(random_state=SEED)), ("clf", clf)])
+    pipe.fit(X_train.iloc[:800], y_train.iloc[:800])
+    cols = compile_pipeline(pipe).pre.input_cols
+    reference = X_test.iloc[[0]][cols].to_dict("records")[0]
+    return pipe, X_test[cols], reference
+
+
+def edited(reference, cols, changes):
+    return pd.DataFrame([{**reference, **change} for change in changes], columns=cols)
+
+
+def test_rows_with_changed_features_equal_the_engine(fitted):
+    pipe, X, reference = fitted
+    inc = incremental_for(pipe, reference)
+    assert isinstance(inc, IncrementalForest) and incremental_for(pipe, reference) is inc
+    rows = edited(reference, X.columns, [{}, {"Admission_grade": 160.0}, {"Course": int(X["Course"].iloc[5])},
+                                         {"Admission_grade": 95.5, "Tuition_fees_up_to_date": 1 - reference["Tuition_fees_up_to_date"]}])
+    engine = compile_pipeline(pipe)
+    np.testing.assert_array_equal(inc.predict_proba(rows), engine.predict_proba(rows))
+    np.testing.assert_array_equal(inc.predict_proba(rows), pipe.predict_proba(rows))
+    np.testing.assert_array_equal(inc.predict_proba(X.iloc[:50]), pipe.predict_proba(X.iloc[:50]))  # every feature varies
+    assert inc.trees_to_walk(["Admission_grade"]) <= engine.forest.n_trees
+
+
+def test_linear_model_matches_the_pipeline():
+    pipe = REGISTRY.model(ROOT / "models" / "g3_model.pkl")
+    g3_defaults = REGISTRY.json(ROOT / "artifacts" / "g3_defaults.json")
+    reference = validate(pd.DataFrame([g3_defaults]), g3_rules(g3_defaults)).frame.to_dict("records")[0]
+    inc = incremental_for(pipe, reference)
+    rows = edited(reference, list(reference), [{}, {"absences": 20.0}, {"school": "MS", "studytime": 4.0}])
+    np.testing.assert_allclose(inc.predict(rows), pipe.predict(rows), rtol=1e-9)
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from outcomes.ingest import DatasetSpec, read_dataset
+
+
+def test_unknown_layout_names_the_known_ones(tmp_path):
+    path = tmp_path / "term.csv"
+    path.write_text("a\n1\n")
+    with pytest.raises(ValueError, match="data.csv"):
+        read_dataset(path)
+
+
+def test_missing_strings_survive_the_cache(tmp_path):
+    path = tmp_path / "term.csv"
+    path.write_text("Target,Age\nDropout,19\n,20\nGraduate,21\n")
+    spec = DatasetSpec(strings=frozenset({"Target"}))
+    parsed = read_dataset(path, spec, cache_dir=tmp_path / ".cache")
+    cached = read_dataset(path, spec, cache_dir=tmp_path / ".cache")
+    assert cached["Target"].tolist()[::2] == ["Dropout", "Graduate"]
+    assert pd.isna(cached.loc[1, "Target"])
+    pd.testing.assert_frame_equal(cached, parsed)
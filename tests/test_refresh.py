@@ -0,0 +1,30 @@
+import numpy as np
+
+import pandas as pd
+
+from outcomes.refresh import load_new, split_new
+from outcomes.validate import Rule
+
+RULES = {"age": Rule("float64", 17.0, lo=15, hi=22, integer=True),
+         "school": Rule("object", "GP", allowed=np.asarray(["GP", "MS"], dtype=object))}
+
+
+def test_load_new_validates_bad_cells_and_drops_unlabeled_rows(tmp_path):
+    path = tmp_path / "new.csv"
+    path.write_text('school,age,G3\n"GP",16,12\n"MS",,14\n"GP",abc,\n"MS",18,n/a\n"GP",17,9\n')
+    X, y = load_new(path, "student-por.csv", RULES, "G3", policy="default")
+    assert y.tolist() == [12.0, 14.0, 9.0]
+    assert X["age"].tolist() == [16.0, 17.0, 17.0]  # the blank age is filled, not a parse error
+    assert X.index.equals(y.index)
+    X, y = load_new(path, "student-por.csv", RULES, "G3", policy="reject")
+    assert y.tolist() == [12.0, 9.0]
+
+
+def test_split_new_stratifies_only_when_every_class_can_be_split():
+    X = pd.DataFrame({"age": np.arange(60.0)})
+    y = pd.Series([1] + [0] * 59)  # a single drop-out can't be split both ways
+    X_fit, y_fit, X_hold, y_hold = split_new(X, y, stratify=True)
+    assert len(X_fit) + len(X_hold) == 60 and y_fit.sum() + y_hold.sum() == 1
+    y = pd.Series([1] * 10 + [0] * 50)
+    _, y_fit, _, y_hold = split_new(X, y, stratify=True)
+    assert (y_fit.sum(), y_hold.sum()) == (8, 2)
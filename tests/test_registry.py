@@ -0,0 +1,27 @@
+import json
+import os
+
+from outcomes.registry import ArtifactRegistry
+
+
+def write(path, obj, mtime_ns):
+    path.write_text(json.dumps(obj))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_loads_once_and_reloads_only_on_new_content(tmp_path):
+    path, reg = tmp_path / "schema.json", ArtifactRegistry()
+    write(path, {"v": 1}, 1_000_000_000)
+    first = reg.json(path)
+    assert reg.json(path) is first
+
+    write(path, {"v": 1}, 2_000_000_000)  # touched, same bytes: hashed, not reloaded
+    assert reg.json(path) is first
+    assert reg.stats()[0]["loads"] == 1
+
+    write(path, {"v": 2}, 3_000_000_000)
+    assert reg.json(path) == {"v": 2}
+    assert reg.stats()[0]["loads"] == 2
+
+    reg.invalidate(path)
+    assert reg.json(path) == {"v": 2} and reg.stats()[0]["loads"] == 1
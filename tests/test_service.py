@@ -0,0 +1,64 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from outcomes.service import MicroBatcher, serve
+
+
+@pytest.fixture(scope="module")
+def url():
+    server = serve(port=0, window_ms=50.0, max_rows=3)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.service.close()
+
+
+@pytest.mark.parametrize("threshold", [None, "0.3", True, -0.1, 1.5, float("nan"), [0.3]])
+def test_invalid_threshold_is_a_bad_request(url, threshold):
+    body = json.dumps({"rows": [{}], "threshold": threshold}).encode()
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(urllib.request.Request(f"{url}/v1/dropout", data=body, method="POST"))
+    assert e.value.code == 400
+    assert "threshold" in json.loads(e.value.read())["error"]
+
+
+def post(url, path, body):
+    req = urllib.request.Request(f"{url}{path}", data=json.dumps(body).encode(), method="POST")
+    try:
+        with urllib.request.urlopen(req) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("bad", [{"school": ["GP"]}, {"rows": [{"age": 17}, {"Course": [1, 2]}]}, {"rows": [{}] * 4}])
+def test_a_malformed_request_is_a_400_and_does_not_fail_its_batch(url, bad):
+    with ThreadPoolExecutor(2) as pool:  # both land in one 50 ms window
+        bad_res, good_res = pool.map(lambda body: post(url, "/v1/g3", body), [bad, {"rows": [{"G2": 14}, {}]}])
+    assert bad_res[0] == 400
+    assert good_res[0] == 200 and len(good_res[1]["g3"]) == 2 and all(g is not None for g in good_res[1]["g3"])
+
+
+def test_a_failing_batch_is_rescored_request_by_request():
+    def score(df):
+        if (df["x"] < 0).any():
+            raise ValueError("negative x")
+        return df["x"].to_numpy(dtype=np.float64) * 2, pd.DataFrame(columns=["row"])
+
+    batcher = MicroBatcher(score, window_ms=200.0)
+    try:
+        good, bad, other = batcher.submit([{"x": 1}, {"x": 2}]), batcher.submit([{"x": -1}]), batcher.submit([{"x": 3}])
+        assert good.result(5)[0].tolist() == [2.0, 4.0]
+        assert other.result(5)[0].tolist() == [6.0]
+        with pytest.raises(ValueError, match="negative"):
+            bad.result(5)
+        assert batcher.metrics()["batches"] == 1
+    finally:
+        batcher.close()
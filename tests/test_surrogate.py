@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline as ImbPipeline
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+
+from outcomes.forest import CompiledBoosting
+from outcomes.registry import REGISTRY
+from outcomes.explain import explainer_for
+from outcomes.surrogate import distill, matches_teacher, meets_bounds, quick_rows, serves
+from outcomes.train import SEED, load_dropout, make_preprocessor
+
+ROOT = Path(__file__).resolve().parent.parent
+THRESHOLDS = {"balanced": 0.5, "high_recall": 0.26}
+
+
+def forest(n_estimators, seed):
+    X_train, _, y_train, _ = load_dropout(ROOT / "datasets")
+    clf = RandomForestClassifier(n_estimators=n_estimators, max_depth=10, class_weight="balanced", random_state=seed)
+    pipe = ImbPipeline(steps=[("pre", make_preprocessor()), ("smote", SMOTE(random_state=SEED)), ("clf", clf)])
+    return pipe.fit(X_train.iloc[:800], y_train.iloc[:800])
+
+
+@pytest.fixture(scope="module")
+def distilled():
+    blob = REGISTRY.json(ROOT / "artifacts" / "defaults.json")
+    pipe = forest(10, SEED)
+    surrogate, report = distill(pipe, ROOT / "datasets", blob["defaults"], THRESHOLDS, blob["quick_fields"],
+                                trees=30, depth=3, augment=500)
+    return pipe, surrogate, report, blob
+
+
+def test_compiled_boosting_matches_sklearn():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 4))
+    gbr = GradientBoostingRegressor(n_estimators=25, max_depth=3, random_state=SEED).fit(X, X[:, 0] - X[:, 2] ** 2)
+    np.testing.assert_allclose(CompiledBoosting(gbr).predict(X), gbr.predict(X), rtol=0, atol=1e-12)
+    bias, C = CompiledBoosting(gbr).contributions(X)
+    np.testing.assert_allclose(bias + C.sum(axis=1), gbr.predict(X), rtol=0, atol=1e-9)
+
+
+def test_report_describes_the_quick_form(distilled):
+    pipe, surrogate, report, blob = distilled
+    assert report["fields"] == blob["quick_fields"]
+    assert set(report["agreement"]) == set(THRESHOLDS)
+    assert all(0.0 <= a <= 1.0 for a in report["agreement"].values())
+    assert np.isclose(report["auc_gap"], report["auc"]["forest"] - report["auc"]["surrogate"])
+    _, X_test, _, _ = load_dropout(ROOT / "datasets")
+    rows = quick_rows(X_test.iloc[:20], blob["quick_fields"], blob["defaults"])
+    prob = surrogate.predict_proba(rows)
+    assert prob.shape == (20, 2) and ((prob >= 0) & (prob <= 1)).all()
+    np.testing.assert_allclose(prob.sum(axis=1), 1.0)
+
+
+def test_gating_rejects_a_foreign_teacher_or_a_loose_fit(distilled):
+    pipe, _, report, blob = distilled
+    cols = list(pipe.named_steps["pre"].feature_names_in_)
+    assert matches_teacher(report, pipe, blob["defaults"], cols)
+    assert not matches_teacher(report, forest(10, SEED + 1), blob["defaults"], cols)
+    assert meets_bounds({**report, "agreement": {k: 1.0 for k in THRESHOLDS}, "auc_gap": 0.0})
+    assert not meets_bounds({**report, "agreement": {"balanced": 0.99, "high_recall": 0.90}, "auc_gap": 0.0})
+    assert not meets_bounds({**report, "agreement": {k: 1.0 for k in THRESHOLDS}, "auc_gap": 0.05})
+
+
+def test_stale_or_foreign_surrogate_falls_back_to_the_forest(distilled):
+    pipe, _, report, blob = distilled
+    cols = list(pipe.named_steps["pre"].feature_names_in_)
+    tight = {**report, "agreement": {k: 1.0 for k in THRESHOLDS}, "auc_gap": 0.0}
+    assert serves(tight, pipe, blob["defaults"], cols)
+    assert not serves(tight, forest(10, SEED + 1), blob["defaults"], cols)  # forest retrained since distilling
+    check = report["teacher_check"]
+    stale = {**tight, "teacher_check": {**check, "proba": [p + 1e-6 for p in check["proba"]]}}
+    assert not serves(stale, pipe, blob["defaults"], cols)
+    assert not serves({**report, "auc_gap": 0.5}, pipe, blob["defaults"], cols)
+
+
+def test_surrogate_explanation_matches_its_probability(distilled):
+    pipe, surrogate, _, blob = distilled
+    cols = list(pipe.named_steps["pre"].feature_names_in_)
+    _, X_test, _, _ = load_dropout(ROOT / "datasets")
+    rows = quick_rows(X_test.iloc[:20], blob["quick_fields"], blob["defaults"])
+    exp = explainer_for(surrogate, "surrogate", cols=cols).explain(rows)
+    np.testing.assert_allclose(exp.prediction, surrogate.predict_proba(rows)[:, 1])
+    inside = (exp.prediction > 0) & (exp.prediction < 1)
+    np.testing.assert_allclose((exp.base + exp.contributions.sum(axis=1))[inside], exp.prediction[inside], atol=1e-9)
+    assert (exp.contributions.drop(columns=blob["quick_fields"]) == 0).all().all()
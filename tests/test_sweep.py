@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from outcomes.sweep import grid_values, sweep
+
+ROW = {"age": 17, "grade": 12.5, "school": "GP"}
+
+
+def test_grid_values_keep_integer_steps_and_thin_long_ranges():
+    assert grid_values(15, 22, 1).tolist() == list(range(15, 23))
+    assert grid_values(15, 22, 1).dtype == np.int64
+    thinned = grid_values(0.0, 200.0, 0.1, max_points=61)
+    assert len(thinned) == 61 and thinned[0] == 0.0 and thinned[-1] == 200.0
+
+
+def test_two_feature_sweep_is_one_batched_call_equal_to_row_by_row():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return X["age"] * 10 + X["grade"] + (X["school"] == "GP")
+
+    out = sweep(predict, ROW, {"age": [15, 16, 17], "grade": [10.0, 12.5]}, list(ROW))
+    assert calls == [6]
+    assert out.columns.tolist() == ["age", "grade", "prediction"]
+    for _, r in out.iterrows():
+        single = pd.DataFrame([{**ROW, "age": int(r["age"]), "grade": r["grade"]}])
+        assert r["prediction"] == float(predict(single).iloc[0])
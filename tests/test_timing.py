@@ -0,0 +1,36 @@
+import gc
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from outcomes.forest import CompiledBoosting, QuickSurrogate
+from outcomes.timing import StageTimer, TimingLease, instrument, is_instrumented
+
+
+def test_leases_share_instrumentation_until_the_last_lets_go():
+    X = np.arange(20.0).reshape(10, 2)
+    model = make_pipeline(StandardScaler(), LinearRegression()).fit(X, X[:, 0])
+    a, b = TimingLease(), TimingLease()
+    a.hold(model, "m", True)
+    b.hold(model, "m", True)
+    b.hold(model, "m", False)  # another session turning timings off leaves them on for the first
+    assert is_instrumented(model)
+    b.hold(model, "m", True)
+    a.close()
+    assert is_instrumented(model)
+    del b
+    gc.collect()
+    assert not is_instrumented(model)
+    np.testing.assert_allclose(model.predict(X), X[:, 0], atol=1e-9)
+
+
+def test_quick_surrogate_is_timed_per_stage():
+    X = np.random.default_rng(0).random((50, 2))
+    surrogate = QuickSurrogate(CompiledBoosting(GradientBoostingRegressor(n_estimators=5).fit(X, X[:, 0])), ["a", "b"], [0, 1])
+    timer = StageTimer()
+    instrument(surrogate, "quick", timer).predict_proba(X)
+    assert [(r["stage"], r["method"], r["calls"]) for r in timer.summary()] == [
+        ("booster", "predict", 1), ("total", "predict_proba", 1)]
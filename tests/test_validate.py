@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from outcomes.validate import Rule, validate
+
+RULES = {"Course": Rule("int64", 9500, allowed=np.asarray([9119, 9500, 9773])),
+         "Age_at_enrollment": Rule("float64", 20.0, lo=15, hi=70, integer=True)}
+
+
+def test_clip_rounds_codes_onto_allowed_values_only():
+    df = pd.DataFrame({"Course": [9119.2, 9119.6, 9773.0], "Age_at_enrollment": [19.6, 80.0, 20.0]})
+    v = validate(df, RULES, policy="clip")
+    assert v.frame["Course"].tolist() == [9119, 9500, 9773]  # 9119.6 rounds to 9120, not a code: default
+    assert v.frame["Age_at_enrollment"].tolist() == [20.0, 70.0, 20.0]
+    course = v.errors[v.errors["column"] == "Course"]
+    assert course[["row", "problem", "action"]].values.tolist() == [[0, "not_integer", "clipped"],
+                                                                  [1, "unknown_code", "filled"]]
+
+
+def test_non_integer_code_reported_once_without_clip():
+    df = pd.DataFrame({"Course": [9119.6, 1.0], "Age_at_enrollment": [20, 20]})
+    v = validate(df, RULES, policy="default")
+    assert v.frame["Course"].tolist() == [9500, 9500]
+    assert v.errors["problem"].tolist() == ["not_integer", "unknown_code"]
+    assert validate(df, RULES, policy="reject").frame.empty